@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  config_loading.py
+#
+#  Copyright 2016 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+'''
+Measures the time it takes to load a generated bootstrap file.
+
+The generated bootstrap file contains <modules> module instances and
+<routes> routing table entries.  Each module instance also gets its logs
+and metrics queue connected which adds another 2 connections per module
+instance.
+
+Usage:
+
+    $ python benchmarks/config_loading.py [modules] [routes]
+'''
+
+import os
+import sys
+import tempfile
+import yaml
+from timeit import default_timer
+from wishbone.config import ConfigFile
+
+
+def generate(modules, routes):
+
+    config = {"modules": {}, "routingtable": []}
+    for n in range(modules):
+        config["modules"]["module_%s" % (n)] = {"module": "wishbone.flow.funnel"}
+
+    for n in range(routes):
+        source = n % modules
+        destination = (source + n // modules + 1) % modules
+        config["routingtable"].append("module_%s.outbox_%s -> module_%s.inbox_%s_%s" % (source, n // modules, destination, source, n // modules))
+
+    return config
+
+
+def timed(function, *args):
+
+    start = default_timer()
+    result = function(*args)
+    return result, round(default_timer() - start, 4)
+
+
+def main():
+
+    modules = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    routes = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+
+    config = generate(modules, routes)
+    fd, filename = tempfile.mkstemp(suffix=".yaml")
+    with os.fdopen(fd, "w") as f:
+        yaml.dump(config, f, Dumper=getattr(yaml, "CSafeDumper", yaml.SafeDumper))
+
+    try:
+        with open(filename) as f:
+            content = f.read()
+        for name in ("SafeLoader", "CSafeLoader"):
+            if hasattr(yaml, name):
+                _, duration = timed(yaml.load, content, getattr(yaml, name))
+                print("%-12s %s seconds" % (name, duration))
+
+        result, duration = timed(ConfigFile, filename, "STDOUT")
+        print("%-12s %s seconds (%s modules, %s routes)" % ("ConfigFile", duration, len(result.config["modules"]), len(result.config["routingtable"])))
+    finally:
+        os.remove(filename)
+
+
+if __name__ == '__main__':
+    main()
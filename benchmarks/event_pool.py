@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  event_pool.py
+#
+#  Copyright 2016 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+'''
+Compares garbage collector activity of a generator -> terminal event flow
+with and without the event free-list.
+
+Events are produced in bursts which fill up the queues sitting between an
+input and an output module after which they drain again.  Without a
+free-list, each burst allocates new container objects which makes the
+garbage collector kick in while filling the queues.
+
+Usage:
+
+    $ python benchmarks/event_pool.py [number_of_events]
+'''
+
+import gc
+import sys
+from collections import deque
+from timeit import default_timer
+from wishbone.event import EventPool
+
+
+class GCMonitor(object):
+
+    def __init__(self):
+
+        self.collections = 0
+        self.pause = 0.0
+        self.__start = None
+
+    def callback(self, phase, info):
+
+        if phase == "start":
+            self.__start = default_timer()
+        else:
+            self.collections += 1
+            self.pause += default_timer() - self.__start
+
+    def __enter__(self):
+
+        gc.collect()
+        gc.callbacks.append(self.callback)
+        return self
+
+    def __exit__(self, *args):
+
+        gc.callbacks.remove(self.callback)
+
+
+def run(pool, amount, burst=5000):
+
+    in_flight = deque()
+    with GCMonitor() as monitor:
+        start = default_timer()
+        for n in range(amount):
+            event = pool.acquire("test %s" % (n))
+            event.set(n, "@tmp.sequence")
+            in_flight.append(event)
+            if len(in_flight) == burst:
+                while in_flight:
+                    pool.release(in_flight.popleft())
+        duration = default_timer() - start
+
+    return {"events": amount,
+            "duration": round(duration, 4),
+            "gc_collections": monitor.collections,
+            "gc_pause": round(monitor.pause, 4),
+            "pool": pool.stats()}
+
+
+def main():
+
+    amount = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+    for name, pool in (("no pool", EventPool()), ("pool", EventPool(5000))):
+        result = run(pool, amount)
+        print("%-8s %s" % (name, result))
+
+
+if __name__ == '__main__':
+    main()
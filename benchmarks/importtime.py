@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  importtime.py
+#
+#  Copyright 2016 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+
+'''
+Measures the cumulative import time of wishbone modules.
+
+Each module is imported <runs> times in a fresh interpreter using
+"python -X importtime" and the best result is reported.
+
+Usage:
+
+    $ python benchmarks/importtime.py [runs] [module ...]
+'''
+
+import subprocess
+import sys
+
+
+def importTime(module):
+
+    output = subprocess.check_output(
+        [sys.executable, "-X", "importtime", "-c", "import %s" % (module)],
+        stderr=subprocess.STDOUT
+    ).decode()
+
+    for line in output.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            (_, cumulative, name) = line.split("|")
+            if name.strip() == module:
+                return int(cumulative)
+
+
+def main():
+
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    modules = sys.argv[2:] or ["wishbone", "wishbone.bootstrap"]
+
+    for module in modules:
+        best = min(importTime(module) for _ in range(runs))
+        print("%-20s %s ms" % (module, round(best / 1000.0, 1)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  modify.py
+#
+#  Copyright 2016 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+'''
+Measures the time wishbone.function.modify spends per event for each of the
+expressions covered by tests/test_module_modify.py.
+
+The events are handed to Modify.consume() directly.  The pipeline of
+expressions is also applied to Bulk events of 100 events each.  The outbox is not
+connected so submitted events are dropped.  The time it takes to create the
+events is measured separately and subtracted.
+
+Usage:
+
+    $ python benchmarks/modify.py [number_of_events]
+'''
+
+import sys
+from timeit import default_timer
+from wishbone.actor import ActorConfig
+from wishbone.event import Event, Bulk
+from wishbone.module.modify import Modify
+
+
+def event(data=None, **tmp):
+
+    e = Event(data)
+    for key, value in tmp.items():
+        e.set(value, "@tmp.%s" % (key))
+    return e
+
+
+CASES = [
+    ({"add_item": ["fubar", "@data"]}, lambda: event(["one", "two", "three"])),
+    ({"copy": ["@data", "@tmp.copy", "n/a"]}, lambda: event({"greeting": "hi"})),
+    ({"copy": ["does.not.exist", "@tmp.copy", "default"]}, lambda: event({"greeting": "hi"})),
+    ({"del_item": ["fubar", "@data"]}, lambda: event(["one", "two", "three", "fubar"])),
+    ({"delete": ["@data.two"]}, lambda: event({"one": 1, "two": 2})),
+    ({"extract": ["destination", r"(?P<one>.*?)\ (?P<two>.*)\ (?P<three>.*)", "@data"]}, lambda: event("een twee drie")),
+    ({"lowercase": ["@data.lower"]}, lambda: event({"lower": "HELLO"})),
+    ({"set": ["hi", "blah"]}, lambda: event("hello")),
+    ({"uppercase": ["@data.upper"]}, lambda: event({"upper": "hello"})),
+    ({"template": ["result", "Good day in {language} is {word}.", "@data"]}, lambda: event({"language": "German", "word": "gutten Tag"})),
+    ({"time": ["epoch", "X"]}, lambda: event("hello")),
+    ({"replace": [r'\d', "X", "@data"]}, lambda: event("hello 123 hello")),
+    ({"join": ['@data', ",", "@tmp.joined"]}, lambda: event(["one", "two", "three"])),
+    ({"merge": ['@tmp.one', '@tmp.two', '@data']}, lambda: event(one=["one"], two=["two"])),
+]
+
+PIPELINE = (
+    [
+        {"copy": ["@data", "@tmp.copy", "n/a"]},
+        {"set": ["hi", "@tmp.greeting"]},
+        {"lowercase": ["@data.lower"]},
+        {"uppercase": ["@data.upper"]},
+        {"extract": ["@tmp.extract", r"(?P<one>.*?)\ (?P<two>.*)\ (?P<three>.*)", "@data.text"]},
+        {"replace": ['e', "E", "@data.text"]},
+        {"template": ["@tmp.result", "Good day in {language} is {word}.", "@data"]},
+        {"delete": ["@tmp.copy"]}
+    ],
+    lambda: event({"lower": "HELLO", "upper": "hello", "text": "een twee drie", "language": "German", "word": "gutten Tag"})
+)
+
+
+def run(expressions, factory, amount):
+
+    modify = Modify(ActorConfig('modify', 100, 1, {}, "", loglevel=3), expressions=expressions)
+    if hasattr(modify, "preHook"):
+        modify.preHook()
+
+    start = default_timer()
+    for _ in range(amount):
+        factory()
+    baseline = default_timer() - start
+
+    start = default_timer()
+    for _ in range(amount):
+        modify.consume(factory())
+    duration = default_timer() - start - baseline
+
+    modify.stop()
+    return duration / amount * 1000000
+
+
+def bulk(factory, size=100):
+
+    def create():
+        b = Bulk()
+        for _ in range(size):
+            b.append(factory())
+        return b
+    create.size = size
+    return create
+
+
+def main():
+
+    amount = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    for expression, factory in CASES:
+        per_event = run([expression], factory, amount)
+        print("%-10s %8.2f usec/event" % (list(expression.keys())[0], per_event))
+
+    per_event = run(*(PIPELINE + (amount,)))
+    print("%-10s %8.2f usec/event" % ("pipeline", per_event))
+
+    factory = bulk(PIPELINE[1])
+    per_event = run(PIPELINE[0], factory, amount // factory.size) / factory.size
+    print("%-10s %8.2f usec/event" % ("bulk", per_event))
+
+
+if __name__ == '__main__':
+    main()
@@ -126,11 +126,14 @@ setup(
             'modify = wishbone.module.modify:Modify'
         ],
         'wishbone.input': [
+            'bridge = wishbone.module.bridgein:BridgeIn',
             'cron =  wishbone.module.cron:Cron',
             'dictgenerator = wishbone.module.dictgenerator:DictGenerator',
+            'logring = wishbone.module.logring:LogRingReader',
             'testevent = wishbone.module.testevent:TestEvent'
         ],
         'wishbone.output': [
+            'bridge = wishbone.module.bridgeout:BridgeOut',
             'null = wishbone.module.null:Null',
             'stdout = wishbone.module.stdout:STDOUT',
             'syslog = wishbone.module.wbsyslog:Syslog'
@@ -140,6 +143,7 @@ setup(
             'cycle = wishbone.lookup.cycle:Cycle',
             'etcd = wishbone.lookup.etcd:ETCD',
             'event = wishbone.lookup.event:EventLookup',
+            'file = wishbone.lookup.file:File',
             'pid = wishbone.lookup.pid:PID',
             'random_bool = wishbone.lookup.random_bool:RandomBool',
             'random_integer = wishbone.lookup.random_integer:RandomInteger',
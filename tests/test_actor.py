@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  test_actor.py
+#
+#  Copyright 2016 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+from wishbone.actor import Actor, ActorConfig
+from wishbone.event import Event
+from wishbone.lookup import EventLookup
+from wishbone.utils.test import getter
+from wishbone.error import QueueEmpty
+from gevent import sleep
+import pytest
+
+
+class Failing(Actor):
+
+    def __init__(self, actor_config):
+        Actor.__init__(self, actor_config)
+        self.pool.createQueue("inbox")
+        self.registerConsumer(self.consume, "inbox")
+
+    def consume(self, event):
+        raise Exception("Downstream unavailable.")
+
+
+def get_actor():
+
+    actor_config = ActorConfig('failing', 100, 1, {}, "", loglevel=3, error_window=1)
+    actor = Failing(actor_config)
+    actor.pool.queue.inbox.disableFallThrough()
+    actor.pool.queue.failed.disableFallThrough()
+    actor.pool.queue.logs.disableFallThrough()
+    actor.start()
+    return actor
+
+
+def test_actor_error_aggregation():
+
+    actor = get_actor()
+    for _ in range(10):
+        actor.pool.queue.inbox.put(Event("hello"))
+
+    assert getter(actor.pool.queue.failed).get("@errors.failing")[2] == "Downstream unavailable."
+    assert getter(actor.pool.queue.logs).get().message == "Downstream unavailable."
+    sleep(0.1)
+    with pytest.raises(QueueEmpty):
+        actor.pool.queue.logs.get(block=False)
+
+    sleep(2)
+    assert getter(actor.pool.queue.logs).get().message.startswith("Downstream unavailable. (repeated 9 times")
+    actor.stop()
+
+
+def test_actor_consumer_timing():
+
+    class Slow(Actor):
+
+        def __init__(self, actor_config):
+            Actor.__init__(self, actor_config)
+            self.pool.createQueue("inbox")
+            self.registerConsumer(self.consume, "inbox")
+
+        def consume(self, event):
+            sleep(0.05)
+
+    actor = Slow(ActorConfig('slow', 100, 1, {}, "", timing=True))
+    actor.pool.queue.inbox.disableFallThrough()
+    actor.start()
+    actor.pool.queue.inbox.put(Event("hello"))
+    sleep(0.2)
+
+    stats = actor.consumerStats()["inbox"]
+    assert stats["count"] == 1
+    assert stats["max_time"] >= 0.05
+    actor.stop()
+
+
+def test_actor_event_lookup():
+
+    class Lookup(Actor):
+
+        def __init__(self, actor_config, value="~~event('@data.value', 'default')", key="~~event('@tmp.key')"):
+            Actor.__init__(self, actor_config)
+            self.pool.createQueue("inbox")
+            self.pool.createQueue("outbox")
+            self.registerConsumer(self.consume, "inbox")
+
+        def consume(self, event):
+            event.set((self.kwargs.value, self.kwargs.key), "@data.result")
+            self.submit(event, self.pool.queue.outbox)
+
+    actor = Lookup(ActorConfig('lookup', 100, 1, {"event": EventLookup().lookup}, ""))
+    actor.pool.queue.inbox.disableFallThrough()
+    actor.pool.queue.outbox.disableFallThrough()
+    actor.start()
+
+    e = Event({"value": "one"})
+    e.set("two", "@tmp.key")
+    actor.pool.queue.inbox.put(e)
+    assert getter(actor.pool.queue.outbox).get("@data.result") == ("one", "two")
+
+    e = Event({})
+    e.set("three", "@tmp.key")
+    actor.pool.queue.inbox.put(e)
+    assert getter(actor.pool.queue.outbox).get("@data.result") == ("default", "three")
+    actor.stop()
+
+
+def test_actor_event_lookup_concurrent_consumers():
+
+    class Lookup(Actor):
+
+        def __init__(self, actor_config, key="~~event('@data.key')"):
+            Actor.__init__(self, actor_config)
+            self.pool.createQueue("inbox")
+            self.pool.createQueue("outbox")
+            self.registerConsumer(self.consume, "inbox")
+
+        def consume(self, event):
+            before = self.kwargs.key
+            sleep(0.05)
+            event.set((before, self.kwargs.key), "@data.result")
+            self.submit(event, self.pool.queue.outbox)
+
+    actor = Lookup(ActorConfig('lookup', 100, 1, {"event": EventLookup().lookup}, ""))
+    actor.pool.queue.inbox.disableFallThrough()
+    actor.pool.queue.outbox.disableFallThrough()
+    actor.start()
+    actor.scaleConsumers("inbox", 2)
+
+    actor.pool.queue.inbox.put(Event({"key": "one"}))
+    actor.pool.queue.inbox.put(Event({"key": "two"}))
+    sleep(0.2)
+
+    results = [actor.pool.queue.outbox.get().get("@data") for _ in range(2)]
+    assert sorted([(r["key"], r["result"]) for r in results]) == [("one", ("one", "one")), ("two", ("two", "two"))]
+    actor.stop()
+
+
+def test_actor_event_lookup_modified():
+
+    class Lookup(Actor):
+
+        def __init__(self, actor_config, key="~~event('@tmp.key', 'default')"):
+            Actor.__init__(self, actor_config)
+            self.pool.createQueue("inbox")
+            self.pool.createQueue("outbox")
+            self.registerConsumer(self.consume, "inbox")
+
+        def consume(self, event):
+            before = self.kwargs.key
+            event.set("fresh", "@tmp.key")
+            after = self.kwargs.key
+            event.delete("@tmp.key")
+            event.set((before, after, self.kwargs.key), "@data")
+            self.submit(event, self.pool.queue.outbox)
+
+    actor = Lookup(ActorConfig('lookup', 100, 1, {"event": EventLookup().lookup}, ""))
+    actor.pool.queue.inbox.disableFallThrough()
+    actor.pool.queue.outbox.disableFallThrough()
+    actor.start()
+
+    actor.pool.queue.inbox.put(Event())
+    assert getter(actor.pool.queue.outbox).get() == ("default", "fresh", "default")
+
+    e = Event()
+    e.set("stale", "@tmp.key")
+    actor.pool.queue.inbox.put(e)
+    assert getter(actor.pool.queue.outbox).get() == ("stale", "fresh", "default")
+    actor.stop()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  test_benchmark.py
+#
+#  Copyright 2016 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+from wishbone.bootstrap import intList
+import pytest
+
+from wishbone.utils.benchmark import Benchmark
+
+try:
+    from wishbone.config import ConfigFile
+except ImportError:
+    ConfigFile = None
+
+
+BOOTSTRAP = """
+modules:
+  input:
+    module: wishbone.input.cron
+    arguments:
+      cron: "*/10 * * * *"
+  modify:
+    module: wishbone.function.modify
+    arguments:
+      expressions:
+        - uppercase: ["@data"]
+  output:
+    module: wishbone.output.stdout
+routingtable:
+  - input.outbox -> modify.inbox
+  - modify.outbox -> output.inbox
+"""
+
+
+def test_benchmark_intlist():
+
+    assert intList("1") == [1]
+    assert intList("1,10,100") == [1, 10, 100]
+    with pytest.raises(ValueError):
+        intList("1,a")
+
+
+@pytest.mark.skipif(ConfigFile is None, reason="wishbone.config can not be imported.")
+def test_benchmark_sweep(tmpdir):
+
+    bootstrap = str(tmpdir.join("bootstrap.yaml"))
+    with open(bootstrap, "w") as f:
+        f.write(BOOTSTRAP)
+
+    config = ConfigFile(bootstrap, "STDOUT").dump()
+    benchmark = Benchmark(config, duration=1, rate=1000)
+
+    assert config.modules.input.module == "wishbone.input.testevent"
+    assert config.modules.input.arguments == {"interval": 0.001}
+    assert config.modules.output.module == "wishbone.output.null"
+    assert benchmark.sinks == ["output"]
+
+    result = benchmark.sweep(instances=[1, 2], queue_sizes=[10])
+    assert result["duration"] == 1
+    assert result["rate"] == 1000
+    assert [(r["instances"], r["queue_size"]) for r in result["runs"]] == [(1, 10), (2, 10)]
+
+    for run in result["runs"]:
+        assert len(run["per_instance"]) == run["instances"]
+        assert run["throughput"] > 0
+        assert run["peak_rss_kb"] > 0
+        assert run["modules"]["modify"]["consumers"]["inbox"]["count"] > 0
+        assert "sojourn_time" in run["modules"]["modify"]["queues"]["inbox"]
+        assert sum([r["processed"] for r in run["per_instance"]]) > 0
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  test_blocking.py
+#
+#  Copyright 2016 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+from wishbone.actor import ActorConfig
+from wishbone.event import Event
+from wishbone.module.null import Null
+from wishbone.router.default import ModulePool
+from wishbone.router.blocking import BlockingDetector
+from gevent import sleep
+import time
+
+
+class Blocking(Null):
+
+    def __init__(self, actor_config):
+        Null.__init__(self, actor_config)
+        self.pool.queue.logs.disableFallThrough()
+
+    def consume(self, event):
+        time.sleep(event.get())
+
+
+def test_blocking_detector():
+
+    module_pool = ModulePool()
+    module_pool.module.blocking = Blocking(ActorConfig('blocking', 100, 1, {}, ""))
+    module_pool.module.blocking.pool.queue.inbox.disableFallThrough()
+    module_pool.module.blocking.start()
+
+    detector = BlockingDetector(module_pool, threshold=0.1)
+    detector.start()
+    sleep(0.2)
+
+    module_pool.module.blocking.pool.queue.inbox.put(Event(0.01))
+    sleep(0.2)
+    assert detector.counters == {}
+
+    module_pool.module.blocking.pool.queue.inbox.put(Event(0.5))
+    sleep(0.2)
+    detector.stop()
+    module_pool.module.blocking.stop()
+
+    (count, duration) = detector.counters[("blocking", "consume")]
+    assert count == 1
+    assert 0.3 < duration < 0.6
+    assert detector.dump()[0]["queue"] == "inbox"
+    assert "time.sleep(event.get())" in "".join(detector.dump()[0]["stack"])
+    assert [s.name for s in detector.samples()] == ["wishbone_hub_stalls_total", "wishbone_hub_stall_seconds_total"]
+
+    logs = [e.get().message for e in module_pool.module.blocking.pool.queue.logs.dump()]
+    assert any(message.startswith("Function consume blocked the gevent hub for") for message in logs)
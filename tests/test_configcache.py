@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  test_configcache.py
+#
+#  Copyright 2016 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+import os
+import pytest
+
+try:
+    from wishbone.config import ConfigCache
+except ImportError as err:
+    pytest.skip("wishbone.config can not be imported.  Reason: %s" % (err), allow_module_level=True)
+
+
+BOOTSTRAP = """
+modules:
+  input:
+    module: wishbone.input.testevent
+  output:
+    module: wishbone.output.stdout
+routingtable:
+  - input.outbox -> output.inbox
+"""
+
+
+def write(path, content):
+
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def entries(directory):
+
+    return [name for name in os.listdir(directory) if name.endswith(".pickle")]
+
+
+def test_configcache_hit(tmpdir, monkeypatch):
+
+    bootstrap = str(tmpdir.join("bootstrap.yaml"))
+    directory = str(tmpdir.join("cache"))
+    write(bootstrap, BOOTSTRAP)
+
+    config = ConfigCache(directory).load(bootstrap, "STDOUT")
+    assert len(entries(directory)) == 1
+    assert os.stat(directory).st_mode & 0o777 == 0o700
+
+    def parse(*args, **kwargs):
+        raise Exception("Bootstrap file parsed instead of loaded from cache.")
+    monkeypatch.setattr("wishbone.config.configfile.ConfigFile", parse)
+
+    assert ConfigCache(directory).load(bootstrap, "STDOUT") == config
+
+
+def test_configcache_miss(tmpdir):
+
+    bootstrap = str(tmpdir.join("bootstrap.yaml"))
+    directory = str(tmpdir.join("cache"))
+    write(bootstrap, BOOTSTRAP)
+
+    ConfigCache(directory).load(bootstrap, "STDOUT")
+    write(bootstrap, BOOTSTRAP.replace("output", "out"))
+    config = ConfigCache(directory).load(bootstrap, "STDOUT")
+
+    assert "out" in config.modules
+    assert "output" not in config.modules
+    assert len(entries(directory)) == 2
+
+    ConfigCache(directory).load(bootstrap, "SYSLOG")
+    assert len(entries(directory)) == 3
+
+
+def test_configcache_corrupt(tmpdir):
+
+    bootstrap = str(tmpdir.join("bootstrap.yaml"))
+    directory = str(tmpdir.join("cache"))
+    write(bootstrap, BOOTSTRAP)
+
+    ConfigCache(directory).load(bootstrap, "STDOUT")
+    entry = os.path.join(directory, entries(directory)[0])
+    write(entry, "corrupt")
+
+    assert "output" in ConfigCache(directory).load(bootstrap, "STDOUT").modules
+
+    os.chmod(entry, 0)
+    assert "output" in ConfigCache(directory).load(bootstrap, "STDOUT").modules
+
+
+def test_configcache_untrusted(tmpdir):
+
+    bootstrap = str(tmpdir.join("bootstrap.yaml"))
+    directory = str(tmpdir.join("cache"))
+    write(bootstrap, BOOTSTRAP)
+
+    cache = ConfigCache(directory)
+    cache.load(bootstrap, "STDOUT")
+    entry = os.path.join(directory, entries(directory)[0])
+
+    # A group writable entry is ignored and replaced.
+    os.chmod(entry, 0o664)
+    cache.load(bootstrap, "STDOUT")
+    assert os.stat(entry).st_mode & 0o777 == 0o600
+
+    os.chmod(directory, 0o777)
+    with pytest.raises(Exception):
+        cache.load(bootstrap, "STDOUT")
@@ -22,10 +22,71 @@
 #
 #
 
-from wishbone.event import Event
+from wishbone.event import Event, EventPool, compilePath
+from wishbone.error import EventReleased
+import pytest
 
 def test_event_format():
 
     e = Event({"one": 1, "two": 2})
 
     assert e.format("{one} is a number and so is {two}") == "1 is a number and so is 2"
+
+
+def test_event_pool_disabled():
+
+    pool = EventPool()
+    e = pool.acquire("one")
+    pool.release(e)
+    assert pool.acquire("two") is not e
+    assert pool.stats()["free"] == 0
+
+
+def test_event_pool_reuse():
+
+    pool = EventPool(10)
+    e = pool.acquire({"one": 1})
+    e.set("hello", "@tmp.greeting")
+    e.set(1, "@errors.module")
+    e.set("fubar", "root")
+    pool.release(e)
+
+    r = pool.acquire("two")
+    assert r is e
+    assert r.get() == "two"
+    assert r.get("@tmp") == {}
+    assert r.get("@errors") == {}
+    assert not r.has("root")
+    assert pool.stats()["reused_total"] == 1
+
+
+def test_event_pool_debug_use_after_release():
+
+    pool = EventPool(10, debug=True)
+    e = pool.acquire("one")
+    pool.release(e)
+
+    with pytest.raises(EventReleased):
+        e.get()
+
+    with pytest.raises(EventReleased):
+        pool.release(e)
+
+    assert pool.acquire("two").get() == "two"
+
+
+def test_event_extract():
+
+    e = Event({"one": {"two": 2}, "three": [3]})
+    paths = {
+        "@data.one.two": compilePath("@data.one.two"),
+        "@data.three": compilePath("@data.three"),
+        "@data.three.0": compilePath("@data.three.0"),
+        "@data.missing": compilePath("@data.missing"),
+        "": compilePath("")
+    }
+    assert e.extract(paths) == {
+        "@data.one.two": 2,
+        "@data.three": [3],
+        "": e.data
+    }
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  test_importtime.py
+#
+#  Copyright 2016 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+import subprocess
+import sys
+
+HEAVY = ["gevent", "gipc", "arrow", "requests", "pkg_resources", "jsonschema",
+         "attrdict", "daemon", "setproctitle", "colorama", "cronex", "yaml"]
+
+
+def importedModules(module):
+
+    output = subprocess.check_output(
+        [sys.executable, "-c", "import sys, %s; print('\\n'.join(sys.modules))" % (module)],
+        stderr=subprocess.STDOUT
+    ).decode()
+    return set(output.splitlines())
+
+
+def test_importtime_bootstrap_defers_dependencies():
+
+    imported = importedModules("wishbone.bootstrap")
+    for name in HEAVY:
+        assert name not in imported
+
+
+def test_importtime_package_defers_dependencies():
+
+    imported = importedModules("wishbone")
+    assert "wishbone.actor" not in imported
+    for name in HEAVY:
+        assert name not in imported
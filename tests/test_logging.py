@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  test_logging.py
+#
+#  Copyright 2016 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+from wishbone.logging import Logging
+from wishbone.queue import Queue
+from wishbone.utils.test import getter
+
+
+def test_logging_level():
+
+    q = Queue(10)
+    q.disableFallThrough()
+    logging = Logging("test", q, level=4)
+    logging.debug("debug")
+    logging.info("info")
+    logging.warning("warning")
+    logging.error("error")
+
+    assert getter(q).get().message == "warning"
+    assert getter(q).get().message == "error"
+    assert q.size() == 0
+
+
+def test_logging_lazy_format():
+
+    class Expensive(object):
+
+        formatted = False
+
+        def __str__(self):
+            Expensive.formatted = True
+            return "expensive"
+
+    q = Queue(10)
+    q.disableFallThrough()
+    logging = Logging("test", q, level=6)
+    logging.debug("Value %s", Expensive())
+    assert not Expensive.formatted
+
+    logging.info("Value %s", Expensive())
+    assert getter(q).get().message == "Value expensive"
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  test_lookup_cache.py
+#
+#  Copyright 2016 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+from wishbone.lookup.cache import LookupCache
+from uplook.errors import NoSuchValue
+import pytest
+import traceback
+import time
+
+
+class Counting(object):
+
+    def __init__(self):
+        self.calls = 0
+
+    def lookup(self, key=None):
+        self.calls += 1
+        if key == "missing":
+            raise NoSuchValue("missing")
+        return "%s-%s" % (key, self.calls)
+
+
+def test_lookup_cache_ttl():
+
+    counting = Counting()
+    cache = LookupCache(counting.lookup, "test", ttl=0.1)
+
+    assert cache.lookup("a") == "a-1"
+    assert cache.lookup("a") == "a-1"
+    assert cache.lookup(key="a") == "a-2"
+    time.sleep(0.1)
+    assert cache.lookup("a") == "a-3"
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_lookup_cache_negative_ttl():
+
+    counting = Counting()
+    cache = LookupCache(counting.lookup, "test", negative_ttl=10)
+    errors = []
+    for _ in range(3):
+        with pytest.raises(NoSuchValue) as err:
+            cache.lookup("missing")
+        errors.append(err.value)
+    assert counting.calls == 1
+    # Cached errors are raised as new exceptions so their traceback does not
+    # keep growing.
+    assert errors[1] is not errors[2]
+    assert str(errors[1]) == str(errors[0])
+    assert len(traceback.extract_tb(errors[2].__traceback__)) == len(traceback.extract_tb(errors[1].__traceback__))
+
+    counting = Counting()
+    cache = LookupCache(counting.lookup, "test")
+    for _ in range(3):
+        with pytest.raises(NoSuchValue):
+            cache.lookup("missing")
+    assert counting.calls == 3
+
+
+def test_lookup_cache_lru():
+
+    counting = Counting()
+    cache = LookupCache(counting.lookup, "test", max_entries=2)
+
+    cache.lookup("a")
+    cache.lookup("b")
+    cache.lookup("a")
+    cache.lookup("c")
+
+    assert len(cache) == 2
+    assert cache.evictions == 1
+    assert cache.lookup("a") == "a-1"
+    assert cache.lookup("b") == "b-4"
+
+
+def test_lookup_cache_unhashable():
+
+    counting = Counting()
+    cache = LookupCache(counting.lookup, "test")
+
+    cache.lookup(["a"])
+    cache.lookup(["a"])
+    assert counting.calls == 2
+    assert len(cache) == 0
+    assert [s.value for s in cache.samples()] == [0, 2, 0, 0]
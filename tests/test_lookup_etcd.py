@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  test_lookup_etcd.py
+#
+#  Copyright 2016 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+from wishbone.lookup.etcd import ETCD
+from uplook.errors import NoSuchValue
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from threading import Condition, Thread
+from urllib.parse import urlparse, parse_qs
+import gevent
+import json
+import pytest
+import time
+
+
+class StubETCD(ThreadingMixIn, HTTPServer):
+
+    '''A minimal etcd v2 keys API supporting get and recursive wait.'''
+
+    daemon_threads = True
+
+    def __init__(self):
+
+        HTTPServer.__init__(self, ("127.0.0.1", 0), StubHandler)
+        self.keys = {}
+        self.history = []
+        self.index = 0
+        self.delay = 0
+        self.requests = []
+        self.condition = Condition()
+        Thread(target=self.serve_forever, daemon=True).start()
+
+    def set(self, key, value):
+
+        with self.condition:
+            self.index += 1
+            self.keys[key] = (value, self.index)
+            self.history.append((key, value, self.index))
+            self.condition.notify_all()
+
+    def url(self):
+
+        return "http://127.0.0.1:%s/v2/keys" % (self.server_address[1])
+
+
+class StubHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+
+        url = urlparse(self.path)
+        key = url.path.replace("/v2/keys", "", 1)
+        query = parse_qs(url.query)
+        server = self.server
+        server.requests.append((key, "wait" in query))
+        time.sleep(server.delay)
+
+        with server.condition:
+            if "wait" in query:
+                index = int(query["waitIndex"][0])
+
+                def changed():
+                    for change in server.history:
+                        if change[2] >= index and change[0].startswith(key.rstrip('/')):
+                            return change
+
+                if not server.condition.wait_for(changed, timeout=30):
+                    return
+                key, value, index = changed()
+            elif key in server.keys:
+                value, index = server.keys[key]
+            else:
+                self.respond(404, {"errorCode": 100, "message": "Key not found"})
+                return
+        self.respond(200, {"action": "set", "node": {"key": key, "value": value, "modifiedIndex": index}})
+
+    def respond(self, status, body):
+
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("X-Etcd-Index", str(self.server.index))
+            self.end_headers()
+            self.wfile.write(json.dumps(body).encode("utf-8"))
+        except Exception:
+            pass
+
+    def log_message(self, *args):
+
+        pass
+
+
+def plainRequests(server):
+
+    return len([r for r in server.requests if not r[1]])
+
+
+def test_lookup_etcd_cache():
+
+    server = StubETCD()
+    server.set("/one", "1")
+    etcd = ETCD(server.url(), ttl=10)
+
+    assert etcd.lookup("one") == "1"
+    assert etcd.lookup("/one") == "1"
+    assert plainRequests(server) == 1
+    with pytest.raises(NoSuchValue):
+        etcd.lookup("missing")
+    etcd.stop()
+    server.shutdown()
+
+
+def test_lookup_etcd_watch():
+
+    server = StubETCD()
+    server.set("/one", "1")
+    server.set("/two", "2")
+    etcd = ETCD(server.url(), ttl=10)
+
+    assert etcd.lookup("one") == "1"
+    assert etcd.lookup("two") == "2"
+    time.sleep(0.2)
+    server.set("/one", "11")
+    server.set("/two", "22")
+    time.sleep(0.2)
+
+    assert etcd.lookup("one") == "11"
+    assert etcd.lookup("two") == "22"
+    assert plainRequests(server) == 2
+    # A single recursive watch covers all keys.
+    assert set([r[0] for r in server.requests if r[1]]) == set(["/"])
+    etcd.stop()
+    server.shutdown()
+
+
+def test_lookup_etcd_max_keys():
+
+    server = StubETCD()
+    for n in range(5):
+        server.set("/%s" % (n), str(n))
+    etcd = ETCD(server.url(), ttl=10, max_keys=2)
+
+    for n in range(5):
+        assert etcd.lookup(str(n)) == str(n)
+    assert list(etcd.cache.keys()) == ["3", "4"]
+    etcd.stop()
+    server.shutdown()
+
+
+def test_lookup_etcd_poll():
+
+    server = StubETCD()
+    server.set("/one", "1")
+    etcd = ETCD(server.url(), ttl=1, watch=False)
+
+    assert etcd.lookup("one") == "1"
+    server.set("/one", "2")
+    time.sleep(1)
+
+    assert etcd.lookup("one") == "2"
+    assert plainRequests(server) == 2
+    etcd.stop()
+    server.shutdown()
+
+
+def test_lookup_etcd_offloaded():
+
+    server = StubETCD()
+    server.set("/one", "1")
+    server.delay = 0.3
+    etcd = ETCD(server.url(), ttl=10, watch=False)
+    ticks = []
+
+    def ticker():
+        while True:
+            ticks.append(1)
+            gevent.sleep(0.01)
+
+    greenlet = gevent.spawn(ticker)
+    assert etcd.lookup("one") == "1"
+    greenlet.kill()
+    assert len(ticks) > 10
+    etcd.stop()
+    server.shutdown()
+
+
+def test_lookup_etcd_stale():
+
+    server = StubETCD()
+    server.set("/one", "1")
+    etcd = ETCD(server.url(), ttl=1, timeout=1)
+
+    assert etcd.lookup("one") == "1"
+    server.shutdown()
+    server.server_close()
+    time.sleep(1.1)
+
+    assert etcd.lookup("one") == "1"
+    with pytest.raises(NoSuchValue):
+        etcd.lookup("two")
+    etcd.stop()
+
+
+def test_lookup_etcd_concurrent():
+
+    server = StubETCD()
+    for n in range(10):
+        server.set("/%s" % (n), str(n))
+    etcd = ETCD(server.url(), ttl=10, max_keys=3)
+    assert etcd.watch_session is not etcd.session
+    errors = []
+
+    def worker(offset):
+        for n in range(50):
+            key = str((n + offset) % 10)
+            try:
+                assert etcd.lookup(key) == server.keys["/" + key][0]
+            except Exception as err:
+                errors.append(err)
+
+    def writer():
+        for n in range(50):
+            server.set("/%s" % (n % 10), str(n % 10))
+            gevent.sleep(0.001)
+
+    gevent.joinall([gevent.spawn(worker, n) for n in range(5)] + [gevent.spawn(writer)])
+    assert errors == []
+    assert len(etcd.cache) <= 3
+    etcd.stop()
+    server.shutdown()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  test_lookup_file.py
+#
+#  Copyright 2016 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+from wishbone.lookup.file import File
+from uplook.errors import NoSuchValue
+import json
+import os
+import pytest
+import time
+
+
+def write(path, content):
+
+    # Replace the file the way memory-mapped files have to be updated.
+    with open(path + ".tmp", "w") as f:
+        f.write(content)
+    os.rename(path + ".tmp", path)
+
+
+def wait(function, timeout=5):
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if function():
+                return
+        except NoSuchValue:
+            pass
+        time.sleep(0.05)
+    raise Exception("Timeout waiting for condition.")
+
+
+def test_lookup_file_json(tmpdir):
+
+    path = str(tmpdir.join("data.json"))
+    write(path, json.dumps({"one": {"two": {"three": 3}}, "four": [4]}))
+
+    f = File(path, interval=0.1)
+    assert f.lookup("one.two.three") == 3
+    assert f.lookup("one.two") == {"three": 3}
+    assert f.lookup("four") == [4]
+    with pytest.raises(NoSuchValue):
+        f.lookup("one.five")
+
+    write(path, json.dumps({"one": {"two": {"three": 33}}}))
+    wait(lambda: f.lookup("one.two.three") == 33)
+    with pytest.raises(NoSuchValue):
+        f.lookup("four")
+    f.stop()
+
+
+def test_lookup_file_yaml(tmpdir):
+
+    path = str(tmpdir.join("data.yml"))
+    write(path, "one:\n  two: 2\n3: three\n")
+
+    f = File(path, separator="/")
+    assert f.lookup("one/two") == 2
+    assert f.lookup("3") == "three"
+    f.stop()
+
+
+def test_lookup_file_csv(tmpdir):
+
+    path = str(tmpdir.join("data.csv"))
+    write(path, 'host,owner,note\na,alice,"multi\nline"\nb,bob,plain\n')
+
+    for mapped in (True, False):
+        f = File(path, mmap=mapped)
+        assert f.lookup("a") == {"host": "a", "owner": "alice", "note": "multi\nline"}
+        assert f.lookup("b") == {"host": "b", "owner": "bob", "note": "plain"}
+        f.stop()
+
+        f = File(path, key="owner", value="host", mmap=mapped)
+        assert f.lookup("bob") == "b"
+        with pytest.raises(NoSuchValue):
+            f.lookup("b")
+        f.stop()
+
+
+def test_lookup_file_csv_truncated(tmpdir):
+
+    path = str(tmpdir.join("data.csv"))
+    write(path, "host,owner\n" + "".join(["key%s,owner%s\n" % (n, n) for n in range(20000)]))
+
+    f = File(path, mmap=True, interval=60)
+    assert f.lookup("key19999") == {"host": "key19999", "owner": "owner19999"}
+
+    # Rewriting the file in place truncates the mapped file.
+    with open(path, "w") as fd:
+        fd.write("host,owner\nkey0,owner0\n")
+    with pytest.raises(NoSuchValue):
+        f.lookup("key19999")
+    f.stop()
+
+
+def test_lookup_file_reload_failure(tmpdir):
+
+    path = str(tmpdir.join("data.csv"))
+    write(path, "host,owner\na,alice\n")
+
+    f = File(path, key="owner", interval=0.1)
+    write(path, "host,name\nb,bob\n")
+    wait(lambda: f.error is not None)
+    assert f.lookup("alice") == {"host": "a", "owner": "alice"}
+
+    write(path, "host,owner\nb,bob\n")
+    wait(lambda: f.lookup("bob") == {"host": "b", "owner": "bob"})
+    assert f.error is None
+    f.stop()
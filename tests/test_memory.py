@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  test_memory.py
+#
+#  Copyright 2016 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+from wishbone.event import Event, EventPool
+from wishbone.module.tippingbucket import TippingBucket
+from wishbone.module.testevent import TestEvent
+from wishbone.actor import ActorConfig
+from wishbone.router.default import ModulePool
+from wishbone.router.memory import MemoryMonitor, deepSize, moduleSize, queueSize
+from gevent import sleep
+
+
+def test_memory_deepsize():
+
+    small = Event("x")
+    large = Event("x" * 10000)
+
+    assert deepSize(large) - deepSize(small) >= 9999
+    assert deepSize([large, large]) == deepSize([large]) + 8
+
+
+def test_memory_modulesize():
+
+    bucket = TippingBucket(ActorConfig('tippingbucket', 100, 1, {}, ""), bucket_size=1000)
+    bucket.pool.queue.inbox.disableFallThrough()
+    bucket.start()
+    empty = moduleSize(bucket)
+
+    for c in range(100):
+        bucket.pool.queue.inbox.put(Event(("%04d" % (c)) * 250))
+    sleep(0.1)
+
+    assert moduleSize(bucket) - empty > 100000
+    bucket.stop()
+
+
+def test_memory_queuesize():
+
+    actor = TestEvent(ActorConfig('input', 1000, 1, {}, ""))
+    queue = actor.pool.queue.outbox
+    queue.disableFallThrough()
+    assert queueSize(queue) == 0
+
+    for c in range(100):
+        queue.put(Event("x" * 1000))
+
+    assert queueSize(queue) == 100 * deepSize(Event("x" * 1000))
+    assert queue.size() == 100
+
+
+def test_memory_monitor():
+
+    module_pool = ModulePool()
+    module_pool.module.input = TestEvent(ActorConfig('input', 100, 1, {}, ""))
+    monitor = MemoryMonitor(module_pool, frequency=60)
+    monitor.start()
+    monitor.measure()
+    monitor.measure()
+    monitor.stop()
+
+    names = set([s.name for s in monitor.samples()])
+    assert names == set(["wishbone_memory_module_bytes", "wishbone_memory_queue_bytes", "wishbone_memory_traced_bytes"])
+    assert "other" in monitor.sources
+    assert sorted(monitor.dump()["module"]["input"]["queue"].keys()) == ["failed", "logs", "metrics", "outbox", "success"]
+
+
+def test_memory_modulesize_shared_pool():
+
+    pool = EventPool(1000)
+    for c in range(100):
+        pool.release(Event("x" * 1000))
+
+    one = TestEvent(ActorConfig('one', 100, 1, {}, "", event_pool=pool))
+    two = TestEvent(ActorConfig('two', 100, 1, {}, "", event_pool=pool))
+    one.current_event = Event("x" * 100000)
+
+    assert moduleSize(one) == moduleSize(two)
+    assert moduleSize(one) < 10000
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  test_metrics.py
+#
+#  Copyright 2016 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+from wishbone.router.default import ModulePool
+from wishbone.router.metrics import MetricsCollector, MetricsAggregator, Sample, merge
+from wishbone.router.webserver import Webserver
+from wishbone.module.testevent import TestEvent
+from wishbone.actor import ActorConfig
+from collections import namedtuple
+from gevent import sleep
+import gipc
+import json
+
+Route = namedtuple('Route', "source_module source_queue destination_module destination_queue")
+
+
+def get_collector():
+
+    module_pool = ModulePool()
+    module_pool.module.input = TestEvent(ActorConfig('input', 100, 1, {}, ""))
+    module_pool.module.input.pool.queue.outbox.disableFallThrough()
+    module_pool.module.input.pool.queue.outbox.put("one")
+    config = {"routingtable": [Route("input", "outbox", "output", "inbox")]}
+    return MetricsCollector(config, module_pool)
+
+
+def test_metrics_prometheus():
+
+    collector = get_collector()
+    collector.addProvider(lambda: [Sample("wishbone_test", "gauge", "A test.", (("name", 'a "quoted"\nvalue'),), 1)])
+    collector.refresh()
+    text = collector.text.decode("utf-8")
+
+    assert "# TYPE wishbone_queue_size gauge" in text
+    assert 'wishbone_queue_size{module="input",queue="outbox"} 1' in text
+    assert 'wishbone_queue_in_total{module="input",queue="outbox"} 1' in text
+    assert 'wishbone_test{name="a \\"quoted\\"\\nvalue"} 1' in text
+
+
+def test_metrics_json():
+
+    collector = get_collector()
+    collector.refresh()
+    data = json.loads(collector.json.decode("utf-8"))
+
+    queues = data["module"]["input"]["queue"]
+    assert sorted(queues.keys()) == ["failed", "logs", "metrics", "outbox", "success"]
+    assert queues["outbox"]["metrics"]["size"] == 1
+    assert queues["outbox"]["connection"] == {"module": "output", "queue": "inbox"}
+
+
+def test_metrics_merge():
+
+    a = [Sample("wishbone_queue_in_total", "counter", "", (("module", "input"),), 2),
+         Sample("wishbone_queue_sojourn_time", "gauge", "", (("module", "input"),), 1.0)]
+    b = [Sample("wishbone_queue_in_total", "counter", "", (("module", "input"),), 3),
+         Sample("wishbone_queue_sojourn_time", "gauge", "", (("module", "input"),), 3.0),
+         Sample("wishbone_queue_in_total", "counter", "", (("module", "output"),), 1)]
+
+    merged = dict([((s.name, s.labels), s.value) for s in merge([a, b])])
+    assert merged[("wishbone_queue_in_total", (("module", "input"),))] == 5
+    assert merged[("wishbone_queue_sojourn_time", (("module", "input"),))] == 2.0
+    assert merged[("wishbone_queue_in_total", (("module", "output"),))] == 1
+
+
+def test_metrics_aggregator():
+
+    aggregator = MetricsAggregator()
+    reader, writer = gipc.pipe()
+    aggregator.addInstance("0", reader)
+    aggregator.update("1", [Sample("wishbone_queue_in_total", "counter", "Total.", (("module", "input"),), 3)])
+    aggregator.start()
+
+    writer.put([Sample("wishbone_queue_in_total", "counter", "Total.", (("module", "input"),), 2)])
+    sleep(0.1)
+    assert 'wishbone_queue_in_total{module="input"} 5' in aggregator.text().decode("utf-8")
+    assert 'wishbone_queue_in_total{instance_id="0",module="input"} 2' in aggregator.instancesText().decode("utf-8")
+
+    writer.close()
+    sleep(0.1)
+    assert 'wishbone_queue_in_total{module="input"} 3' in aggregator.text().decode("utf-8")
+    assert list(json.loads(aggregator.json().decode("utf-8"))["instances"].keys()) == ["1"]
+    aggregator.stop()
+
+
+def test_metrics_webserver_methods():
+
+    calls = []
+    webserver = Webserver()
+    webserver.addRoute("/metrics", lambda: "metrics", "text/plain")
+    webserver.addRoute("/profile/start", lambda: calls.append(1) or "{}", "application/json", methods=("POST",))
+
+    def request(method, path):
+        status = []
+        body = webserver.application({"REQUEST_METHOD": method, "PATH_INFO": path}, lambda s, h: status.append((s, dict(h))))
+        return status[0], b"".join(body)
+
+    assert request("GET", "/metrics") == (("200 OK", {"Content-Type": "text/plain"}), b"metrics")
+    (status, headers), body = request("GET", "/profile/start")
+    assert status == "405 Method Not Allowed"
+    assert headers["Allow"] == "POST"
+    assert calls == []
+    assert request("POST", "/profile/start")[0][0] == "200 OK"
+    assert calls == [1]
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  test_module_logring.py
+#
+#  Copyright 2016 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+from wishbone.module.logring import LogRingReader
+from wishbone.actor import ActorConfig
+from wishbone.logging import LogRing, Logging
+from wishbone.router.metrics import render
+from wishbone.utils.test import getter
+
+
+def test_module_logring():
+
+    ring = LogRing(10)
+    actor_config = ActorConfig('logring', 100, 1, {}, "", loglevel=6, log_ring=ring)
+    reader = LogRingReader(actor_config)
+    reader.pool.queue.outbox.disableFallThrough()
+    reader.start()
+
+    Logging("one", ring).info("hello")
+    Logging("two", ring).info("world")
+
+    assert getter(reader.pool.queue.outbox).get().module == "one"
+    assert getter(reader.pool.queue.outbox).get().module == "two"
+    reader.stop()
+
+
+def test_module_logring_overwrite():
+
+    ring = LogRing(2)
+    logging = Logging("one", ring)
+    for message in ["one", "two", "three"]:
+        logging.info(message)
+
+    assert [e.get().message for e in ring.drain(10)] == ["two", "three"]
+    assert ring.dropped == 1
+
+
+def test_module_logring_samples():
+
+    ring = LogRing(2)
+    logging = Logging("one", ring)
+    for message in ["one", "two", "three", "four"]:
+        logging.info(message)
+
+    assert "wishbone_log_ring_dropped_total 2" in render(ring.samples())
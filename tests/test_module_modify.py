@@ -22,7 +22,7 @@
 #
 #
 
-from wishbone.event import Event
+from wishbone.event import Event, Bulk
 from wishbone.module.modify import Modify
 from wishbone.actor import ActorConfig
 from wishbone.utils.test import getter
@@ -160,3 +160,41 @@ def test_module_merge():
     a.pool.queue.inbox.put(e)
     one = getter(a.pool.queue.outbox)
     assert one.get() == ["one", "two"]
+
+
+def test_module_modify_invalid_expression():
+
+    actor_config = ActorConfig('modify', 100, 1, {}, "", loglevel=3)
+    modify = Modify(actor_config, expressions=[{"replace": ["(", "X", "@data"]}, {"uppercase": ["@data"]}])
+    modify.pool.queue.inbox.disableFallThrough()
+    modify.pool.queue.outbox.disableFallThrough()
+    modify.pool.queue.logs.disableFallThrough()
+    modify.start()
+
+    for _ in range(2):
+        modify.pool.queue.inbox.put(Event("hello"))
+        assert getter(modify.pool.queue.outbox).get() == "HELLO"
+        assert getter(modify.pool.queue.logs).get().message.startswith("Failed to process expression")
+    modify.stop()
+
+
+def test_module_modify_bulk():
+
+    actor_config = ActorConfig('modify', 100, 1, {}, "", loglevel=3)
+    modify = Modify(actor_config, expressions=[{"uppercase": ["@data.word"]}, {"set": ["hi", "@tmp.greeting"]}])
+    modify.pool.queue.inbox.disableFallThrough()
+    modify.pool.queue.outbox.disableFallThrough()
+    modify.pool.queue.logs.disableFallThrough()
+    modify.start()
+
+    bulk = Bulk()
+    for data in ({"word": "one"}, {"word": 2}, {}, {"word": "three"}):
+        bulk.append(Event(data))
+    modify.pool.queue.inbox.put(bulk)
+
+    events = list(getter(modify.pool.queue.outbox).dump())
+    assert [e.get("@data").get("word") for e in events] == ["ONE", 2, None, "THREE"]
+    assert [e.get("@tmp.greeting") for e in events] == ["hi"] * 4
+    assert [e.has("@errors.modify") for e in events] == [False, True, True, False]
+    assert "for 2 of 4 events" in getter(modify.pool.queue.logs).get().message
+    modify.stop()
@@ -26,6 +26,7 @@ from wishbone.event import Event
 from wishbone.module.roundrobin import RoundRobin
 from wishbone.actor import ActorConfig
 from wishbone.utils.test import getter
+from gevent import sleep
 
 
 def test_module_roundrobin():
@@ -54,3 +55,33 @@ def test_module_roundrobin():
     assert getter(roundrobin.pool.queue.two).get() in ["one", "two"]
 
     roundrobin.stop()
+
+
+def test_module_roundrobin_keyed():
+
+    actor_config = ActorConfig('roundrobin', 100, 1, {}, "")
+    roundrobin = RoundRobin(actor_config, key="@data.user")
+
+    roundrobin.pool.queue.inbox.disableFallThrough()
+
+    roundrobin.pool.createQueue("one")
+    roundrobin.pool.queue.one.disableFallThrough()
+
+    roundrobin.pool.createQueue("two")
+    roundrobin.pool.queue.two.disableFallThrough()
+
+    roundrobin.start()
+
+    for n in range(10):
+        roundrobin.pool.queue.inbox.put(Event({"user": "john", "n": n}))
+    sleep(0.1)
+
+    queue = roundrobin.pool.queue.one
+    if queue.size() == 0:
+        queue = roundrobin.pool.queue.two
+
+    for n in range(10):
+        assert getter(queue).get()["n"] == n
+    assert roundrobin.pool.queue.inbox.size() == 0
+
+    roundrobin.stop()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  test_modulemanager.py
+#
+#  Copyright 2016 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+from wishbone.modulemanager import ModuleManager
+from wishbone.module.funnel import Funnel
+from wishbone.error import NoSuchModule
+import pytest
+
+
+def test_modulemanager_getModuleByName():
+
+    assert ModuleManager().getModuleByName("wishbone.flow.funnel") is Funnel
+
+    with pytest.raises(NoSuchModule):
+        ModuleManager().getModuleByName("wishbone.flow.doesnotexist")
+
+
+def test_modulemanager_getModuleList():
+
+    modules = list(ModuleManager(categories=["wishbone"], groups=["flow"]).getModuleList())
+    assert ("wishbone", "flow", "funnel") in modules
+    assert modules == sorted(modules)
+
+
+def test_modulemanager_getModuleVersion():
+
+    assert ModuleManager().getModuleVersion("wishbone", "flow", "funnel") != "?"
+    assert ModuleManager().getModuleVersion("wishbone", "flow", "doesnotexist") == "?"
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  test_placement.py
+#
+#  Copyright 2016 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+from wishbone.utils.placement import partition, hasPlacement, registerChannel
+from wishbone.actor import ActorConfig
+from wishbone.event import Event, Bulk
+from wishbone.module.bridgein import BridgeIn
+from wishbone.module.bridgeout import BridgeOut
+from wishbone.utils.test import getter
+import gipc
+
+
+def route(source_module, source_queue, destination_module, destination_queue, context="configfile"):
+
+    return {"source_module": source_module,
+            "source_queue": source_queue,
+            "destination_module": destination_module,
+            "destination_queue": destination_queue,
+            "context": context}
+
+
+def get_config():
+
+    return {
+        "lookups": {},
+        "modules": {
+            "_logs": {"module": "wishbone.flow.funnel", "context": "_logs"},
+            "_metrics": {"module": "wishbone.flow.funnel", "context": "_metrics"},
+            "input": {"module": "wishbone.input.testevent", "process": None},
+            "heavy": {"module": "wishbone.function.modify", "process": "cpu"},
+            "output": {"module": "wishbone.output.stdout", "process": None}
+        },
+        "routingtable": [
+            route("input", "logs", "_logs", "input", "_logs"),
+            route("heavy", "logs", "_logs", "heavy", "_logs"),
+            route("output", "logs", "_logs", "output", "_logs"),
+            route("input", "outbox", "heavy", "inbox"),
+            route("heavy", "outbox", "output", "inbox")
+        ]
+    }
+
+
+def test_placement_partition():
+
+    config = get_config()
+    assert hasPlacement(config)
+
+    groups, channels = partition(config)
+
+    assert list(groups.keys()) == ["main", "cpu"]
+    assert sorted(groups["main"]["modules"].keys()) == ["_bridge_in_output_inbox", "_bridge_out_input_outbox", "_logs", "_metrics", "input", "output"]
+    assert sorted(groups["cpu"]["modules"].keys()) == ["_bridge_in_heavy_inbox", "_bridge_out_heavy_outbox", "_logs", "_metrics", "heavy"]
+    assert channels == [("input.outbox", "main", "cpu"), ("heavy.outbox", "cpu", "main")]
+
+    assert route("input", "outbox", "_bridge_out_input_outbox", "inbox") in groups["main"]["routingtable"]
+    assert route("_bridge_in_heavy_inbox", "outbox", "heavy", "inbox") in groups["cpu"]["routingtable"]
+    assert route("heavy", "logs", "_logs", "heavy", "_logs") in groups["cpu"]["routingtable"]
+    assert route("_bridge_in_heavy_inbox", "logs", "_logs", "_bridge_in_heavy_inbox", "_logs") in groups["cpu"]["routingtable"]
+    assert route("heavy", "logs", "_logs", "heavy", "_logs") not in groups["main"]["routingtable"]
+
+
+def test_placement_bridge():
+
+    reader, writer = gipc.pipe()
+    registerChannel("test", writer)
+    registerChannel("test_reader", reader)
+
+    outgoing = BridgeOut(ActorConfig('outgoing', 100, 1, {}, ""), "test", batch_size=2)
+    outgoing.pool.queue.inbox.disableFallThrough()
+    incoming = BridgeIn(ActorConfig('incoming', 100, 1, {}, ""), "test_reader")
+    incoming.pool.queue.outbox.disableFallThrough()
+
+    outgoing.start()
+    incoming.start()
+
+    for value in ["one", "two", "three"]:
+        outgoing.pool.queue.inbox.put(Event(value))
+
+    assert getter(incoming.pool.queue.outbox).get() == "one"
+    assert getter(incoming.pool.queue.outbox).get() == "two"
+    assert getter(incoming.pool.queue.outbox).get() == "three"
+
+    outgoing.stop()
+    incoming.stop()
+
+
+def test_placement_bridge_bulk():
+
+    reader, writer = gipc.pipe()
+    registerChannel("test_bulk", writer)
+    registerChannel("test_bulk_reader", reader)
+
+    outgoing = BridgeOut(ActorConfig('outgoing', 100, 1, {}, ""), "test_bulk", batch_size=2)
+    outgoing.pool.queue.inbox.disableFallThrough()
+    incoming = BridgeIn(ActorConfig('incoming', 100, 1, {}, ""), "test_bulk_reader")
+    incoming.pool.queue.outbox.disableFallThrough()
+
+    outgoing.start()
+    incoming.start()
+
+    bulk = Bulk(max_size=5, delimiter=",")
+    for value in ["one", "two", "three"]:
+        bulk.append(Event(value))
+    outgoing.pool.queue.inbox.put(bulk)
+    outgoing.pool.queue.inbox.put(Event("four"))
+
+    event = getter(incoming.pool.queue.outbox)
+    assert isinstance(event, Bulk)
+    assert event.max_size == 5
+    assert event.dumpFieldAsString() == "one,two,three"
+    assert getter(incoming.pool.queue.outbox).get() == "four"
+
+    outgoing.stop()
+    incoming.stop()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  test_router.py
+#
+#  Copyright 2016 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+from wishbone.actor import Actor, ActorConfig
+from wishbone.router.default import Default, ModulePool
+from wishbone.router.autoscaler import Autoscaler
+from wishbone.event import Event
+from wishbone.module.testevent import TestEvent
+from wishbone.module.null import Null
+from gevent import sleep
+import pytest
+
+
+class Slow(Actor):
+
+    def __init__(self, actor_config, delay=0.01):
+        Actor.__init__(self, actor_config)
+        self.delay = delay
+        self.pool.createQueue("inbox")
+        self.pool.createQueue("outbox")
+        self.registerConsumer(self.consume, "inbox")
+
+    def consume(self, event):
+        sleep(self.delay)
+        self.submit(event, self.pool.queue.outbox)
+
+
+def get_router(delay, drain_timeout):
+
+    router = Default(size=1000, drain_timeout=drain_timeout)
+    router.registerModule(Null, ActorConfig("output", 1000, 1, {}, ""))
+    router.registerModule(Slow, ActorConfig("slow", 1000, 1, {}, ""), {"delay": delay})
+    router.registerModule(TestEvent, ActorConfig("input", 1000, 1, {}, ""), {"interval": 0.001})
+    router.connectQueue("input.outbox", "slow.inbox")
+    router.connectQueue("slow.outbox", "output.inbox")
+    router.start()
+    sleep(0.5)
+    return router
+
+
+def test_router_drain():
+
+    router = get_router(0.01, 10)
+    slow = router.module_pool.getModule("slow")
+    assert slow.pending() > 0
+
+    router.stop()
+    report = router.drain_report
+
+    assert report["expired"] is False
+    assert report["lost"] == {"input": 0, "slow": 0, "output": 0}
+    assert report["flushed"]["slow"] > 0
+    assert report["flushed"]["output"] >= report["flushed"]["slow"]
+    assert slow.pool.queue.inbox.size() == 0
+
+
+def test_router_drain_deadline():
+
+    router = get_router(0.1, 0.5)
+    router.stop()
+    report = router.drain_report
+
+    assert report["expired"] is True
+    assert report["lost"]["slow"] > 0
+    assert report["elapsed"] < 1.5
+
+
+def test_router_autoscale():
+
+    module_pool = ModulePool()
+    module_pool.module.slow = Slow(ActorConfig("slow", 1000, 1, {}, ""), delay=0.05)
+    slow = module_pool.module.slow
+    slow.pool.queue.inbox.disableFallThrough()
+    slow.start()
+
+    autoscaler = Autoscaler(module_pool, {"slow": {"min": 2, "max": 8, "sojourn": 0.001}}, 0.1)
+    autoscaler.scale()
+    assert slow.consumerCount("inbox") == 2
+
+    for _ in range(200):
+        slow.pool.queue.inbox.put(Event("hello"))
+    sleep(0.2)
+    autoscaler.scale()
+    assert slow.consumerCount("inbox") == 4
+    autoscaler.scale()
+    assert slow.consumerCount("inbox") == 8
+    autoscaler.scale()
+    assert slow.consumerCount("inbox") == 8
+    assert autoscaler.samples()[0].value == 8
+
+    sleep(2)
+    assert slow.pool.queue.inbox.size() == 0
+    autoscaler.scale()
+    assert slow.consumerCount("inbox") == 7
+    slow.scaleConsumers("inbox", 2)
+    sleep(0.1)
+    assert slow.consumerCount("inbox") == 2
+    assert len(slow.greenlets.consumer) == 2
+    slow.stop()
+
+
+def test_router_autoscale_settings():
+
+    module_pool = ModulePool()
+    with pytest.raises(Exception):
+        Autoscaler(module_pool, {"slow": {"min": 4, "max": 2}})
+    with pytest.raises(Exception):
+        Autoscaler(module_pool, {"slow": {"min": 0, "max": 2}})
+    Autoscaler(module_pool, {"slow": {"min": 2, "max": 2}})
+
+
+def test_router_stop_lookups():
+
+    router = get_router(0.01, 0)
+    router._Default__registerLookupModule("etcd", "wishbone.lookup.etcd", {"base": "http://127.0.0.1:1/v2/keys"})
+    etcd = router.lookup_instances[0]
+    assert etcd.running is True
+
+    router.stop()
+    assert etcd.running is False
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  test_sampler.py
+#
+#  Copyright 2016 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+from wishbone.actor import ActorConfig
+from wishbone.module.null import Null
+from wishbone.utils.sampler import SamplingProfiler
+from gevent import spawn
+from timeit import default_timer
+import json
+import os
+
+
+class Busy(Null):
+
+    def spin(self, duration):
+
+        end = default_timer() + duration
+        while default_timer() < end:
+            pass
+
+
+def test_sampler_attribution():
+
+    actor = Busy(ActorConfig('busy', 100, 1, {}, ""))
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.start()
+    spawn(actor.spin, 0.3).join()
+    profiler.stop()
+
+    lines = profiler.collapsed().splitlines()
+    assert lines
+    assert any(line.startswith("busy;greenlet spin;") and "spin (test_sampler.py" in line for line in lines)
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in lines) == len(profiler.samples)
+
+
+def test_sampler_cpuprofile(tmpdir):
+
+    profiler = SamplingProfiler(interval=0.001, directory=str(tmpdir))
+    profiler.toggle()
+    Busy(ActorConfig('busy', 100, 1, {}, "")).spin(0.2)
+    profiler.toggle()
+
+    assert not profiler.running
+    collapsed, cpuprofile = ["%s/%s" % (tmpdir, f) for f in sorted(os.listdir(str(tmpdir)))]
+    assert collapsed.endswith(".collapsed")
+
+    with open(cpuprofile) as f:
+        profile = json.load(f)
+    assert len(profile["samples"]) == len(profile["timeDeltas"]) == len(profiler.samples)
+    assert sum(node["hitCount"] for node in profile["nodes"]) == len(profile["samples"])
+    assert profile["nodes"][0]["callFrame"]["functionName"] == "(root)"
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  test_tracer.py
+#
+#  Copyright 2016 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+from wishbone.actor import ActorConfig
+from wishbone.module.testevent import TestEvent
+from wishbone.module.null import Null
+from wishbone.router.metrics import traceSamples
+from wishbone.tracer import Tracer, Histogram
+from wishbone.event import Event, EventPool
+from gevent import sleep
+
+
+def test_tracer_histogram():
+
+    histogram = Histogram(buckets=(0.1, 1))
+    for value in [0.05, 0.05, 0.5, 5]:
+        histogram.add(value)
+
+    assert histogram.count == 4
+    assert histogram.cumulative() == [(0.1, 2), (1, 3), ("+Inf", 4)]
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.quantile(0.75) == 1
+
+
+def test_tracer_path():
+
+    tracer = Tracer(1)
+    source = TestEvent(ActorConfig('input', 100, 1, {}, "", tracer=tracer), interval=0.01)
+    destination = Null(ActorConfig('output', 100, 1, {}, "", tracer=tracer))
+    source.connect("outbox", destination, "inbox")
+    source.pool.queue.metrics.disableFallThrough()
+    destination.start()
+    source.start()
+    sleep(0.2)
+    source.stop()
+    destination.stop()
+
+    dump = tracer.dump()
+    assert dump["edge"][0]["source"] == "input.outbox"
+    assert dump["edge"][0]["destination"] == "output.inbox"
+    assert dump["edge"][0]["latency"]["count"] > 0
+    assert dump["consumer"][0]["module"] == "output"
+    assert dump["path"][0]["path"] == "input>output"
+
+    metrics = dict(tracer.metrics("output"))
+    assert metrics["edge.input.outbox.inbox.count"] > 0
+    assert "path.input>output.p99" in metrics
+
+    names = set([sample.name for sample in traceSamples(tracer)])
+    assert "wishbone_trace_path_seconds_bucket" in names
+
+
+def test_tracer_disabled():
+
+    tracer = Tracer(0)
+    source = TestEvent(ActorConfig('input', 100, 1, {}, "", tracer=tracer), interval=0.01)
+    destination = Null(ActorConfig('output', 100, 1, {}, "", tracer=tracer))
+    source.connect("outbox", destination, "inbox")
+    destination.start()
+    source.start()
+    sleep(0.1)
+    source.stop()
+    destination.stop()
+
+    assert tracer.dump()["edge"] == []
+
+
+def test_tracer_event_pool_debug():
+
+    tracer = Tracer(1)
+    pool = EventPool(100, debug=True)
+    source = TestEvent(ActorConfig('input', 100, 1, {}, "", event_pool=pool, tracer=tracer), interval=0.01)
+    destination = Null(ActorConfig('output', 100, 1, {}, "", event_pool=pool, tracer=tracer))
+    source.connect("outbox", destination, "inbox")
+    destination.start()
+    source.start()
+    sleep(0.2)
+
+    assert pool.stats()["released_total"] > 1
+    assert all(not worker.dead for worker in destination.greenlets.consumer)
+    source.stop()
+    destination.stop()
+
+
+def test_tracer_connected_queues():
+
+    tracer = Tracer(1)
+    source = TestEvent(ActorConfig('input', 100, 1, {}, "", tracer=tracer))
+    destination = Null(ActorConfig('output', 100, 1, {}, "", tracer=tracer))
+    source.connect("outbox", destination, "inbox")
+    source.pool.createQueue("unconnected")
+
+    event = Event("hello")
+    source.submit(event, source.pool.queue.unconnected)
+    assert "trace" not in event.data["@tmp"]
+
+    source.submit(event, source.pool.queue.outbox)
+    assert event.data["@tmp"]["trace"][2] == "input.outbox"
@@ -25,6 +25,7 @@
 from wishbone import QueuePool
 from wishbone import Queue
 from wishbone.utils.test import getter
+from gevent import sleep
 
 
 def test_listQueues():
@@ -49,3 +50,12 @@ def test_getQueue():
     q = QueuePool(1)
     q.createQueue("test")
     assert isinstance(q.getQueue("test"), Queue)
+
+
+def test_queue_sojourn_time():
+    q = Queue(10)
+    q.disableFallThrough()
+    q.put("one")
+    sleep(0.1)
+    q.get()
+    assert q.stats()["sojourn_time"] > 0.005
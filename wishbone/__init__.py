@@ -22,10 +22,33 @@
 #
 #
 
-from .actor import Actor
-from .queue import Queue
-from .queue import QueuePool
-from .logging import Logging
-from .modulemanager import ModuleManager
-# from configurationfactory import ConfigurationFactory
-from .event import Event
\ No newline at end of file
+from importlib import import_module
+
+# The public classes are imported on first access so importing a submodule
+# such as wishbone.bootstrap does not drag in gevent and friends.
+_lazy = {
+    "Actor": "wishbone.actor",
+    "Queue": "wishbone.queue",
+    "QueuePool": "wishbone.queue",
+    "Logging": "wishbone.logging",
+    "ModuleManager": "wishbone.modulemanager",
+    "Event": "wishbone.event"
+}
+
+__all__ = sorted(_lazy.keys())
+
+
+def __getattr__(name):
+
+    try:
+        module = _lazy[name]
+    except KeyError:
+        raise AttributeError("module 'wishbone' has no attribute '%s'" % (name))
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+
+    return sorted(list(globals().keys()) + __all__)
@@ -23,23 +23,28 @@
 #
 
 from wishbone.queue import QueuePool
-from wishbone.logging import Logging
+from wishbone.logging import Logging, ErrorAggregator
 from wishbone.event import Event as Wishbone_Event
 from wishbone.event import Metric
 from wishbone.event import Bulk
+from wishbone.event import EventPool
+from wishbone.event import ReleasedEvent
+from wishbone.event import compilePath
 from wishbone.error import QueueConnected, ModuleInitFailure
 from wishbone.lookup import EventLookup
 from uplook.errors import NoSuchValue
 from collections import namedtuple
-from gevent import spawn, kill
+from gevent import spawn, kill, getcurrent
 from gevent import sleep, socket
 from gevent.event import Event
 from wishbone.error import QueueFull
 from time import time
+from timeit import default_timer
 from sys import exc_info
 from uplook import UpLook
-import traceback
+from weakref import WeakKeyDictionary
 import inspect
+import re
 
 Greenlets = namedtuple('Greenlets', "consumer generic log metric")
 
@@ -58,10 +63,16 @@ class ActorConfig(object):
         frequency (int): The time in seconds to generate metrics.
         lookup (dict): A dictionary of lookup methods.
         description (str): A short free form discription of the actor instance.
+        event_pool (EventPool): The event free-list shared by all actors.
+        loglevel (int): The highest syslog level (least severe) to emit logs for.
+        error_window (int): The time in seconds identical consumer errors are collapsed into 1 log.
+        log_ring (LogRing): The process-wide log buffer to write logs to instead of the logs queue.
+        timing (bool): Measures the time each registered consumer spends per event.
+        tracer (Tracer): The tracer recording the latency of sampled events.
 
     '''
 
-    def __init__(self, name, size=100, frequency=1, lookup={}, description="A Wishbone actor."):
+    def __init__(self, name, size=100, frequency=1, lookup={}, description="A Wishbone actor.", event_pool=None, loglevel=7, error_window=5, log_ring=None, timing=False, tracer=None):
 
         '''
 
@@ -71,6 +82,12 @@ class ActorConfig(object):
             frequency (int): The time in seconds to generate metrics.
             lookup (dict): A dictionary of lookup methods.
             description (str): A short free form discription of the actor instance.
+            event_pool (EventPool): The event free-list shared by all actors.
+            loglevel (int): The highest syslog level (least severe) to emit logs for.
+            error_window (int): The time in seconds identical consumer errors are collapsed into 1 log.
+            log_ring (LogRing): The process-wide log buffer to write logs to instead of the logs queue.
+            timing (bool): Measures the time each registered consumer spends per event.
+            tracer (Tracer): The tracer recording the latency of sampled events.
 
         '''
         self.name = name
@@ -78,6 +95,15 @@ class ActorConfig(object):
         self.frequency = frequency
         self.lookup = lookup
         self.description = description
+        if event_pool is None:
+            self.event_pool = EventPool()
+        else:
+            self.event_pool = event_pool
+        self.loglevel = loglevel
+        self.error_window = error_window
+        self.log_ring = log_ring
+        self.timing = timing
+        self.tracer = tracer
 
 
 class Actor():
@@ -89,14 +115,20 @@ class Actor():
         self.size = config.size
         self.frequency = config.frequency
         self.description = config.description
+        self.event_pool = config.event_pool
 
         self.pool = QueuePool(config.size)
 
-        self.logging = Logging(config.name, self.pool.queue.logs)
+        if config.log_ring is None:
+            self.logging = Logging(config.name, self.pool.queue.logs, config.loglevel)
+        else:
+            self.logging = Logging(config.name, config.log_ring, config.loglevel)
+        self.__errors = ErrorAggregator(self.logging, config.error_window)
 
         self.__loop = True
         self.greenlets = Greenlets([], [], [], [])
         self.greenlets.metric.append(spawn(self.metricProducer))
+        self.greenlets.log.append(spawn(self.__errorFlusher))
 
         self.__run = Event()
         self.__run.clear()
@@ -105,8 +137,16 @@ class Actor():
 
         self.__children = {}
         self.__parents = {}
+        # The names of the connected queues by queue instance.
+        self.__connected = {}
 
         self.__lookups = {}
+        self.__consumer_stats = {}
+        self.__consumer_queues = []
+        self.__consumer_functions = {}
+        self.__workers = {}
+        self.__working = set()
+        self.__retire = {}
 
         self.__buildUplook()
 
@@ -131,12 +171,61 @@ class Actor():
 
         setattr(destination_module.pool.queue, destination_queue, self.pool.getQueue(source))
         self.pool.getQueue(source).disableFallThrough()
-        self.logging.debug("Connected queue %s.%s to %s.%s" % (self.name, source, destination_module.name, destination_queue))
+        self.__connected[self.pool.getQueue(source)] = source
+        self.logging.debug("Connected queue %s.%s to %s.%s", self.name, source, destination_module.name, destination_queue)
+
+    def consumed(self):
+        '''Returns the total number of events consumed from the queues with a
+        registered consumer.'''
+
+        return sum([self.pool.getQueue(queue).stats()["out_total"] for queue in self.__consumer_queues])
+
+    def consumerCount(self, queue):
+        '''Returns the number of consumers processing events from <queue>.'''
+
+        return len(self.__workers[queue]) - self.__retire[queue]
+
+    def consumerQueues(self):
+        '''Returns the names of the queues with a registered consumer.'''
+
+        return list(self.__consumer_queues)
+
+    def consumerStats(self):
+        '''Returns the timing statistics of each registered consumer by queue
+        name when timing is enabled.'''
+
+        result = {}
+        for queue, (count, total, maximum) in list(self.__consumer_stats.items()):
+            if count > 0:
+                average = total / count
+            else:
+                average = 0
+            result[queue] = {"count": count, "total_time": total, "average_time": average, "max_time": maximum}
+        return result
 
     def doEventLookup(self, name):
+        '''Returns the value of <name> from the event currently being
+        consumed by the calling consumer.  The values of all event lookups of
+        the module instance are extracted in one pass on the first lookup and
+        extracted again once the event has been modified.'''
+
+        state = self.__consuming.get(getcurrent())
+        if state is None:
+            # Not called from a consumer.
+            event = getattr(self, "current_event", None)
+        else:
+            event = state[0]
+            if name in self.__event_paths and type(event) is Wishbone_Event:
+                if state[1] != event.version:
+                    state[2] = event.extract(self.__event_paths)
+                    state[1] = event.version
+                try:
+                    return state[2][name]
+                except KeyError:
+                    pass
 
         try:
-            return self.current_event.get(name)
+            return event.get(name)
         except AttributeError:
             return ""
         except KeyError:
@@ -144,7 +233,7 @@ class Actor():
             # input module which creates its own events. Therefor there is
             # nothing to lookup yet and there for we rely up UpLook to return
             # the default value for this lookup if any.
-            self.logging.debug("There is no lookup value with name '%s' Falling back to default lookup value if any." % (name))
+            self.logging.debug("There is no lookup value with name '%s' Falling back to default lookup value if any.", name)
             raise NoSuchValue
 
     def getChildren(self, queue=None):
@@ -160,6 +249,12 @@ class Actor():
 
         return self.__loop
 
+    def pending(self):
+        '''Returns the number of events waiting in the queues with a
+        registered consumer plus the number of events being processed.'''
+
+        return len(self.__working) + sum([self.pool.getQueue(queue).size() for queue in self.__consumer_queues])
+
     def postHook(self):
 
         pass
@@ -175,7 +270,13 @@ class Actor():
         submitted to the "failed" queue,  If <function> succeeds to the
         success queue.'''
 
-        self.greenlets.consumer.append(spawn(self.__consumer, function, queue))
+        self.__consumer_queues.append(queue)
+        if self.config.timing:
+            function = self.__timeConsumer(function, queue)
+        self.__consumer_functions[queue] = function
+        self.__workers[queue] = []
+        self.__retire[queue] = 0
+        self.__spawnConsumer(queue)
 
     def start(self):
         '''Starts the module.'''
@@ -185,9 +286,51 @@ class Actor():
             self.preHook()
 
         self.__run.set()
-        self.logging.debug("Started with max queue size of %s events and metrics interval of %s seconds." % (self.size, self.frequency))
+        self.logging.debug("Started with max queue size of %s events and metrics interval of %s seconds.", self.size, self.frequency)
         self.stopped = False
 
+    def releaseEvent(self, event):
+        '''Releases <event> into the event pool when this module is the last
+        one handling it.
+
+        Should only be called by terminal modules as the very last action of
+        the consuming function.  When the <success> queue is connected the
+        event continues its journey and is therefor not released.'''
+
+        if "success" in self.__children:
+            return
+
+        if isinstance(event, Bulk):
+            for e in event.dump():
+                self.event_pool.release(e)
+        else:
+            self.event_pool.release(event)
+
+    def scaleConsumers(self, queue, amount):
+        '''Changes the number of consumers processing events from <queue> to
+        <amount>.
+
+        Idle consumers are killed immediately.  Busy consumers are retired
+        once they finished processing their current event.'''
+
+        workers = self.__workers[queue]
+        difference = amount - self.consumerCount(queue)
+
+        if difference > 0:
+            cancelled = min(difference, self.__retire[queue])
+            self.__retire[queue] -= cancelled
+            for _ in range(difference - cancelled):
+                self.__spawnConsumer(queue)
+        elif difference < 0:
+            for worker in list(workers):
+                if difference == 0:
+                    break
+                if worker not in self.__working:
+                    self.__removeConsumer(worker, queue)
+                    kill(worker)
+                    difference += 1
+            self.__retire[queue] -= difference
+
     def sendToBackground(self, function, *args, **kwargs):
         '''Executes a function and sends it to the background.
 
@@ -207,11 +350,10 @@ class Actor():
                     # obey that.
                     break
                 except Exception as err:
-                    self.logging.error("Backgrounded function '%s' of module instance '%s' caused an error. This needs attention. Restarting it in 2 seconds. Reason: %s" % (
-                        function.__name__,
-                        self.name,
-                        err)
-                    )
+                    self.logging.error("Backgrounded function '%s' of module instance '%s' caused an error. This needs attention. Restarting it in 2 seconds. Reason: %s",
+                                       function.__name__,
+                                       self.name,
+                                       err)
                     sleep(2)
 
         self.greenlets.generic.append(spawn(wrapIntoLoop))
@@ -232,6 +374,10 @@ class Actor():
         for background_job in self.greenlets.consumer:
             kill(background_job)
 
+        for background_job in self.greenlets.log:
+            kill(background_job)
+        self.__errors.flush(force=True)
+
         if hasattr(self, "postHook"):
             self.logging.debug("postHook() found, executing")
             self.postHook()
@@ -243,6 +389,9 @@ class Actor():
     def submit(self, event, queue):
         '''A convenience function which submits <event> to <queue>.'''
 
+        if self.config.tracer is not None and type(event) is Wishbone_Event:
+            self.__traceSubmit(event, queue)
+
         while self.loop():
             try:
                 queue.put(event)
@@ -255,29 +404,133 @@ class Actor():
         '''
 
         self.__run.wait()
+        tracer = self.config.tracer
+        worker = getcurrent()
 
         while self.loop():
             event = self.pool.queue.__dict__[queue].get()
+            self.__working.add(worker)
             self.current_event = event
+            self.__consuming[worker] = [event, None, None]
+            trace = None
+            if tracer is not None and isinstance(event, Wishbone_Event):
+                trace = event.data["@tmp"].get("trace")
+                if trace is not None:
+                    started = tracer.enter(trace, event, self.name, queue)
             try:
                 function(event)
-            except Exception as err:
+            except Exception:
                 exc_type, exc_value, exc_traceback = exc_info()
-                info = (traceback.extract_tb(exc_traceback)[-1][1], str(exc_type), str(exc_value))
-
-                if isinstance(event, Wishbone_Event):
+                while exc_traceback.tb_next is not None:
+                    exc_traceback = exc_traceback.tb_next
+                info = (exc_traceback.tb_lineno, str(exc_type), str(exc_value))
+
+                # <function> might have released the event into the event pool.
+                released = type(event) is ReleasedEvent
+                if released:
+                    pass
+                elif isinstance(event, Wishbone_Event):
                     event.set(info, "@errors.%s" % (self.name))
                 elif(event, Bulk):
                     event.error = info
 
-                self.logging.error("%s" % (err))
-                self.submit(event, self.pool.queue.failed)
+                self.__errors.error((function.__name__,) + info, "%s", info[2])
+                if trace is not None:
+                    tracer.exit(started, self.name, queue)
+                if not released:
+                    self.submit(event, self.pool.queue.failed)
             else:
-                self.submit(event, self.pool.queue.success)
+                if trace is not None:
+                    tracer.exit(started, self.name, queue)
+                if type(event) is not ReleasedEvent:
+                    self.submit(event, self.pool.queue.success)
+            self.__working.discard(worker)
+
+            if self.__retire[queue] > 0:
+                self.__retire[queue] -= 1
+                self.__removeConsumer(worker, queue)
+                break
+
+    def __spawnConsumer(self, queue):
+        '''Spawns an additional consumer greenthread for <queue>.'''
+
+        worker = spawn(self.__consumer, self.__consumer_functions[queue], queue)
+        self.__workers[queue].append(worker)
+        self.greenlets.consumer.append(worker)
+
+    def __removeConsumer(self, worker, queue):
+
+        self.__workers[queue].remove(worker)
+        self.greenlets.consumer.remove(worker)
+
+    def __timeConsumer(self, function, queue):
+        '''Wraps <function> into a function recording the time spent per call.'''
+
+        stats = self.__consumer_stats.setdefault(queue, [0, 0.0, 0.0])
+
+        def timedConsumer(event):
+            start = default_timer()
+            try:
+                function(event)
+            finally:
+                duration = default_timer() - start
+                stats[0] += 1
+                stats[1] += duration
+                if duration > stats[2]:
+                    stats[2] = duration
+
+        timedConsumer.__name__ = function.__name__
+        return timedConsumer
+
+    def __traceSubmit(self, event, queue):
+        '''Stamps the trace of <event> submitted to <queue>.  Events leaving
+        an input module are sampled.  Queues which are not connected drop
+        their events and are therefor ignored.'''
+
+        trace = event.data["@tmp"].get("trace")
+        if trace is None and self.__parents:
+            return
+
+        name = self.__connected.get(queue)
+        if name is None or name in ["logs", "metrics"]:
+            return
+
+        if trace is None and not self.config.tracer.sample():
+            return
+        elif trace is None:
+            self.config.tracer.start(event, self.name, name)
+        else:
+            self.config.tracer.submit(trace, event, self.name, name)
+
+    def __errorFlusher(self):
+        '''Greenthread which logs the aggregated consumer errors.'''
+
+        while self.loop():
+            sleep(1)
+            self.__errors.flush()
+
+    def __collectEventPaths(self, args):
+        '''Compiles the path of each event lookup defined in <args>.'''
+
+        for value in args.values():
+            if isinstance(value, dict):
+                self.__collectEventPaths(value)
+            elif isinstance(value, str):
+                m = re.match(r'~~?\s?(\w+?)\s?\(\s*("[^"]*"|\'[^\']*\')', value)
+                if m is not None and m.group(1) in self.config.lookup and self.__isEventLookup(m.group(1)):
+                    name = m.group(2)[1:-1]
+                    self.__event_paths[name] = compilePath(name)
+
+    def __isEventLookup(self, name):
+
+        return getattr(self.config.lookup[name], "__self__", None).__class__ == EventLookup
 
     def __buildUplook(self):
 
-        self.__current_event = {}
+        self.__event_paths = {}
+        # The event each consumer is processing and its extracted lookup
+        # values by consumer greenlet.
+        self.__consuming = WeakKeyDictionary()
         args = {}
         for key, value in list(inspect.getouterframes(inspect.currentframe())[2][0].f_locals.items()):
             if key == "self" or isinstance(value, ActorConfig):
@@ -286,11 +539,12 @@ class Actor():
                 args[key] = value
 
         uplook = UpLook(**args)
+        self.__collectEventPaths(args)
         for name in uplook.listFunctions():
             if name not in self.config.lookup:
                 raise ModuleInitFailure("A lookup function '%s' was defined but no lookup function with that name registered." % (name))
             else:
-                if self.config.lookup[name].__self__.__class__ == EventLookup:
+                if self.__isEventLookup(name):
                     uplook.registerLookup(name, self.doEventLookup)
                 else:
                     uplook.registerLookup(name, self.config.lookup[name])
@@ -315,4 +569,23 @@ class Actor():
                                     tags=())
                     event = Wishbone_Event(metric)
                     self.submit(event, self.pool.queue.metrics)
+            for queue in self.__consumer_queues:
+                metric = Metric(time=time(),
+                                type="wishbone",
+                                source=hostname,
+                                name="module.%s.consumer.%s.workers" % (self.name, queue),
+                                value=self.consumerCount(queue),
+                                unit="",
+                                tags=())
+                self.submit(Wishbone_Event(metric), self.pool.queue.metrics)
+            if self.config.tracer is not None:
+                for metric, value in self.config.tracer.metrics(self.name):
+                    metric = Metric(time=time(),
+                                    type="wishbone",
+                                    source=hostname,
+                                    name="module.%s.trace.%s" % (self.name, metric),
+                                    value=value,
+                                    unit="",
+                                    tags=())
+                    self.submit(Wishbone_Event(metric), self.pool.queue.metrics)
             sleep(self.frequency)
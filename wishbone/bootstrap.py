@@ -22,22 +22,18 @@
 #
 #
 
-import gipc
 import argparse
+import json
 import os
 import sys
 # http://stackoverflow.com/questions/4554271/how-to-avoid-excessive-stat-etc-localtime-calls-in-strftime-on-linux
 os.environ["TZ"] = ":/etc/localtime"
 
-from wishbone.router import Default
-from wishbone import ModuleManager
-from wishbone.config import ConfigFile
-from wishbone.utils import PIDFile
-from gevent import signal
-from gevent.event import Event
-from daemon import DaemonContext
-from pkg_resources import get_distribution
-from setproctitle import setproctitle
+from wishbone.utils.placement import hasPlacement, partition, registerChannel
+
+# The router, gevent, gipc and the daemon related dependencies are imported
+# by the commands requiring them so commands such as stop, list and show
+# start without paying for them.
 
 
 class BootStrap():
@@ -53,24 +49,51 @@ class BootStrap():
 
         start = subparsers.add_parser('start', description="Starts a Wishbone instance and detaches to the background.  Logs are written to syslog.")
         start.add_argument('--config', type=str, dest='config', default='wishbone.cfg', help='The Wishbone bootstrap file to load.')
+        start.add_argument('--config_cache', type=str, dest='config_cache', default=None, help='The directory to cache the validated bootstrap file in.')
         start.add_argument('--instances', type=int, dest='instances', default=1, help='The number of parallel Wishbone instances to bootstrap.')
         start.add_argument('--pid', type=str, dest='pid', default='%s/wishbone.pid' % (os.getcwd()), help='The pidfile to use.')
         start.add_argument('--queue_size', type=int, dest='queue_size', default=100, help='The queue size to use.')
         start.add_argument('--frequency', type=int, dest='frequency', default=1, help='The metric frequency.')
         start.add_argument('--id', type=str, dest='identification', default=None, help='An identification string.')
         start.add_argument('--module_path', type=str, dest='module_path', default=None, help='A comma separated list of directories to search and find Wishbone modules.')
+        start.add_argument('--event_pool', type=int, dest='event_pool', default=0, help='The number of events to keep in the event free-list for reuse. 0 disables it.')
+        start.add_argument('--log_ring', type=int, dest='log_ring', default=0, help='The size of the process-wide log ring all modules write their logs to instead of their own logs queue. 0 disables it.')
+        start.add_argument('--metrics', action="store_true", help='When enabled starts a webserver on 8088 serving the metrics of all modules in Prometheus format on /metrics.  With multiple instances the merged metrics are served and the per instance metrics on /metrics/instances.')
+        start.add_argument('--trace_rate', type=float, dest='trace_rate', default=0, help='The fraction of events (0 - 1) to trace from input to output. 0 disables tracing.')
+        start.add_argument('--drain_timeout', type=int, dest='drain_timeout', default=0, help='The max number of seconds to let modules process the queued events in topological order on stop. 0 disables draining.')
+        start.add_argument('--memory_frequency', type=int, dest='memory_frequency', default=0, help='The time in seconds between each memory measurement of all modules and queues using tracemalloc. Slows down processing considerably. 0 disables it.')
+        start.add_argument('--stall_threshold', type=float, dest='stall_threshold', default=0, help='The max time in seconds a module can block all other greenlets before the stall is logged and counted. 0 disables it.')
+        start.add_argument('--profile_dir', type=str, dest='profile_dir', default=os.getcwd(), help='The directory to write the profile files to.  Sending SIGUSR2 to an instance toggles its sampling profiler.')
 
         debug = subparsers.add_parser('debug', description="Starts a Wishbone instance in foreground and writes logs to STDOUT.")
         debug.add_argument('--config', type=str, dest='config', default='wishbone.cfg', help='The Wishbone bootstrap file to load.')
+        debug.add_argument('--config_cache', type=str, dest='config_cache', default=None, help='The directory to cache the validated bootstrap file in.')
         debug.add_argument('--instances', type=int, dest='instances', default=1, help='The number of parallel Wishbone instances to bootstrap.')
         debug.add_argument('--queue_size', type=int, dest='queue_size', default=100, help='The queue size to use.')
         debug.add_argument('--frequency', type=int, dest='frequency', default=1, help='The metric frequency.')
         debug.add_argument('--id', type=str, dest='identification', default=None, help='An identification string.')
         debug.add_argument('--module_path', type=str, dest='module_path', default=None, help='A comma separated list of directories to search and find Wishbone modules.')
+        debug.add_argument('--event_pool', type=int, dest='event_pool', default=0, help='The number of events to keep in the event free-list for reuse. 0 disables it.  Use after release is detected in debug mode.')
+        debug.add_argument('--log_ring', type=int, dest='log_ring', default=0, help='The size of the process-wide log ring all modules write their logs to instead of their own logs queue. 0 disables it.')
         debug.add_argument('--graph', action="store_true", help='When enabled starts a webserver on 8088 showing a graph of connected modules and queues.')
         debug.add_argument('--graph_include_sys', action="store_true", help='When enabled includes logs and metrics related queues modules and queues to graph layout.')
-
-        debug.add_argument('--profile', action="store_true", help='When enabled profiles the process and dumps a profile file in the current directory. The profile file can be loaded in Chrome developer tools.')
+        debug.add_argument('--metrics', action="store_true", help='When enabled starts a webserver on 8088 serving the metrics of all modules in Prometheus format on /metrics.  With multiple instances the merged metrics are served and the per instance metrics on /metrics/instances.')
+        debug.add_argument('--trace_rate', type=float, dest='trace_rate', default=0, help='The fraction of events (0 - 1) to trace from input to output. 0 disables tracing.')
+        debug.add_argument('--drain_timeout', type=int, dest='drain_timeout', default=0, help='The max number of seconds to let modules process the queued events in topological order on stop. 0 disables draining.')
+        debug.add_argument('--memory_frequency', type=int, dest='memory_frequency', default=0, help='The time in seconds between each memory measurement of all modules and queues using tracemalloc. Slows down processing considerably. 0 disables it.')
+        debug.add_argument('--stall_threshold', type=float, dest='stall_threshold', default=0, help='The max time in seconds a module can block all other greenlets before the stall is logged and counted. 0 disables it.')
+        debug.add_argument('--profile_dir', type=str, dest='profile_dir', default=os.getcwd(), help='The directory to write the profile files to.  Sending SIGUSR2 to an instance toggles its sampling profiler.')
+
+        debug.add_argument('--profile', action="store_true", help='When enabled samples the stacks of the process from the start and writes a collapsed stack file and a Chrome developer tools profile file to --profile_dir on exit.')
+
+        benchmark = subparsers.add_parser('benchmark', description="Benchmarks a Wishbone bootstrap file. Inputs are replaced by synthetic test events and outputs by counting sinks. The results are written to STDOUT in JSON format.")
+        benchmark.add_argument('--config', type=str, dest='config', default='wishbone.cfg', help='The Wishbone bootstrap file to load.')
+        benchmark.add_argument('--duration', type=int, dest='duration', default=10, help='The time in seconds each benchmark run lasts.')
+        benchmark.add_argument('--rate', type=int, dest='rate', default=0, help='The number of events per second each input generates. 0 means as fast as possible.')
+        benchmark.add_argument('--instances', type=intList, dest='instances', default=[1], help='A comma separated list of the number of parallel Wishbone instances to benchmark.')
+        benchmark.add_argument('--queue_size', type=intList, dest='queue_size', default=[100], help='A comma separated list of queue sizes to benchmark.')
+        benchmark.add_argument('--frequency', type=int, dest='frequency', default=1, help='The metric frequency.')
+        benchmark.add_argument('--module_path', type=str, dest='module_path', default=None, help='A comma separated list of directories to search and find Wishbone modules.')
 
         stop = subparsers.add_parser('stop', description="Tries to gracefully stop the Wishbone instance.")
         stop.add_argument('--pid', type=str, dest='pid', default='wishbone.pid', help='The pidfile to use.')
@@ -97,6 +120,7 @@ class Dispatch():
     def __init__(self, **kwargs):
         self.command = kwargs.get("command", None)
         self.config = kwargs.get("config", None)
+        self.config_cache = kwargs.get("config_cache", None)
         self.instances = kwargs.get("instances", None)
         self.pid = kwargs.get("pid", None)
         self.queue_size = kwargs.get("queue_size", None)
@@ -106,14 +130,25 @@ class Dispatch():
         self.graph = kwargs.get("graph", None)
         self.graph_include_sys = kwargs.get("graph_include_sys", None)
         self.profile = kwargs.get("profile", None)
+        self.profile_dir = kwargs.get("profile_dir", ".")
         self.module = kwargs.get("module", None)
+        self.event_pool = kwargs.get("event_pool", 0)
+        self.log_ring = kwargs.get("log_ring", 0)
+        self.metrics = kwargs.get("metrics", False)
+        self.trace_rate = kwargs.get("trace_rate", 0)
+        self.drain_timeout = kwargs.get("drain_timeout", 0)
+        self.memory_frequency = kwargs.get("memory_frequency", 0)
+        self.stall_threshold = kwargs.get("stall_threshold", 0)
+        self.duration = kwargs.get("duration", None)
+        self.rate = kwargs.get("rate", None)
 
         self.routers = []
+        self.aggregator = None
 
         if self.module_path is not None:
             self.__expandSearchPath(self.module_path)
 
-    def initializeRouter(self, config):
+    def initializeRouter(self, config, metrics_channel=None, **channels):
         '''Initializes a Router instance using the provided config object.
 
         This function blocks until signal(2) is received after which it
@@ -124,8 +159,20 @@ class Dispatch():
 
         Args:
             config (Wishbone.config.configfile:ConfigFile): The router configuration
+            metrics_channel (gipc handle): The handle to publish the metric snapshots to.
+            **channels: The gipc pipe handles used by the bridge modules.
         '''
 
+        from wishbone.router import Default
+        from wishbone.utils.sampler import SamplingProfiler
+        from gevent import signal
+        from gevent.event import Event
+        from setproctitle import setproctitle
+        from signal import SIGUSR2
+
+        for name, handle in list(channels.items()):
+            registerChannel(name, handle)
+
         def startRouter():
             if self.identification is not None:
                 setproctitle(self.identification)
@@ -136,7 +183,17 @@ class Dispatch():
                 frequency=self.frequency,
                 identification=self.identification,
                 graph=self.graph,
-                graph_include_sys=self.graph_include_sys
+                graph_include_sys=self.graph_include_sys,
+                event_pool=self.event_pool,
+                event_pool_debug=self.command == "debug",
+                log_ring=self.log_ring,
+                metrics=self.metrics,
+                trace_rate=self.trace_rate,
+                drain_timeout=self.drain_timeout,
+                metrics_channel=metrics_channel,
+                profiler=profiler,
+                memory_frequency=self.memory_frequency,
+                stall_threshold=self.stall_threshold
             )
 
             router.start()
@@ -147,12 +204,115 @@ class Dispatch():
         e.clear()
         signal(2, e.set)
 
+        profiler = SamplingProfiler(directory=self.profile_dir)
+        signal(SIGUSR2, profiler.toggle)
+
         if self.profile:
-            from wishbone.utils.py2devtools import Profiler
-            with Profiler():
-                startRouter()
+            profiler.start()
+        startRouter()
+        if profiler.running:
+            profiler.toggle()
+
+    def benchmark(self):
+        '''Maps to the CLI command and benchmarks the bootstrap file for each
+        combination of --instances and --queue_size.
+        '''
+
+        from wishbone.config import ConfigFile
+        from wishbone.utils.benchmark import Benchmark
+
+        router_config = ConfigFile(self.config, 'STDOUT').dump()
+        benchmark = Benchmark(router_config, self.duration, self.rate, self.frequency)
+        result = benchmark.sweep(self.instances, self.queue_size)
+        result["config"] = self.config
+        print(json.dumps(result, indent=2))
+
+    def loadConfig(self, logstyle):
+        '''Returns the router configuration of the bootstrap file using the
+        cache when --config_cache is defined.
+
+        Args:
+            logstyle (str): The log destination. STDOUT or SYSLOG
+        '''
+
+        if self.config_cache is None:
+            from wishbone.config import ConfigFile
+            return ConfigFile(self.config, logstyle, self.log_ring > 0).dump()
         else:
-            startRouter()
+            from wishbone.config import ConfigCache
+            return ConfigCache(self.config_cache).load(self.config, logstyle, self.log_ring > 0)
+
+    def placeProcesses(self, config):
+        '''Starts one process per process group defined in the bootstrap file
+        for each instance.  Routing table entries between process groups are
+        bridged using gipc pipes.
+
+        Args:
+            config (Wishbone.config.configfile:ConfigFile): The router configuration
+        '''
+
+        import gipc
+        from attrdict import AttrDict
+
+        for instance in range(self.instances):
+            groups, channels = partition(config, AttrDict)
+            handles = dict([(group, {}) for group in groups])
+            for (channel, source, destination) in channels:
+                reader, writer = gipc.pipe()
+                handles[source][channel] = writer
+                handles[destination][channel] = reader
+
+            for group, group_config in list(groups.items()):
+                self.spawnRouter(group_config, "%s.%s" % (group, instance), **handles[group])
+
+    def spawnRouter(self, config, name, **channels):
+        '''Starts a router instance in a child process.
+
+        When --metrics is enabled the instance publishes its metric
+        snapshots to the parent process which serves the merged view.
+
+        Args:
+            config (Wishbone.config.configfile:ConfigFile): The router configuration
+            name (str): The name identifying the instance in the metrics.
+            **channels: The gipc pipe handles used by the bridge modules.
+        '''
+
+        import gipc
+
+        if self.metrics:
+            if self.aggregator is None:
+                from wishbone.router.metrics import MetricsAggregator
+                self.aggregator = MetricsAggregator()
+            reader, writer = gipc.pipe()
+            self.aggregator.addInstance(name, reader)
+            channels["metrics_channel"] = writer
+
+        self.routers.append(
+            gipc.start_process(
+                self.initializeRouter,
+                args=(config, ),
+                kwargs=channels,
+                daemon=True
+            )
+        )
+
+    def serveMetrics(self):
+        '''Serves the merged metrics of all router instances started using
+        <spawnRouter()> on /metrics and the per instance breakdown on
+        /metrics/instances.
+        '''
+
+        if self.aggregator is None:
+            return
+
+        from wishbone.router.webserver import Webserver
+
+        webserver = Webserver()
+        webserver.addRoute("/metrics", self.aggregator.text, "text/plain; version=0.0.4")
+        webserver.addRoute("/metrics/instances", self.aggregator.instancesText, "text/plain; version=0.0.4")
+        webserver.addRoute("/metrics.json", self.aggregator.json, "application/json")
+        self.aggregator.start()
+        webserver.start()
 
     def bootstrapBlock(self):
         '''Helper function which blocks untill all running routers have stopped.
@@ -170,8 +330,16 @@ class Dispatch():
         '''Generates the Wishbone ascii header.
         '''
 
+        try:
+            from importlib.metadata import version
+        except ImportError:
+            from pkg_resources import get_distribution
+            version = get_distribution('wishbone').version
+        else:
+            version = version('wishbone')
+
         with open("%s/data/banner.tmpl" % (os.path.dirname(__file__))) as f:
-            template = ''.join(f.readlines()).format(version=get_distribution('wishbone').version)
+            template = ''.join(f.readlines()).format(version=version)
 
         return template
 
@@ -179,30 +347,34 @@ class Dispatch():
         '''Maps to the CLI command and starts Wishbone in foreground.
         '''
 
-        router_config = ConfigFile(self.config, 'STDOUT').dump()
+        router_config = self.loadConfig('STDOUT')
+
+        if hasPlacement(router_config):
+            self.placeProcesses(router_config)
+            pids = [str(p.pid) for p in self.routers]
+            print(("\nInstances started in foreground with pid %s\n" % (", ".join(pids))))
+            self.serveMetrics()
+            self.bootstrapBlock()
 
-        if self.instances == 1:
+        elif self.instances == 1:
             sys.stdout.write("\nInstance started in foreground with pid %s\n" % (os.getpid()))
             self.initializeRouter(router_config)
 
         else:
             for instance in range(self.instances):
-                self.routers.append(
-                    gipc.start_process(
-                        self.initializeRouter,
-                        args=(router_config, ),
-                        daemon=True
-                    )
-                )
+                self.spawnRouter(router_config, str(instance))
 
             pids = [str(p.pid) for p in self.routers]
             print(("\nInstances started in foreground with pid %s\n" % (", ".join(pids))))
+            self.serveMetrics()
             self.bootstrapBlock()
 
     def list(self):
         '''Maps to the CLI command and lists all Wishbone entrypoint modules it can find.
         '''
 
+        from wishbone.modulemanager import ModuleManager
+
         categories = ["wishbone", "wishbone_contrib"]
         groups = ["flow", "encode", "decode", "function", "input", "output"]
 
@@ -217,6 +389,8 @@ class Dispatch():
         '''Maps to the CLI command and shows the docstring of the Wishbone module.
         '''
 
+        from wishbone.modulemanager import ModuleManager
+
         module_manager = ModuleManager()
         module_manager.validateModuleName(self.module)
         module_manager.exists(self.module)
@@ -250,28 +424,32 @@ class Dispatch():
         '''Maps to the CLI command and starts one or more Wishbone processes in background.
         '''
 
-        router_config = ConfigFile(self.config, 'SYSLOG').dump()
+        from daemon import DaemonContext
+        from wishbone.utils import PIDFile
+
+        router_config = self.loadConfig('SYSLOG')
         pid_file = PIDFile(self.pid)
 
         with DaemonContext(stdout=sys.stdout, stderr=sys.stderr, detach_process=True):
-            if self.instances == 1:
+            if hasPlacement(router_config):
+                self.placeProcesses(router_config)
+                pids = [str(p.pid) for p in self.routers]
+                print(("\nInstances started in foreground with pid %s\n" % (", ".join(pids))))
+                pid_file.create(pids)
+                self.serveMetrics()
+            elif self.instances == 1:
                 sys.stdout.write("\nWishbone instance started with pid %s\n" % (os.getpid()))
                 sys.stdout.flush()
                 pid_file.create([os.getpid()])
                 self.initializeRouter(router_config)
             else:
                 for instance in range(self.instances):
-                    self.routers.append(
-                        gipc.start_process(
-                            self.initializeRouter,
-                            args=(router_config, ),
-                            daemon=True
-                        )
-                    )
+                    self.spawnRouter(router_config, str(instance))
 
                 pids = [str(p.pid) for p in self.routers]
                 print(("\nInstances started in foreground with pid %s\n" % (", ".join(pids))))
                 pid_file.create(pids)
+                self.serveMetrics()
 
             self.bootstrapBlock()
 
@@ -279,6 +457,8 @@ class Dispatch():
         '''Maps to the CLI command and stop the running Wishbone processes.
         '''
 
+        from wishbone.utils import PIDFile
+
         try:
             pid = PIDFile(self.pid)
             sys.stdout.write("Stopping instance with PID ")
@@ -298,6 +478,12 @@ class Dispatch():
             sys.path.append(d.strip())
 
 
+def intList(value):
+    '''Converts a comma separated string into a list of integers.'''
+
+    return [int(v) for v in value.split(',')]
+
+
 def main():
     try:
         BootStrap()
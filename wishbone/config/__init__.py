@@ -23,4 +23,4 @@
 #
 
 
-from .configfile import ConfigFile
+from .configfile import ConfigFile, ConfigCache
@@ -23,9 +23,18 @@
 #
 
 import yaml
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
 #from wishbone.external.attrdict import AttrDict
 from attrdict import AttrDict
-from jsonschema import validate
+from hashlib import sha256
+import json
+import os
+import pickle
+import stat
+import tempfile
 
 SCHEMA = {
     "type": "object",
@@ -41,6 +50,24 @@ SCHEMA = {
                         },
                         "arguments": {
                             "type": "object"
+                        },
+                        "cache": {
+                            "type": "object",
+                            "properties": {
+                                "max_entries": {
+                                    "type": "integer",
+                                    "minimum": 1
+                                },
+                                "ttl": {
+                                    "type": "number",
+                                    "minimum": 0
+                                },
+                                "negative_ttl": {
+                                    "type": "number",
+                                    "minimum": 0
+                                }
+                            },
+                            "additionalProperties": False
                         }
                     },
                     "required": ["module"],
@@ -62,6 +89,40 @@ SCHEMA = {
                         },
                         "arguments": {
                             "type": "object"
+                        },
+                        "loglevel": {
+                            "type": "integer",
+                            "minimum": 0,
+                            "maximum": 7
+                        },
+                        "process": {
+                            "type": "string"
+                        },
+                        "autoscale": {
+                            "type": "object",
+                            "properties": {
+                                "min": {
+                                    "type": "integer",
+                                    "minimum": 1
+                                },
+                                "max": {
+                                    "type": "integer",
+                                    "minimum": 1
+                                },
+                                "sojourn": {
+                                    "type": "number",
+                                    "minimum": 0
+                                }
+                            },
+                            "required": ["max"],
+                            "additionalProperties": False
+                        },
+                        "replicas": {
+                            "type": "integer",
+                            "minimum": 1
+                        },
+                        "replica_key": {
+                            "type": "string"
                         }
                     },
                     "required": ["module"],
@@ -80,30 +141,56 @@ SCHEMA = {
 
 class ConfigFile(object):
 
-    def __init__(self, filename, logstyle):
+    def __init__(self, filename, logstyle, log_ring=False):
         self.logstyle = logstyle
+        self.log_ring = log_ring
         self.config = AttrDict({"lookups": AttrDict({}), "modules": AttrDict({}), "routingtable": []})
+        self.__connected = {}
+        self.__replicas = {}
         self.__addLogFunnel()
         self.__addMetricFunnel()
         self.load(filename)
 
-    def addModule(self, name, module, arguments={}, description="", context="configfile"):
+    def addModule(self, name, module, arguments={}, description="", context="configfile", loglevel=7, process=None, autoscale=None):
 
         if name.startswith('_'):
             raise Exception("Module instance names cannot start with _.")
 
+        if autoscale is not None and autoscale.get("min", 1) > autoscale["max"]:
+            raise Exception("The autoscale min of module instance '%s' cannot be larger than max." % (name))
+
         if name not in self.config["modules"]:
-            self.config["modules"][name] = AttrDict({'description': description, 'module': module, 'arguments': arguments, 'context': context})
-            self.addConnection(name, "logs", "_logs", name, context="_logs")
+            self.config["modules"][name] = AttrDict({'description': description, 'module': module, 'arguments': arguments, 'context': context, 'loglevel': loglevel, 'process': process, 'autoscale': autoscale})
+            if not self.log_ring:
+                self.addConnection(name, "logs", "_logs", name, context="_logs")
             self.addConnection(name, "metrics", "_metrics", name, context="_metrics")
 
         else:
             raise Exception("Module instance name '%s' is already taken." % (name))
 
-    def addLookup(self, name, module, arguments={}):
+    def addReplicas(self, name, replicas, replica_key=None, **settings):
+        '''Adds <replicas> instances of module instance <name> named
+        <name>_1 up to <name>_<replicas>.
+
+        Routes to and from <name> are connected to a wishbone.flow.roundrobin
+        instance distributing the events over the replicas and a
+        wishbone.flow.funnel instance merging the events of the replicas.
+        When <replica_key> is defined, events with the same value for that
+        key are always submitted to the same replica.'''
+
+        if name in self.__replicas or name in self.config["modules"]:
+            raise Exception("Module instance name '%s' is already taken." % (name))
+
+        self.__replicas[name] = (replicas, replica_key)
+        for n in range(1, replicas + 1):
+            replica = "%s_%s" % (name, n)
+            self.addModule(name=replica, **settings)
+            self.config["modules"][replica]["replica_of"] = name
+
+    def addLookup(self, name, module, arguments={}, cache=None):
 
         if name not in self.config["lookups"]:
-            self.config["lookups"][name] = AttrDict({"module": module, "arguments": arguments})
+            self.config["lookups"][name] = AttrDict({"module": module, "arguments": arguments, "cache": cache})
         else:
             raise Exception("Uplook instance name '%s' is already taken." % (name))
 
@@ -113,6 +200,9 @@ class ConfigFile(object):
 
         if not connected:
             self.config["routingtable"].append(AttrDict({"source_module": source_module, "source_queue": source_queue, "destination_module": destination_module, "destination_queue": destination_queue, "context": context}))
+            description = "Queue '%s.%s' is already connected to '%s.%s'" % (source_module, source_queue, destination_module, destination_queue)
+            self.__connected.setdefault((source_module, source_queue), description)
+            self.__connected.setdefault((destination_module, destination_queue), description)
         else:
             raise Exception("Cannot connect '%s.%s' to '%s.%s'. Reason: %s." % (source_module, source_queue, destination_module, destination_queue, connected))
 
@@ -131,20 +221,63 @@ class ConfigFile(object):
                 self.addLookup(name=lookup, **config["lookups"][lookup])
 
         for module in config["modules"]:
-            self.addModule(name=module, **config["modules"][module])
+            settings = dict(config["modules"][module])
+            replicas = settings.pop("replicas", 1)
+            replica_key = settings.pop("replica_key", None)
+            if replicas > 1:
+                self.addReplicas(module, replicas, replica_key, **settings)
+            else:
+                self.addModule(name=module, **settings)
 
         for route in config["routingtable"]:
             sm, sq, dm, dq = self.__splitRoute(route)
+            if sm in self.__replicas:
+                sm, sq = self.__addReplicaFunnel(sm, sq)
+            if dm in self.__replicas:
+                dm, dq = self.__addReplicaFront(dm, dq)
             self.addConnection(sm, sq, dm, dq)
 
         getattr(self, "_setupLogging%s" % (self.logstyle.upper()))()
 
+    def __addReplicaFront(self, name, queue):
+        '''Adds the module instance distributing the events submitted to
+        <name>.<queue> over the replicas and returns its inbox.'''
+
+        (replicas, replica_key) = self.__replicas[name]
+        front = "%s_%s_front" % (name, queue)
+        if replica_key is None:
+            arguments = {}
+        else:
+            arguments = {"key": replica_key}
+
+        self.addModule(front, "wishbone.flow.roundrobin", arguments, "Distributes the events over the replicas of %s." % (name))
+        self.config["modules"][front]["replica_of"] = name
+        self.config["modules"][front]["replica_queue"] = queue
+        for n in range(1, replicas + 1):
+            replica = "%s_%s" % (name, n)
+            self.addConnection(front, replica, replica, queue, context="replica")
+        return front, "inbox"
+
+    def __addReplicaFunnel(self, name, queue):
+        '''Adds the module instance merging the events the replicas submit
+        to <queue> and returns its outbox.'''
+
+        (replicas, replica_key) = self.__replicas[name]
+        funnel = "%s_%s_funnel" % (name, queue)
+
+        self.addModule(funnel, "wishbone.flow.funnel", {}, "Merges the events of the replicas of %s." % (name))
+        self.config["modules"][funnel]["replica_of"] = name
+        self.config["modules"][funnel]["replica_queue"] = queue
+        for n in range(1, replicas + 1):
+            replica = "%s_%s" % (name, n)
+            self.addConnection(replica, queue, funnel, replica, context="replica")
+        return funnel, "outbox"
+
     def __queueConnected(self, module, queue):
+        '''Returns a description of the connection <module>.<queue> is part
+        of or False when not connected.'''
 
-        for c in self.config["routingtable"]:
-            if (c["source_module"] == module and c["source_queue"] == queue) or (c["destination_module"] == module and c["destination_queue"] == queue):
-                return "Queue '%s.%s' is already connected to '%s.%s'" % (c["source_module"], c["source_queue"], c["destination_module"], c["destination_queue"])
-        return False
+        return self.__connected.get((module, queue), False)
 
     def __splitRoute(self, route):
 
@@ -158,7 +291,7 @@ class ConfigFile(object):
 
         try:
             with open(filename, 'r') as f:
-                config = yaml.load(f)
+                config = yaml.load(f, Loader=SafeLoader)
         except Exception as err:
             raise Exception("Failed to load bootstrap file.  Reason: %s" % (err))
         else:
@@ -166,6 +299,8 @@ class ConfigFile(object):
 
     def __validate(self, config):
 
+        from jsonschema import validate
+
         try:
             validate(config, SCHEMA)
         except Exception as err:
@@ -180,7 +315,10 @@ class ConfigFile(object):
 
     def __addLogFunnel(self):
 
-        self.config["modules"]["_logs"] = AttrDict({'description': "Centralizes the logs of all modules.", 'module': "wishbone.flow.funnel", "arguments": {}, "context": "_logs"})
+        if self.log_ring:
+            self.config["modules"]["_logs"] = AttrDict({'description': "Centralizes the logs of all modules.", 'module': "wishbone.input.logring", "arguments": {}, "context": "_logs"})
+        else:
+            self.config["modules"]["_logs"] = AttrDict({'description': "Centralizes the logs of all modules.", 'module': "wishbone.flow.funnel", "arguments": {}, "context": "_logs"})
 
     def __addMetricFunnel(self):
 
@@ -200,3 +338,95 @@ class ConfigFile(object):
             self.config["modules"]["_logs_syslog"] = AttrDict({'description': "Writes all incoming messags to syslog.", 'module': "wishbone.output.syslog", "arguments": {}, "context": "_logs"})
             self.addConnection("_logs", "outbox", "_logs_syslog", "inbox", context="_logs")
 
+
+
+class ConfigCache(object):
+
+    '''
+    Caches the validated and normalized router configuration of bootstrap
+    files.
+
+    The cache entry of a bootstrap file is keyed by the sha256 hash of its
+    content, the options influencing the resulting configuration, the
+    installed wishbone version and the source of this module.  When an entry
+    exists, loading the bootstrap file skips YAML parsing and schema
+    validation entirely.  A missing or corrupt entry falls back to
+    ConfigFile.
+
+    Entries are unpickled so the cache directory has to be owned by the
+    current user and may not be writable by group or others.  Entries not
+    satisfying the same conditions are ignored.
+
+    Args:
+        directory (str): The directory to store the cache entries in.
+    '''
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def key(self, content, logstyle, log_ring=False):
+        '''Returns the cache key of bootstrap file <content> loaded with
+        <logstyle> and <log_ring>.'''
+
+        h = sha256(content)
+        h.update(json.dumps(SCHEMA, sort_keys=True).encode("utf-8"))
+        h.update(("%s:%s" % (logstyle, log_ring)).encode("utf-8"))
+        h.update(self.__version().encode("utf-8"))
+        with open(__file__, 'rb') as f:
+            h.update(f.read())
+        return h.hexdigest()
+
+    def load(self, filename, logstyle, log_ring=False):
+        '''Returns the dumped router configuration of <filename> from
+        cache or from ConfigFile in which case the result is cached.'''
+
+        try:
+            with open(filename, 'rb') as f:
+                content = f.read()
+        except Exception as err:
+            raise Exception("Failed to load bootstrap file.  Reason: %s" % (err))
+
+        if os.path.isdir(self.directory) and not self.__trusted(self.directory):
+            raise Exception("Config cache directory '%s' must be owned by the current user and not be writable by group or others." % (self.directory))
+
+        path = os.path.join(self.directory, "%s.pickle" % (self.key(content, logstyle, log_ring)))
+
+        try:
+            with open(path, 'rb') as f:
+                if self.__trusted(f.fileno()):
+                    return pickle.load(f)
+        except Exception:
+            pass
+
+        config = ConfigFile(filename, logstyle, log_ring).dump()
+        self.__store(path, config)
+        return config
+
+    def __store(self, path, config):
+
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory, 0o700)
+
+        (fd, temp) = tempfile.mkstemp(dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(config, f, pickle.HIGHEST_PROTOCOL)
+            os.rename(temp, path)
+        except Exception:
+            os.remove(temp)
+            raise
+
+    def __trusted(self, path):
+        '''Returns True when <path> is owned by the current user and not
+        writable by group or others.'''
+
+        s = os.stat(path)
+        return s.st_uid == os.getuid() and not s.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+    def __version(self):
+
+        try:
+            from importlib.metadata import version
+            return version("wishbone")
+        except Exception:
+            return "unknown"
@@ -83,8 +83,14 @@ class BulkFull(Exception):
 class InvalidData(Exception):
     pass
 
+
 class InvalidModule(Exception):
     pass
 
+
 class ModuleNotReady(Exception):
     pass
+
+
+class EventReleased(Exception):
+    pass
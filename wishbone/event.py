@@ -22,12 +22,37 @@
 #
 #
 
-import arrow
+import sys
 import time
-from wishbone.error import BulkFull, InvalidData
+from wishbone.error import BulkFull, InvalidData, EventReleased
 
 EVENT_RESERVED = ["@timestamp", "@version", "@data", "@tmp", "@errors"]
 
+PATH_CACHE_SIZE = 10000
+_paths = {}
+
+
+def compilePath(key):
+    '''
+    Returns the tuple of path elements of the dotted <key>.  The root of the
+    event is an empty tuple.  Compiled paths are cached.
+
+    :param str key: The dotted name of the key.
+    :return: tuple
+    '''
+
+    try:
+        return _paths[key]
+    except KeyError:
+        if key is None or key == "" or key == ".":
+            path = ()
+        else:
+            path = tuple(key.split('.'))
+        if len(_paths) >= PATH_CACHE_SIZE:
+            _paths.clear()
+        _paths[key] = path
+        return path
+
 
 class Bulk(object):
 
@@ -186,10 +211,14 @@ class Event(object):
 
     A class object containing the event data being passed from one Wishbone
     module to the other.
+
+    <version> is incremented each time the event is modified using <set> or
+    <delete>.
     '''
 
     def __init__(self, data=None):
 
+        self.version = 0
         self.data = {
             "@timestamp": time.time(),
             "@version": 1,
@@ -231,6 +260,7 @@ class Event(object):
         if s[0] in EVENT_RESERVED and len(s) == 1:
             raise Exception("Cannot delete root of reserved keyword '%s'." % (key))
 
+        self.version += 1
         if key is None:
             self.data = None
         else:
@@ -264,23 +294,33 @@ class Event(object):
         :return: The value of <key>
         '''
 
-        def travel(path, d):
+        value = self.data
+        for element in compilePath(key):
+            if isinstance(value, dict) and element in value:
+                value = value[element]
+            else:
+                raise KeyError(key)
+        return value
+
+    def extract(self, paths):
+        '''
+        Returns the values of multiple keys in one pass.
 
-            if len(path) == 1:
-                if isinstance(d, dict):
-                    return d[path[0]]
+        :param dict paths: The names mapped to their path as returned by <compilePath>.
+        :return: A dict with the value of each name which exists in the event.
+        '''
+
+        result = {}
+        for name, path in paths.items():
+            value = self.data
+            for element in path:
+                if isinstance(value, dict) and element in value:
+                    value = value[element]
                 else:
-                    raise Exception()
+                    break
             else:
-                return travel(path[1:], d[path[0]])
-        if key is None or key is "" or key is ".":
-            return self.data
-        else:
-            try:
-                path = key.split('.')
-                return travel(path, self.data)
-            except:
-                raise KeyError(key)
+                result[name] = value
+        return result
 
     def has(self, key="@data"):
         '''
@@ -305,14 +345,31 @@ class Event(object):
         :param str key: The name of the key to assign <value> to.
         '''
 
-        if key.startswith('@') and key.split('.')[0] not in EVENT_RESERVED:
+        path = compilePath(key)
+        if not path:
+            path = tuple(key.split('.'))
+        if key.startswith('@') and path[0] not in EVENT_RESERVED:
             raise Exception("Keys starting with @ are reserved.")
-        result = value
-        for name in reversed(key.split('.')):
-            result = {name: result}
-
-        self.dict_merge(self.data, result)
-        # self.data.update(result)
+        self.version += 1
+
+        # Walks down the existing dicts and merges <value> the same way as
+        # merging {path[0]: {path[1]: ... value}} into the event would.
+        d = self.data
+        for n, name in enumerate(path[:-1]):
+            if name in d and isinstance(d[name], dict):
+                d = d[name]
+            else:
+                result = value
+                for name in reversed(path[n + 1:]):
+                    result = {name: result}
+                d[path[n]] = result
+                return
+
+        name = path[-1]
+        if name in d and isinstance(d[name], dict) and isinstance(value, dict):
+            self.dict_merge(d[name], value)
+        else:
+            d[name] = value
 
     def dump(self, complete=False, convert_timestamp=True):
         '''
@@ -324,13 +381,16 @@ class Event(object):
         :rtype: dict
         '''
 
+        # An <Arrow> instance can only exist when arrow has been imported by
+        # the module which created it so there's no need to import it here.
+        arrow = sys.modules.get("arrow")
         d = {}
         for key, value in list(self.data.items()):
             if key == "@tmp" and not complete:
                 continue
             if key == "@errors" and not complete:
                 continue
-            elif isinstance(value, arrow.arrow.Arrow) and convert_timestamp:
+            elif arrow is not None and isinstance(value, arrow.Arrow) and convert_timestamp:
                 d[key] = str(value)
             else:
                 d[key] = value
@@ -380,3 +440,133 @@ class Event(object):
             return out
         else:
             return org
+
+
+class ReleasedEvent(Event):
+
+    '''
+    The class an event is switched to after being released into an
+    <EventPool> running in debug mode.  Any access to the event raises
+    <EventReleased>.
+    '''
+
+    def __getattribute__(self, name):
+
+        if name == "__class__":
+            return object.__getattribute__(self, name)
+        raise EventReleased("Event accessed after it was released into the event pool.")
+
+    def __setattr__(self, name, value):
+
+        raise EventReleased("Event modified after it was released into the event pool.")
+
+
+class EventPool(object):
+
+    '''
+    A free-list of <Event> objects.
+
+    Input modules acquire events from the pool and terminal modules release
+    them back once they are done with them.  Reusing events and their
+    internal dicts avoids allocating new container objects for each message
+    which keeps the garbage collector quiet at high event rates.
+
+    A pool with <size> 0 is disabled. Acquiring then simply returns a new
+    <Event> and releasing is a noop.
+
+    When <debug> is True released events are switched to <ReleasedEvent>
+    until they are acquired again so any use after release raises
+    <EventReleased>.  Releasing the same event twice raises too.
+
+    Args:
+        size (int): The max number of events kept in the free-list.
+        debug (bool): Enables the use-after-release safety checks.
+    '''
+
+    def __init__(self, size=0, debug=False):
+
+        self.size = size
+        self.debug = debug
+        self.__free = []
+        self.__allocated = 0
+        self.__reused = 0
+        self.__released = 0
+        self.__discarded = 0
+
+    def acquire(self, data=None):
+        '''
+        Returns an <Event> containing <data>, reusing a released one if
+        available.
+
+        :param data: The value to store in @data.
+        :return: An <Event> instance.
+        '''
+
+        try:
+            event = self.__free.pop()
+        except IndexError:
+            self.__allocated += 1
+            return Event(data)
+
+        if self.debug:
+            object.__setattr__(event, "__class__", Event)
+        self.__reused += 1
+        self.__reset(event, data)
+        return event
+
+    def release(self, event):
+        '''
+        Hands <event> back to the pool.  The caller should not hold any
+        reference to <event> anymore.
+
+        :param event: The <Event> instance to release.
+        '''
+
+        if self.size == 0:
+            return
+
+        if type(event) is ReleasedEvent:
+            raise EventReleased("Event released twice into the event pool.")
+
+        if len(self.__free) < self.size:
+            self.__released += 1
+            self.__free.append(event)
+            if self.debug:
+                object.__setattr__(event, "__class__", ReleasedEvent)
+        else:
+            self.__discarded += 1
+
+    def stats(self):
+        '''
+        Returns statistics of the pool.
+        '''
+
+        return {"free": len(self.__free),
+                "allocated_total": self.__allocated,
+                "reused_total": self.__reused,
+                "released_total": self.__released,
+                "discarded_total": self.__discarded
+                }
+
+    def __reset(self, event, data):
+
+        event.version += 1
+        d = event.data
+        if not isinstance(d, dict):
+            event.data = Event(data).data
+            return
+
+        if len(d) != len(EVENT_RESERVED):
+            for key in list(d.keys()):
+                if key not in EVENT_RESERVED:
+                    del(d[key])
+
+        d["@timestamp"] = time.time()
+        d["@version"] = 1
+        d["@data"] = data
+
+        for key in ("@tmp", "@errors"):
+            if isinstance(d.get(key), dict):
+                d[key].clear()
+            else:
+                d[key] = {}
@@ -28,6 +28,7 @@ from wishbone.event import Event, Log
 from wishbone.error import QueueFull
 from time import time
 from os import getpid
+from collections import deque
 
 
 class MockLogger():
@@ -51,19 +52,82 @@ class MockLogger():
             self.l.Logging.__log(self.level, line.rstrip())
 
 
+class LogRing():
+
+    '''
+    A process-wide buffer holding the log events of all modules.
+
+    All <Logging> instances of a process can write into the same ring
+    instead of into their own module's logs queue.  A single reader drains
+    the ring in batches.  When the ring is full the oldest log events are
+    overwritten and counted as dropped.
+
+    Args:
+        size (int): The max number of log events the ring holds.
+    '''
+
+    def __init__(self, size=10000):
+        self.size = size
+        self.dropped = 0
+        self.__ring = deque(maxlen=size)
+
+    def __len__(self):
+
+        return len(self.__ring)
+
+    def put(self, event):
+        '''Adds <event> to the ring.'''
+
+        if len(self.__ring) == self.size:
+            self.dropped += 1
+        self.__ring.append(event)
+
+    def drain(self, amount):
+        '''Returns a generator returning up to <amount> of the oldest log
+        events from the ring.'''
+
+        ring = self.__ring
+        while amount > 0 and ring:
+            yield ring.popleft()
+            amount -= 1
+
+    def samples(self):
+        '''Returns the ring statistics as a list of <Sample> instances.'''
+
+        from wishbone.router.metrics import Sample
+
+        return [
+            Sample("wishbone_log_ring_dropped_total", "counter", "The number of log events overwritten before being read from the log ring.", (), self.dropped)
+        ]
+
+
 class Logging():
 
     '''
     Generates Wishbone formatted log messages following the Syslog priority
     definition.
+
+    Messages with a level higher than <level> are discarded before anything
+    is allocated.  Any additional positional arguments are applied to
+    <message> using the % operator but only when the message is actually
+    emitted.
+
+    Args:
+        name (str): The name of the module generating the logs.
+        q (wishbone.Queue): The queue to submit the log events to.
+        level (int): The highest syslog level to emit logs for.
     '''
 
-    def __init__(self, name, q):
+    def __init__(self, name, q, level=7):
         self.name = name
         self.logs = q
+        self.level = level
         self.__queue_full_message = False
 
-    def __log(self, level, message):
+    def __log(self, level, message, args=()):
+
+        if args:
+            message = message % args
 
         event = Event(Log(time(), level, getpid(), self.name, message))
         try:
@@ -77,45 +141,95 @@ class Logging():
     def emergency(self, message, *args, **kwargs):
         """Generates a log message with priority emergency(0).
         """
-        self.__log(0, message)
+        if self.level >= 0:
+            self.__log(0, message, args)
     emerg = emergency
     exception = emergency
 
     def alert(self, message, *args, **kwargs):
         """Generates a log message with priority alert(1).
         """
-        self.__log(1, message)
+        if self.level >= 1:
+            self.__log(1, message, args)
 
     def critical(self, message, *args, **kwargs):
         """Generates a log message with priority critical(2).
         """
-        self.__log(2, message)
+        if self.level >= 2:
+            self.__log(2, message, args)
     crit = critical
 
     def error(self, message, *args, **kwargs):
         """Generates a log message with priority error(3).
         """
-        self.__log(3, message, *args, **kwargs)
+        if self.level >= 3:
+            self.__log(3, message, args)
     err = error
 
     def warning(self, message, *args, **kwargs):
         """Generates a log message with priority warning(4).
         """
-        self.__log(4, message, *args, **kwargs)
+        if self.level >= 4:
+            self.__log(4, message, args)
     warn = warning
 
     def notice(self, message, *args, **kwargs):
         """Generates a log message with priority notice(5).
         """
-        self.__log(5, message)
+        if self.level >= 5:
+            self.__log(5, message, args)
 
     def informational(self, message, *args, **kwargs):
         """Generates a log message with priority informational(6).
         """
-        self.__log(6, message)
+        if self.level >= 6:
+            self.__log(6, message, args)
     info = informational
 
     def debug(self, message, *args, **kwargs):
         """Generates a log message with priority debug(7).
         """
-        self.__log(7, message)
+        if self.level >= 7:
+            self.__log(7, message, args)
+
+
+class ErrorAggregator():
+
+    '''
+    Collapses identical error logs into a single log message.
+
+    The first occurrence of an error is logged immediately.  Identical errors
+    occurring within the next <window> seconds are only counted.  When the
+    window expires, a single log carrying the number of suppressed
+    occurrences is generated.
+
+    Args:
+        logging (Logging): The logging instance to generate the logs with.
+        window (int): The aggregation window in seconds.
+    '''
+
+    def __init__(self, logging, window=5):
+        self.logging = logging
+        self.window = window
+        self.__errors = {}
+
+    def error(self, key, message, *args):
+        '''Logs <message> unless an error with <key> was already logged
+        within the current window.'''
+
+        entry = self.__errors.get(key)
+        if entry is None:
+            self.logging.error(message, *args)
+            self.__errors[key] = [time(), 0, message, args]
+        else:
+            entry[1] += 1
+
+    def flush(self, force=False):
+        '''Logs the number of suppressed errors of each expired window.'''
+
+        now = time()
+        for key, (first, count, message, args) in list(self.__errors.items()):
+            if force or now - first >= self.window:
+                del(self.__errors[key])
+                if count > 0:
+                    self.logging.error(message + " (repeated %s times in the last %s seconds)", *(args + (count, int(now - first))))
@@ -26,12 +26,37 @@
 class Lookup(object):
     pass
 
-from .event import EventLookup
-from .choice import Choice
-from .cycle import Cycle
-from .etcd import ETCD
-from .pid import PID
-from .random_bool import RandomBool
-from .random_integer import RandomInteger
-from .random_word import RandomWord
-from .random_uuid import RandomUUID
+from importlib import import_module
+
+# The lookup classes are imported on first access so ETCD's http client is
+# only loaded by the processes actually using it.
+_lazy = {
+    "EventLookup": "wishbone.lookup.event",
+    "Choice": "wishbone.lookup.choice",
+    "Cycle": "wishbone.lookup.cycle",
+    "ETCD": "wishbone.lookup.etcd",
+    "File": "wishbone.lookup.file",
+    "PID": "wishbone.lookup.pid",
+    "RandomBool": "wishbone.lookup.random_bool",
+    "RandomInteger": "wishbone.lookup.random_integer",
+    "RandomWord": "wishbone.lookup.random_word",
+    "RandomUUID": "wishbone.lookup.random_uuid"
+}
+
+__all__ = ["Lookup"] + sorted(_lazy.keys())
+
+
+def __getattr__(name):
+
+    try:
+        module = _lazy[name]
+    except KeyError:
+        raise AttributeError("module 'wishbone.lookup' has no attribute '%s'" % (name))
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+
+    return sorted(list(globals().keys()) + __all__)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  cache.py
+#
+#  Copyright 2016 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+from uplook.errors import NoSuchValue
+from collections import OrderedDict
+from time import monotonic
+
+
+class LookupCache(object):
+
+    '''
+    A bounded cache wrapping the lookup method of a lookup module.
+
+    Results are cached by the arguments the lookup is called with for <ttl>
+    seconds.  When the lookup raises NoSuchValue, the error is cached for
+    <negative_ttl> seconds so the default value of the lookup is used
+    without calling the lookup again.  When the cache holds <max_entries>
+    results, the least recently used one is evicted.  Calls with unhashable
+    arguments are not cached.
+
+    Args:
+        function (method): The lookup method to wrap.
+        name (str): The name of the lookup instance used in the metrics.
+        max_entries (int): The max number of cached results.
+        ttl (float): The time in seconds a result is cached.
+        negative_ttl (float): The time in seconds a NoSuchValue error is cached. 0 disables it.
+    '''
+
+    def __init__(self, function, name, max_entries=1000, ttl=60, negative_ttl=0):
+
+        self.function = function
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.__entries = OrderedDict()
+
+    def __len__(self):
+
+        return len(self.__entries)
+
+    def lookup(self, *args, **kwargs):
+
+        if kwargs:
+            key = (args, tuple(sorted(kwargs.items())))
+        else:
+            key = args
+
+        try:
+            (expires, value, error) = self.__entries[key]
+        except KeyError:
+            pass
+        except TypeError:
+            self.misses += 1
+            return self.function(*args, **kwargs)
+        else:
+            if monotonic() < expires:
+                self.hits += 1
+                self.__entries.move_to_end(key)
+                if error is not None:
+                    raise NoSuchValue(error)
+                return value
+            del(self.__entries[key])
+
+        self.misses += 1
+        try:
+            value = self.function(*args, **kwargs)
+        except NoSuchValue as err:
+            if self.negative_ttl > 0:
+                self.__store(key, (monotonic() + self.negative_ttl, None, str(err)))
+            raise
+        self.__store(key, (monotonic() + self.ttl, value, None))
+        return value
+
+    def samples(self):
+        '''Returns the cache statistics as a list of <Sample> instances.'''
+
+        from wishbone.router.metrics import Sample
+
+        labels = (("lookup", self.name),)
+        return [
+            Sample("wishbone_lookup_cache_hits_total", "counter", "The number of lookups answered from the cache.", labels, self.hits),
+            Sample("wishbone_lookup_cache_misses_total", "counter", "The number of lookups calling the lookup module.", labels, self.misses),
+            Sample("wishbone_lookup_cache_evictions_total", "counter", "The number of cached results evicted to make room.", labels, self.evictions),
+            Sample("wishbone_lookup_cache_entries", "gauge", "The number of cached results.", labels, len(self.__entries))
+        ]
+
+    def __store(self, key, entry):
+
+        self.__entries[key] = entry
+        if len(self.__entries) > self.max_entries:
+            self.__entries.popitem(last=False)
+            self.evictions += 1
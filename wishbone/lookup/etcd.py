@@ -23,8 +23,11 @@
 #
 
 from wishbone.lookup import Lookup
-import requests
 from uplook.errors import NoSuchValue
+from collections import OrderedDict
+from gevent import get_hub
+from threading import Lock, Thread
+from time import monotonic, sleep
 
 
 class ETCD(Lookup):
@@ -32,28 +35,175 @@ class ETCD(Lookup):
     '''
     **Returns a value from etcd.**
 
-    Returns a value from an etcd instance.
+    Returns a value from an etcd instance using the v2 keys API.
+
+    Values are cached for <ttl> seconds in a cache holding at most
+    <max_keys> keys.  The least recently used key is evicted first.  Keys
+    are fetched in a thread of the gevent threadpool so a fetch does not
+    block other greenlets.
+
+    When <watch> is enabled a single background thread watches <prefix>
+    recursively using etcd's watch API and updates the cached keys as soon
+    as they change, so cached keys do not need to be fetched again.
+
+    While etcd is unreachable the last known value keeps being returned.
+    A failed fetch is retried at most once per <ttl> seconds.  Fetches
+    share a pooled http session while the watcher uses its own session.
 
     - Parameters to initialize the function:
 
         - base(str)("/v2/keys"): The base part of the endpoint.
+        - ttl(int)(60): The max age in seconds of a cached value.
+        - watch(bool)(True): Watches <prefix> for changes instead of polling.
+        - prefix(str)("/"): The directory holding the keys to watch.
+        - max_keys(int)(1000): The max number of cached keys.
+        - timeout(int)(5): The connect and read timeout of a fetch in seconds.
+        - pool_size(int)(10): The max number of pooled connections.
 
     - Parameters to call the function:
 
         - key(str)(): The name of the key to request.
     '''
 
-    def __init__(self, base="/v2/keys"):
+    def __init__(self, base="/v2/keys", ttl=60, watch=True, prefix="/", max_keys=1000, timeout=5, pool_size=10):
+
+        import requests
+        from requests.adapters import HTTPAdapter
 
         self.base = base.rstrip('/')
+        self.ttl = ttl
+        self.watch = watch
+        self.prefix = prefix.strip('/')
+        self.max_keys = max_keys
+        self.timeout = timeout
+        self.requests = requests
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.watch_session = requests.Session()
+        self.cache = OrderedDict()
+        self.lock = Lock()
+        self.index = 0
+        self.running = True
+        self.__watcher = None
 
     def lookup(self, key):
 
         key = key.lstrip('/')
+        with self.lock:
+            entry = self.cache.get(key)
+            if entry is not None:
+                self.cache.move_to_end(key)
+                if monotonic() - entry[1] < self.ttl:
+                    return entry[0]
 
         try:
-            response = requests.get('%s/%s' % (self.base, key))
-            response.raise_for_status()
-            return response.json()["node"]["value"]
+            return self.__offload(key)
         except Exception as err:
-            raise NoSuchValue(str(err))
+            with self.lock:
+                if entry is None or key not in self.cache:
+                    raise NoSuchValue(str(err))
+                entry[1] = monotonic()
+                return entry[0]
+
+    def fetch(self, key):
+        '''Fetches <key> from etcd, updates the cache and returns the value.'''
+
+        response = self.session.get('%s/%s' % (self.base, key), timeout=self.timeout)
+        if response.status_code == 404:
+            with self.lock:
+                self.cache.pop(key, None)
+        response.raise_for_status()
+        self.__updateIndex(response)
+        value = response.json()["node"]["value"]
+        self.__store(key, value)
+
+        with self.lock:
+            if self.watch and self.__watcher is None:
+                self.__watcher = Thread(target=self.__watchLoop)
+                self.__watcher.daemon = True
+                self.__watcher.start()
+        return value
+
+    def stop(self):
+        '''Stops watching etcd for changes.'''
+
+        self.running = False
+        self.session.close()
+        self.watch_session.close()
+
+    def __offload(self, key):
+
+        return get_hub().threadpool.apply(self.fetch, (key,))
+
+    def __store(self, key, value):
+
+        with self.lock:
+            self.cache[key] = [value, monotonic()]
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.max_keys:
+                self.cache.popitem(last=False)
+
+    def __updateIndex(self, response):
+
+        try:
+            self.index = max(self.index, int(response.headers["X-Etcd-Index"]))
+        except (KeyError, ValueError):
+            pass
+
+    def __resync(self):
+        '''Fetches all cached keys again.  Used when changes might have been
+        missed.'''
+
+        with self.lock:
+            keys = list(self.cache.keys())
+        for key in keys:
+            try:
+                self.fetch(key)
+            except self.requests.exceptions.HTTPError:
+                pass
+
+    def __watchLoop(self):
+
+        url = '%s/%s' % (self.base, self.prefix)
+        backoff = 1
+        resync = False
+        while self.running:
+            try:
+                if resync:
+                    self.__resync()
+                    resync = False
+                started = monotonic()
+                try:
+                    response = self.watch_session.get(url, params={"wait": "true", "recursive": "true", "waitIndex": self.index + 1}, timeout=(self.timeout, self.ttl / 2.0))
+                except self.requests.exceptions.ReadTimeout:
+                    # Nothing changed so all cached values are still current.
+                    with self.lock:
+                        for entry in self.cache.values():
+                            entry[1] = max(entry[1], started)
+                    continue
+                result = response.json()
+                if response.status_code != 200:
+                    # The watched index has been cleared by etcd.
+                    self.__updateIndex(response)
+                    resync = True
+                    continue
+
+                node = result["node"]
+                self.index = max(self.index, node["modifiedIndex"])
+                key = node["key"].lstrip('/')
+                with self.lock:
+                    if key in self.cache:
+                        if result.get("action") in ("delete", "expire", "compareAndDelete"):
+                            self.cache.pop(key, None)
+                        else:
+                            self.cache[key] = [node["value"], monotonic()]
+            except Exception:
+                if not self.running:
+                    break
+                resync = True
+                sleep(backoff)
+                backoff = min(backoff * 2, self.ttl)
+            else:
+                backoff = 1
@@ -0,0 +1,261 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  file.py
+#
+#  Copyright 2016 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+from wishbone.lookup import Lookup
+from uplook.errors import NoSuchValue
+from threading import Thread
+from time import sleep
+import csv
+import io
+import json
+import mmap
+import os
+
+
+class File(Lookup):
+
+    '''
+    **Returns a value from a JSON, YAML or CSV file.**
+
+    Loads the content of <path> into an index keyed by the full lookup key
+    so lookups are served from memory.  Nested mappings are flattened using
+    <separator>.  The value of {"a": {"b": 1}} is available under "a.b" and
+    the nested mapping itself under "a".
+
+    CSV files are indexed by the <key> column.  When <mmap> is enabled the
+    file is memory-mapped and the index only holds the position of each row.
+    Rows are parsed when looked up.  Memory-mapped files should be replaced
+    (write and rename) instead of being rewritten in place.  Until a file
+    which shrunk in place is reloaded, its lookups raise NoSuchValue.
+
+    A background thread checks <path> every <interval> seconds and reloads
+    it when it changed.  The new index replaces the previous one once it is
+    completely built.  When loading fails the previous content keeps being
+    served.
+
+    - Parameters to initialize the function:
+
+        - path(str)(): The file to load.
+        - format(str)(None): json, yaml or csv. Derived from the extension of <path> when not defined.
+        - separator(str)("."): The separator joining the keys of nested mappings.
+        - key(str)(None): The CSV column to index. Defaults to the first column.
+        - value(str)(None): The CSV column to return. Returns the row as a dict when not defined.
+        - delimiter(str)(","): The CSV delimiter.
+        - mmap(bool)(False): Memory-maps CSV files instead of loading all rows.
+        - interval(int)(1): The time in seconds between checks for changes.
+
+    - Parameters to call the function:
+
+        - key(str)(): The key to look up.
+    '''
+
+    def __init__(self, path, format=None, separator=".", key=None, value=None, delimiter=",", mmap=False, interval=1):
+
+        if format is None:
+            format = os.path.splitext(path)[1].lstrip('.').lower()
+            if format == "yml":
+                format = "yaml"
+        if format not in ("json", "yaml", "csv"):
+            raise Exception("Unsupported file format '%s'.  Supported formats are json, yaml and csv." % (format))
+
+        self.path = path
+        self.format = format
+        self.separator = separator
+        self.key = key
+        self.value = value
+        self.delimiter = delimiter
+        self.mmap = mmap
+        self.interval = interval
+        self.error = None
+        self.running = True
+
+        self.__version = self.__stat()
+        self.__table = self.load()
+
+        thread = Thread(target=self.__reloadLoop)
+        thread.daemon = True
+        thread.start()
+
+    def lookup(self, key):
+
+        index, data = self.__table
+        try:
+            value = index[key]
+        except KeyError:
+            raise NoSuchValue("'%s' does not exist in '%s'." % (key, self.path))
+
+        if data is None:
+            return value
+        else:
+            return self.__parseRow(data, *value)
+
+    def load(self):
+        '''Loads <path> and returns a tuple of the index and the memory-mapped
+        file if any.'''
+
+        if self.format == "csv":
+            if self.mmap:
+                return self.__loadMappedCSV()
+            else:
+                return self.__loadCSV(), None
+
+        with open(self.path) as f:
+            if self.format == "json":
+                data = json.load(f)
+            else:
+                import yaml
+                try:
+                    from yaml import CSafeLoader as SafeLoader
+                except ImportError:
+                    from yaml import SafeLoader
+                data = yaml.load(f, Loader=SafeLoader)
+
+        if data is None:
+            data = {}
+        elif not isinstance(data, dict):
+            raise Exception("The content of '%s' is not a mapping." % (self.path))
+
+        index = {}
+        self.__flatten(data, None, index)
+        return index, None
+
+    def stop(self):
+        '''Stops checking <path> for changes.'''
+
+        self.running = False
+
+    def __flatten(self, data, prefix, index):
+
+        for key, value in data.items():
+            if prefix is None:
+                name = str(key)
+            else:
+                name = "%s%s%s" % (prefix, self.separator, key)
+            index[name] = value
+            if isinstance(value, dict):
+                self.__flatten(value, name, index)
+
+    def __loadCSV(self):
+
+        index = {}
+        with open(self.path, newline='') as f:
+            reader = csv.reader(f, delimiter=self.delimiter)
+            header = next(reader, None)
+            if header is None:
+                return index
+            key, value = self.__columns(header)
+            for row in reader:
+                if len(row) == len(header):
+                    if value is None:
+                        index[row[key]] = dict(zip(header, row))
+                    else:
+                        index[row[key]] = row[value]
+        return index
+
+    def __loadMappedCSV(self):
+
+        index = {}
+        f = open(self.path, "rb")
+        if os.fstat(f.fileno()).st_size == 0:
+            f.close()
+            return index, None
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        def lines():
+            while True:
+                line = data.readline()
+                if not line:
+                    return
+                yield line.decode()
+
+        reader = csv.reader(lines(), delimiter=self.delimiter)
+        try:
+            header = next(reader, None)
+            if header is None:
+                f.close()
+                return index, None
+            key, value = self.__columns(header)
+        except Exception:
+            f.close()
+            raise
+
+        # The reader only consumes the lines of the row it returns so the
+        # position of the mapped file marks the boundaries of each row.
+        start = data.tell()
+        for row in reader:
+            end = data.tell()
+            if len(row) == len(header):
+                index[row[key]] = (start, end)
+            start = end
+
+        # The file is kept open to detect it being truncated in place.
+        return index, (data, f, header, value)
+
+    def __columns(self, header):
+
+        if self.key is None:
+            key = 0
+        elif self.key in header:
+            key = header.index(self.key)
+        else:
+            raise Exception("Column '%s' does not exist in '%s'." % (self.key, self.path))
+
+        if self.value is None:
+            value = None
+        elif self.value in header:
+            value = header.index(self.value)
+        else:
+            raise Exception("Column '%s' does not exist in '%s'." % (self.value, self.path))
+
+        return key, value
+
+    def __parseRow(self, data, start, end):
+
+        mapped, f, header, value = data
+        if os.fstat(f.fileno()).st_size < len(mapped):
+            # Reading the pages beyond the end of the file raises SIGBUS.
+            raise NoSuchValue("'%s' has been truncated and is waiting to be reloaded." % (self.path))
+        row = next(csv.reader(io.StringIO(mapped[start:end].decode(), newline=''), delimiter=self.delimiter))
+        if value is None:
+            return dict(zip(header, row))
+        else:
+            return row[value]
+
+    def __stat(self):
+
+        s = os.stat(self.path)
+        return (s.st_ino, s.st_size, s.st_mtime_ns)
+
+    def __reloadLoop(self):
+
+        while self.running:
+            sleep(self.interval)
+            try:
+                version = self.__stat()
+                if version != self.__version:
+                    self.__table = self.load()
+                    self.__version = version
+                    self.error = None
+            except Exception as err:
+                self.error = str(err)
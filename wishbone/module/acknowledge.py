@@ -115,25 +115,28 @@ class Acknowledge(Actor):
 
     def consume(self, event):
 
-        if self.kwargs.ack_id is None:
-            self.logging.warning("Incoming event with <ack_id> %s does not seem to exist.  Returns a None value. Event passing through." % (self.ack_id_ref))
+        ack_id = self.kwargs.ack_id
+        if ack_id is None:
+            self.logging.warning("Incoming event with <ack_id> %s does not seem to exist.  Returns a None value. Event passing through.", self.ack_id_ref)
             self.pool.queue.outbox.put(event)
-        elif self.ack_table.unack(self.kwargs.ack_id):
-            self.logging.debug("Event unacknowledged with <ack_id> '%s'." % (self.kwargs.ack_id))
+        elif self.ack_table.unack(ack_id):
+            self.logging.debug("Event unacknowledged with <ack_id> '%s'.", ack_id)
             self.pool.queue.outbox.put(event)
         else:
-            self.logging.debug("Event with still unacknowledged <ack_id> '%s' send to <dropped> queue." % (self.kwargs.ack_id))
+            self.logging.debug("Event with still unacknowledged <ack_id> '%s' send to <dropped> queue.", ack_id)
             self.pool.queue.dropped.put(event)
 
 
     def acknowledge(self, event):
-        if self.kwargs.ack_id is None:
-            self.logging.warning("Incoming acknowledge event with <ack_id> %s does not seem to exist.  Returns a None value. Nothing to do." % (self.ack_id_ref))
-        elif self.ack_table.ack(self.kwargs.ack_id):
-            self.logging.debug("Event acknowledged with <ack_id> '%s'." % (self.kwargs.ack_id))
+
+        ack_id = self.kwargs.ack_id
+        if ack_id is None:
+            self.logging.warning("Incoming acknowledge event with <ack_id> %s does not seem to exist.  Returns a None value. Nothing to do.", self.ack_id_ref)
+        elif self.ack_table.ack(ack_id):
+            self.logging.debug("Event acknowledged with <ack_id> '%s'.", ack_id)
         else:
-            self.logging.debug("Event with <ack_id> '%s' received but was not previously acknowledged." % (self.kwargs.ack_id))
+            self.logging.debug("Event with <ack_id> '%s' received but was not previously acknowledged.", ack_id)
 
     def postHook(self):
 
-        self.logging.debug("The ack table has %s events unacknowledged." % (len(self.ack_table.ack_table)))
+        self.logging.debug("The ack table has %s events unacknowledged.", len(self.ack_table.ack_table))
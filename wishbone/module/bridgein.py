@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  bridgein.py
+#
+#  Copyright 2016 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+from wishbone import Actor
+from wishbone.event import Event, Bulk
+from wishbone.utils.placement import getChannel, BULK
+
+
+class BridgeIn(Actor):
+
+    '''**Receives events from a module instance running in another process.**
+
+    Bridge module instances are created automatically when the bootstrap
+    file places module instances in different processes using the process
+    attribute.  Events are read in batches from the gipc pipe registered
+    under <channel>.
+
+    Parameters:
+
+        - channel(str)
+           |  The name of the channel to read events from.
+
+    Queues:
+
+        - outbox
+           |  Outgoing events.
+    '''
+
+    def __init__(self, actor_config, channel):
+
+        Actor.__init__(self, actor_config)
+        self.pool.createQueue("outbox")
+        self.reader = getChannel(channel)
+
+    def preHook(self):
+
+        self.sendToBackground(self.receive)
+
+    def receive(self):
+
+        while self.loop():
+            try:
+                batch = self.reader.get()
+            except EOFError:
+                self.logging.info("Channel closed by the sending process.")
+                break
+
+            for item in batch:
+                if isinstance(item, tuple) and item[0] == BULK:
+                    event = Bulk(max_size=item[1], delimiter=item[2])
+                    for data in item[3]:
+                        event.append(self.__event(data))
+                else:
+                    event = self.__event(item)
+                self.submit(event, self.pool.queue.outbox)
+
+    def __event(self, data):
+
+        event = Event()
+        event.data = data
+        return event
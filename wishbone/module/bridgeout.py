@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  bridgeout.py
+#
+#  Copyright 2016 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+from wishbone import Actor
+from wishbone.event import Bulk
+from wishbone.utils.placement import getChannel, BULK
+from gevent.lock import Semaphore
+from gevent import sleep
+
+
+class BridgeOut(Actor):
+
+    '''**Forwards events to a module instance running in another process.**
+
+    Bridge module instances are created automatically when the bootstrap
+    file places module instances in different processes using the process
+    attribute.  Events are submitted in batches to the gipc pipe registered
+    under <channel>.  A Bulk event is submitted as a single unit.
+
+    Parameters:
+
+        - channel(str)
+           |  The name of the channel to write events to.
+
+        - batch_size(int)(100)
+           |  The max number of events to send at once.
+
+        - interval(float)(0.1)
+           |  The max time in seconds events are buffered.
+
+    Queues:
+
+        - inbox
+           |  Incoming events.
+    '''
+
+    def __init__(self, actor_config, channel, batch_size=100, interval=0.1):
+
+        Actor.__init__(self, actor_config)
+        self.pool.createQueue("inbox")
+        self.registerConsumer(self.consume, "inbox")
+        self.writer = getChannel(channel)
+        self.batch = []
+        self.lock = Semaphore()
+
+    def preHook(self):
+
+        self.sendToBackground(self.flusher)
+
+    def consume(self, event):
+
+        if isinstance(event, Bulk):
+            self.batch.append((BULK, event.max_size, event.delimiter, [e.data for e in event.dump()]))
+        else:
+            self.batch.append(event.data)
+
+        if len(self.batch) >= self.kwargs.batch_size:
+            self.flush()
+
+    def flush(self):
+
+        with self.lock:
+            if self.batch:
+                batch, self.batch = self.batch, []
+                self.writer.put(batch)
+
+    def flusher(self):
+
+        while self.loop():
+            sleep(self.kwargs.interval)
+            self.flush()
+
+    def postHook(self):
+
+        self.flush()
@@ -24,7 +24,6 @@
 
 from wishbone import Actor
 from wishbone.event import Event
-from cronex import CronExpression
 from gevent import sleep
 import time
 
@@ -59,6 +58,8 @@ class Cron(Actor):
 
         Actor.__init__(self, actor_config)
         self.pool.createQueue("outbox")
+
+        from cronex import CronExpression
         self.cron = CronExpression("%s wishbone" % self.kwargs.cron)
 
     def preHook(self):
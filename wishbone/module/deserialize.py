@@ -68,7 +68,7 @@ class Deserialize(Actor):
         if isinstance(event, Bulk):
             for e in event.dump():
                 self.submit(e, self.pool.queue.outbox)
-            self.logging.debug("Expanded Bulk event into %s events." % (event.size()))
+            self.logging.debug("Expanded Bulk event into %s events.", event.size())
         else:
             data = event.get(self.kwargs.source)
 
@@ -25,7 +25,6 @@ from sys import version_info
 from random import choice, randint
 from gevent import sleep
 from wishbone import Actor
-from wishbone.event import Event
 import os
 
 
@@ -106,7 +105,7 @@ class DictGenerator(Actor):
 
         while self.loop():
             d = self.getDict()
-            event = Event(d)
+            event = self.event_pool.acquire(d)
             self.submit(event, self.pool.queue.outbox)
             self.key_number = +1
             sleep(self.kwargs.interval)
@@ -26,7 +26,6 @@
 from wishbone import Actor
 from wishbone.event import Bulk
 from gevent.os import make_nonblocking
-import arrow
 
 
 class FileOut(Actor):
@@ -86,6 +85,7 @@ class FileOut(Actor):
 
     def returnTimestamp(self):
 
+        import arrow
         return "%s: " % (arrow.now().isoformat())
 
     def returnNoTimestamp(self):
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  logring.py
+#
+#  Copyright 2016 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+from wishbone import Actor
+from wishbone.error import ModuleInitFailure
+from gevent import sleep
+
+
+class LogRingReader(Actor):
+
+    '''**Drains the process-wide log ring.**
+
+    Reads the log events all module instances of the process write into the
+    shared log ring and submits them in batches to outbox.  This replaces
+    connecting the logs queue of each module instance to a funnel.
+
+    The log ring is enabled using the --log_ring option of the bootstrap
+    process.
+
+
+    Parameters:
+
+        - batch_size(int)(100)
+           |  The max number of log events to forward at once.
+
+        - interval(float)(0.1)
+           |  The time in seconds to wait when the ring is empty.
+
+    Queues:
+
+        - outbox
+           |  Outgoing log events.
+    '''
+
+    def __init__(self, actor_config, batch_size=100, interval=0.1):
+
+        Actor.__init__(self, actor_config)
+        self.pool.createQueue("outbox")
+
+        if actor_config.log_ring is None:
+            raise ModuleInitFailure("There is no log ring defined.")
+        self.ring = actor_config.log_ring
+
+    def preHook(self):
+
+        self.sendToBackground(self.drain)
+
+    def drain(self):
+
+        while self.loop():
+            for event in self.ring.drain(self.kwargs.batch_size):
+                self.submit(event, self.pool.queue.outbox)
+
+            if len(self.ring) == 0:
+                sleep(self.kwargs.interval)
+            else:
+                sleep(0)
@@ -23,9 +23,11 @@
 #
 
 from wishbone import Actor
+from wishbone.event import Bulk
 from copy import deepcopy
+from operator import methodcaller
+from sys import exc_info
 import re
-import arrow
 
 VALID_EXPRESSIONS = ["add_item",
                      "copy",
@@ -180,6 +182,13 @@ class Modify(Actor):
 
 
 
+    When a Bulk event is received each expression is applied to all the
+    contained events before moving to the next expression.  Expressions
+    reading a single key and writing the result to a single key are applied
+    column-wise.  Events an expression fails on are marked in
+    *<@errors.module_name>* and a single error is logged per expression.
+
+
     Parameters:
 
         - expressions(list)([])
@@ -200,90 +209,188 @@ class Modify(Actor):
         self.pool.createQueue("outbox")
         self.registerConsumer(self.consume, "inbox")
 
+        self.__expressions = None
+        self.__plan = []
+
+    def preHook(self):
+
+        self.__compile(self.kwargs.expressions)
+
     def consume(self, event):
 
-        for expression in self.kwargs.expressions:
-            try:
-                command, args = self.__extractExpr(expression)
-                event = getattr(self, "command_%s" % (command))(event, *args)
-            except Exception as err:
-                self.logging.error("Failed to process expression '%s'. Reason: %s Skipped." % (expression, err))
+        expressions = self.kwargs.expressions
+        if expressions is not self.__expressions:
+            self.__compile(expressions)
+
+        if isinstance(event, Bulk):
+            self.__consumeBulk(list(event.dump()))
+        else:
+            for expression, function in self.__plan:
+                try:
+                    function(event)
+                except Exception as err:
+                    self.logging.error("Failed to process expression '%s'. Reason: %s Skipped.", expression, err)
 
         self.submit(event, self.pool.queue.outbox)
 
-    def command_add_item(self, event, item, key):
+    def compile_add_item(self, item, key):
 
-        event.get(key).append(item)
-        return event
+        def apply(event):
+            event.get(key).append(item)
+        return apply
 
-    def command_copy(self, event, source, destination, default_value):
+    def compile_copy(self, source, destination, default_value):
 
-        try:
-            event.copy(source, destination)
-        except KeyError:
-            event.set(default_value, destination)
-        return event
+        def apply(event):
+            try:
+                event.copy(source, destination)
+            except KeyError:
+                event.set(default_value, destination)
+        return apply
+
+    def compile_del_item(self, item, key):
+
+        def apply(event):
+            event.get(key).remove(item)
+        return apply
+
+    def compile_delete(self, key):
+
+        def apply(event):
+            event.delete(key)
+        return apply
 
-    def command_del_item(self, event, item, key):
+    def compile_extract(self, destination, regex, source):
 
-        event.get(key).remove(item)
+        match = re.compile(regex).match
+        return self.__column(source, destination, lambda value: match(value).groupdict())
 
-        return event
+    def compile_join(self, array, j, destination):
 
-    def command_delete(self, event, key):
+        return self.__column(array, destination, j.join)
 
-        event.delete(key)
-        return event
+    def compile_lowercase(self, key):
 
-    def command_extract(self, event, destination, regex, source):
+        return self.__column(key, key, methodcaller("lower"))
 
-        matches = re.match(regex, event.get(source))
-        event.set(matches.groupdict(), destination)
-        return event
+    def compile_merge(self, one, two, destination):
 
-    def command_join(self, event, array, j, destination):
+        def apply(event):
+            event.set(event.get(one) + event.get(two), destination)
+        return apply
 
-        result = j.join(event.get(array))
-        event.set(result, destination)
-        return event
+    def compile_replace(self, regex, value, key):
 
-    def command_lowercase(self, event, key):
+        sub = re.compile("{}".format(regex)).sub
+        return self.__column(key, key, lambda v: str(sub(value, str(v))))
 
-        event.set(event.get(key).lower(), key)
-        return event
+    def compile_set(self, value, key):
 
-    def command_merge(self, event, one, two, destination):
-        result = event.get(one) + event.get(two)
-        event.set(result, destination)
-        return event
+        if isinstance(value, (str, int, float, bool, type(None))):
+            def apply(event):
+                event.set(value, key)
+        else:
+            def apply(event):
+                event.set(deepcopy(value), key)
+        return apply
 
-    def command_replace(self, event, regex, value, key):
+    def compile_template(self, destination, template, key):
 
-        result = re.sub("{}".format(regex), value, str(event.get(key)))
-        event.set(str(result), key)
-        return event
+        return self.__column(key, destination, lambda value: template.format(**value))
 
-    def command_set(self, event, value, key):
+    def compile_time(self, destination_key, f):
 
-        event.set(deepcopy(value), key)
-        return event
+        import arrow
+        return self.__column("@timestamp", destination_key, lambda value: arrow.get(value).format(f))
 
-    def command_template(self, event, destination, template, key):
+    def compile_uppercase(self, key):
 
-        result = template.format(**event.get(key))
-        event.set(result, destination)
-        return event
+        return self.__column(key, key, methodcaller("upper"))
 
-    def command_time(self, event, destination_key, f):
+    def __column(self, source, destination, function):
+        '''Returns a function setting <destination> to the result of
+        <function> applied to the value of <source>.  The returned function
+        carries its parts so Bulk events can be processed column-wise.'''
+
+        def apply(event):
+            event.set(function(event.get(source)), destination)
+        apply.column = (source, destination, function)
+        return apply
+
+    def __consumeBulk(self, events):
+        '''Applies each expression to all <events> and marks the events an
+        expression failed on.'''
+
+        for expression, function in self.__plan:
+            if hasattr(function, "column"):
+                failed = self.__applyColumn(events, *function.column)
+            else:
+                failed = []
+                for event in events:
+                    try:
+                        function(event)
+                    except Exception as err:
+                        failed.append((event, err, exc_info()[2]))
+
+            for event, err, traceback in failed:
+                while traceback.tb_next is not None:
+                    traceback = traceback.tb_next
+                event.set((traceback.tb_lineno, str(type(err)), str(err)), "@errors.%s" % (self.name))
+
+            if failed:
+                self.logging.error("Failed to process expression '%s' for %s of %s events. Reason: %s Skipped.", expression, len(failed), len(events), failed[0][1])
+
+    def __applyColumn(self, events, source, destination, function):
+
+        failed = []
+        selected = []
+        values = []
+        for event in events:
+            try:
+                values.append(event.get(source))
+                selected.append(event)
+            except Exception as err:
+                failed.append((event, err, exc_info()[2]))
+
+        try:
+            results = list(zip(selected, map(function, values)))
+        except Exception:
+            # Find out which values the function fails on.
+            results = []
+            for event, value in zip(selected, values):
+                try:
+                    results.append((event, function(value)))
+                except Exception as err:
+                    failed.append((event, err, exc_info()[2]))
+
+        for event, result in results:
+            event.set(result, destination)
+
+        return failed
+
+    def __compile(self, expressions):
+        '''Compiles <expressions> into a list of functions applying each
+        expression to an event.  Expressions which fail to compile are
+        compiled into a function raising the error so it gets logged for
+        each event just like any other failing expression.'''
+
+        plan = []
+        for expression in expressions:
+            try:
+                command, args = self.__extractExpr(expression)
+                function = getattr(self, "compile_%s" % (command))(*args)
+            except Exception as err:
+                function = self.__raiser(err)
+            plan.append((expression, function))
 
-        result = arrow.get(event.get("@timestamp")).format(f)
-        event.set(result, destination_key)
-        return event
+        self.__plan = plan
+        self.__expressions = expressions
 
-    def command_uppercase(self, event, key):
+    def __raiser(self, err):
 
-        event.set(event.get(key).upper(), key)
-        return event
+        def apply(event):
+            raise err.with_traceback(None)
+        return apply
 
     def __extractExpr(self, e):
 
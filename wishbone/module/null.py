@@ -49,4 +49,4 @@ class Null(Actor):
         self.registerConsumer(self.consume, "inbox")
 
     def consume(self, event):
-        pass
+        self.releaseEvent(event)
@@ -26,6 +26,7 @@
 from wishbone import Actor
 from itertools import cycle
 from random import randint
+from zlib import crc32
 
 
 class RoundRobin(Actor):
@@ -36,12 +37,19 @@ class RoundRobin(Actor):
     are then submitted in a roundrobin (or randomized) fashion to the
     connected queues.  The outbox queue is non existent.
 
+    When <key> is defined, the queue is selected based on the hash of the
+    value of <key> so all events with the same value end up in the same
+    queue in the order they arrived.
+
     Parameters:
 
         - randomize(bool)(False)
             |  Randomizes the queue selection instead of going round-robin
             |  over all queues.
 
+        - key(str)(None)
+            |  The event key to select the queue by.
+
 
     Queues:
 
@@ -49,7 +57,7 @@ class RoundRobin(Actor):
            |  Incoming events
     '''
 
-    def __init__(self, actor_config, randomize=False):
+    def __init__(self, actor_config, randomize=False, key=None):
         Actor.__init__(self, actor_config)
         self.pool.createQueue("inbox")
         self.registerConsumer(self.consume, "inbox")
@@ -57,23 +65,29 @@ class RoundRobin(Actor):
     def preHook(self):
 
         self.destination_queues = []
-        for queue in self.pool.listQueues(names=True):
-            if queue not in ["failed", "success", "metrics", "logs"]:
+        for queue in sorted(self.pool.listQueues(names=True)):
+            if queue not in ["inbox", "failed", "success", "metrics", "logs"]:
                 self.destination_queues.append(self.pool.getQueue(queue))
 
-        if not self.kwargs.randomize:
+        if self.kwargs.key is not None:
+            self.chooseQueue = self.__chooseKeyedQueue
+        elif not self.kwargs.randomize:
             self.cycle = cycle(self.destination_queues)
             self.chooseQueue = self.__chooseNextQueue
         else:
             self.chooseQueue = self.__chooseRandomQueue
 
     def consume(self, event):
-        queue = self.chooseQueue()
+        queue = self.chooseQueue(event)
         self.submit(event, queue)
 
-    def __chooseNextQueue(self):
+    def __chooseKeyedQueue(self, event):
+        value = str(event.get(self.kwargs.key)).encode("utf-8")
+        return self.destination_queues[crc32(value) % len(self.destination_queues)]
+
+    def __chooseNextQueue(self, event):
         return next(self.cycle)
 
-    def __chooseRandomQueue(self):
+    def __chooseRandomQueue(self, event):
         index = randint(0, len(self.destination_queues)-1)
         return self.destination_queues[index]
\ No newline at end of file
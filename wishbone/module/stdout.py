@@ -24,7 +24,6 @@
 from gevent import monkey; monkey.patch_sys(stdin=False, stdout=True, stderr=False)
 from wishbone import Actor
 from os import getpid
-from colorama import init, Fore, Back, Style
 import sys
 from wishbone.event import Bulk
 
@@ -118,7 +117,9 @@ class STDOUT(Actor):
         self.pool.createQueue("inbox")
         self.registerConsumer(self.consume, "inbox")
 
+        from colorama import init, Fore, Back, Style
         init(autoreset=True)
+        self.fore, self.back, self.style = Fore, Back, Style
 
     def consume(self, event):
         if isinstance(event, Bulk):
@@ -128,14 +129,15 @@ class STDOUT(Actor):
             data = event.get(self.kwargs.selection)
 
         output = "%s%s%s%s%s\n" % (
-            getattr(Fore, self.kwargs.foreground_color),
-            getattr(Back, self.kwargs.background_color),
-            getattr(Style, self.kwargs.color_style),
+            getattr(self.fore, self.kwargs.foreground_color),
+            getattr(self.back, self.kwargs.background_color),
+            getattr(self.style, self.kwargs.color_style),
             self.kwargs.prefix,
             self.format.do(data)
         )
         sys.stdout.write(output)
         sys.stdout.flush()
+        self.releaseEvent(event)
 
     def __validateInput(self, f, b, s):
 
@@ -96,8 +96,8 @@ class Switch(Actor):
             name = event.get("@data")
             if self.pool.hasQueue(name):
                 self.kwargs.outgoing = name
-                self.logging.info("%s. Outgoing messages forwarded to queue '%s'." % (prefix, name))
+                self.logging.info("%s. Outgoing messages forwarded to queue '%s'.", prefix, name)
             else:
-                self.logging.error("%s but module has no queue named '%s'." % (prefix, name))
+                self.logging.error("%s but module has no queue named '%s'.", prefix, name)
         except KeyError:
-            self.logging.error("%s but has no value key @data." % (prefix))
+            self.logging.error("%s but has no value key @data.", prefix)
@@ -23,7 +23,6 @@
 #
 
 from wishbone import Actor
-from wishbone.event import Event
 from gevent import sleep
 
 
@@ -79,7 +78,7 @@ class TestEvent(Actor):
 
         while self.loop():
             message = self.generateMessage(self.kwargs.message)
-            event = Event(message)
+            event = self.event_pool.acquire(message)
             for key, value in list(self.kwargs.additional_values.items()):
                 event.set(value, key)
             self.submit(event, self.pool.queue.outbox)
@@ -66,7 +66,7 @@ class TTL(Actor):
         if self.validateTTL(event):
             self.submit(event, self.pool.queue.outbox)
         else:
-            self.logging.warning("Event TTL of %s exceeded in transit (%s) moving event to ttl_exceeded queue." % (event.getHeaderValue(self.name, "ttl_counter"), self.kwargs.ttl))
+            self.logging.warning("Event TTL of %s exceeded in transit (%s) moving event to ttl_exceeded queue.", event.getHeaderValue(self.name, "ttl_counter"), self.kwargs.ttl)
             self.submit(event, self.pool.queue.ttl_exceeded)
 
     def validateTTL(self, event):
@@ -78,6 +78,7 @@ class Syslog(Actor):
         else:
             data = event.get(self.kwargs.selection)
             self.__writeLog(data)
+        self.releaseEvent(event)
 
     def __writeLog(self, data):
 
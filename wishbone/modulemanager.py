@@ -22,7 +22,6 @@
 #
 #
 
-import pkg_resources
 import re
 from prettytable import PrettyTable
 from wishbone.error import NoSuchModule, InvalidModule
@@ -30,6 +29,33 @@ from wishbone import Actor
 from wishbone.lookup import Lookup
 
 
+def buildEntryPointIndex():
+    '''
+    Returns a dictionary of all installed entry points by group and name.
+
+    Each value is a (load, version) tuple where <load> is the function
+    importing the entry point and <version> the version of the distribution
+    providing it.  When multiple distributions provide the same entry point
+    the first one found on sys.path wins.
+    '''
+
+    index = {}
+    try:
+        from importlib.metadata import distributions
+    except ImportError:
+        import pkg_resources
+        for distribution in pkg_resources.working_set:
+            for group, entry_points in list(distribution.get_entry_map().items()):
+                for name, entry_point in list(entry_points.items()):
+                    index.setdefault(group, {}).setdefault(name, (entry_point.load, distribution.version))
+    else:
+        for distribution in distributions():
+            for entry_point in distribution.entry_points:
+                index.setdefault(entry_point.group, {}).setdefault(entry_point.name, (entry_point.load, distribution.version))
+
+    return index
+
+
 class ModuleManager():
 
     '''
@@ -54,6 +80,9 @@ class ModuleManager():
         "function", "input", "output", "lookup" which define the type of
         module.*
 
+        The entry points are indexed once per process on first use.  Call
+        <reindex()> to pick up distributions installed afterwards.*
+
     Args:
 
         categories (list): The list of categories to search for <groups>
@@ -62,12 +91,38 @@ class ModuleManager():
 
     '''
 
+    __index = None
+
     def __init__(self,
                  categories=["wishbone", "wishbone_contrib"],
                  groups=["flow", "encode", "decode", "function", "input", "output", "lookup"]):
         self.categories = categories
         self.groups = groups
 
+    @classmethod
+    def reindex(cls):
+        '''
+        Rebuilds the entry point index.
+        '''
+
+        ModuleManager.__index = buildEntryPointIndex()
+
+    def entryPoints(self, category, group):
+        '''
+        Returns the indexed entry points of <category>.<group>.
+
+        Args:
+            category (str): The category name.
+            group (str): The group name.
+
+        Returns:
+            dict: A dictionary of (load, version) tuples by module name.
+        '''
+
+        if ModuleManager.__index is None:
+            self.reindex()
+        return ModuleManager.__index.get("%s.%s" % (category, group), {})
+
     def exists(self, name):
 
         '''
@@ -102,14 +157,12 @@ class ModuleManager():
             InvalidModule: There was module found but it was not deemed valid.
         '''
 
-        m = None
-        for module in pkg_resources.iter_entry_points("%s.%s" % (category, group)):
-            if module.name == name:
-                m = module.load()
-
-        if m is None:
+        try:
+            (load, version) = self.entryPoints(category, group)[name]
+        except KeyError:
             raise NoSuchModule("Module %s.%s.%s cannot be found." % (category, group, name))
         else:
+            m = load()
             if issubclass(m, Actor) or issubclass(m, Lookup):
                 return m
             else:
@@ -153,9 +206,7 @@ class ModuleManager():
         '''
         for category in self.categories:
             for group in self.groups:
-                group_name = "%s.%s" % (category, group)
-                groups = [m.name for m in pkg_resources.iter_entry_points(group=group_name)]
-                for m in sorted(groups):
+                for m in sorted(self.entryPoints(category, group)):
                     yield (category, group, m)
 
     def getModuleDoc(self, category, group, name):
@@ -250,10 +301,8 @@ class ModuleManager():
         '''
 
         try:
-            for module in pkg_resources.iter_entry_points("%s.%s" % (category, group)):
-                if module.name == name:
-                    return module.dist.version
-        except:
+            return self.entryPoints(category, group)[name][1]
+        except KeyError:
             return "?"
 
     def validateModuleName(self, name):
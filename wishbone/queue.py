@@ -27,6 +27,8 @@ from uuid import uuid4
 from gevent.queue import Queue as Gevent_Queue
 from wishbone.error import ReservedName, QueueMissing, QueueFull, QueueEmpty
 from time import time
+from collections import deque
+from itertools import islice
 from gevent.queue import Empty, Full
 from gevent import sleep
 
@@ -113,7 +115,8 @@ class Queue():
     chain.
 
     The <stats()> function will reveal whether any events have disappeared via
-    this queue.
+    this queue.  The reported <sojourn_time> is an exponentially weighted
+    moving average of the time in seconds elements spend in the queue.
 
     '''
 
@@ -125,6 +128,8 @@ class Queue():
         self.__out = 0
         self.__dropped = 0
         self.__cache = {}
+        self.__timestamps = deque()
+        self.__sojourn = 0.0
 
         self.put = self.__fallThrough
 
@@ -132,6 +137,7 @@ class Queue():
         '''Deletes the content of the queue.
         '''
         self.__q = Gevent_Queue(self.max_size)
+        self.__timestamps.clear()
 
     def disableFallThrough(self):
         self.put = self.__put
@@ -162,10 +168,18 @@ class Queue():
         except Empty:
             raise QueueEmpty("Queue is empty.")
         self.__out += 1
+        self.__sojourn += 0.1 * ((time() - self.__timestamps.popleft()) - self.__sojourn)
         return e
 
+    def peek(self, amount=1):
+        '''Returns up to <amount> of the oldest elements without consuming
+        them.'''
+
+        return list(islice(self.__q.queue, amount))
+
     def rescue(self, element):
 
+        self.__timestamps.append(time())
         self.__q.put(element)
 
     def size(self):
@@ -182,7 +196,8 @@ class Queue():
                 "in_rate": self.__rate("in_rate", self.__in),
                 "out_rate": self.__rate("out_rate", self.__out),
                 "dropped_total": self.__dropped,
-                "dropped_rate": self.__rate("dropped_rate", self.__dropped)
+                "dropped_rate": self.__rate("dropped_rate", self.__dropped),
+                "sojourn_time": self.__sojourn
                 }
 
     def __fallThrough(self, element):
@@ -194,10 +209,12 @@ class Queue():
     def __put(self, element):
         '''Puts element in queue.'''
 
+        self.__timestamps.append(time())
         try:
             self.__q.put(element)
             self.__in += 1
         except Full:
+            self.__timestamps.pop()
             raise QueueFull("Queue full.")
 
     def __rate(self, name, value):
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  autoscaler.py
+#
+#  Copyright 2016 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+from gevent import sleep, spawn, kill
+from .metrics import Sample
+
+
+def validate(name, settings):
+    '''Raises an exception when the autoscale <settings> of module instance
+    <name> are invalid.'''
+
+    minimum = settings.get("min", 1)
+    if minimum < 1:
+        raise Exception("The autoscale min of module instance '%s' must be at least 1." % (name))
+    if "max" not in settings or settings["max"] < minimum:
+        raise Exception("The autoscale max of module instance '%s' must be defined and at least equal to min." % (name))
+
+
+class Autoscaler():
+
+    '''
+    Grows and shrinks the number of consumers of module instances based on
+    the size of and the time events spend in their consumer queues.
+
+    At each interval and for each queue with a registered consumer:
+
+        - The number of consumers is doubled (up to <max>) when the queue is
+          not empty and events spend more than <sojourn> seconds in it.
+        - The number of consumers is decreased by 1 (down to <min>) when the
+          queue is empty.
+
+    Autoscaling only makes sense for module instances which spend their time
+    waiting on I/O.  Scaled module instances process events concurrently so
+    the order of events is not retained.
+
+    Args:
+        module_pool (ModulePool): The pool containing all module instances.
+        modules (dict): The autoscale settings (min, max, sojourn) by module instance name.
+        frequency (int): The time in seconds between each scaling decision.
+    '''
+
+    def __init__(self, module_pool, modules, frequency=1):
+
+        for name, settings in list(modules.items()):
+            validate(name, settings)
+
+        self.module_pool = module_pool
+        self.modules = modules
+        self.frequency = frequency
+        self.__scaler = None
+
+    def samples(self):
+        '''Returns the number of consumers per queue as a list of <Sample>
+        instances.'''
+
+        samples = []
+        for name in self.modules:
+            module = self.module_pool.getModule(name)
+            for queue in module.consumerQueues():
+                samples.append(Sample("wishbone_consumer_workers", "gauge", "The number of consumers processing events from the queue.", (("module", name), ("queue", queue)), module.consumerCount(queue)))
+        return samples
+
+    def scale(self):
+        '''Takes a scaling decision for each autoscaled module instance.'''
+
+        for name, settings in list(self.modules.items()):
+            module = self.module_pool.getModule(name)
+            minimum = settings.get("min", 1)
+            maximum = settings["max"]
+            sojourn = settings.get("sojourn", 0.05)
+
+            for queue in module.consumerQueues():
+                stats = module.pool.getQueue(queue).stats()
+                current = module.consumerCount(queue)
+
+                if current < minimum:
+                    amount = minimum
+                elif stats["size"] > 0 and stats["sojourn_time"] > sojourn:
+                    amount = min(maximum, current * 2)
+                elif stats["size"] == 0:
+                    amount = max(minimum, current - 1)
+                else:
+                    amount = current
+
+                if amount != current:
+                    module.scaleConsumers(queue, amount)
+                    module.logging.info("Scaled the consumers of queue %s from %s to %s. Queue size: %s.  Sojourn time: %.4f seconds.", queue, current, amount, stats["size"], stats["sojourn_time"])
+
+    def start(self):
+
+        self.scale()
+        self.__scaler = spawn(self.__scaleLoop)
+
+    def stop(self):
+
+        if self.__scaler is not None:
+            kill(self.__scaler)
+
+    def __scaleLoop(self):
+
+        while True:
+            sleep(self.frequency)
+            self.scale()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  blocking.py
+#
+#  Copyright 2016 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+from gevent import sleep, spawn, kill
+from gevent.monkey import get_original
+from wishbone.actor import Actor
+from collections import deque
+from time import monotonic
+from .metrics import Sample
+import sys
+import traceback
+
+CONSUMER = Actor._Actor__consumer.__code__
+
+
+class BlockingDetector():
+
+    '''
+    Detects consumers blocking the gevent hub.
+
+    A heartbeat greenlet records a timestamp every <threshold> / 2 seconds.
+    A native thread verifies the heartbeat at the same interval.  When the
+    heartbeat is more than <threshold> seconds late, nothing but the
+    running greenlet got CPU time since.  The thread then captures the stack
+    of that greenlet and attributes it to the module instance and the
+    consumer function it runs.
+
+    Once the hub runs again, the stall is logged by the offending module
+    instance and counted per module instance and function.  The last
+    <history> stalls are kept in <stalls>.
+
+    Args:
+        module_pool (ModulePool): The pool containing all module instances.
+        threshold (float): The max time in seconds the hub can be blocked.
+        history (int): The number of stalls to keep.
+    '''
+
+    def __init__(self, module_pool, threshold=0.1, history=100):
+
+        self.module_pool = module_pool
+        self.threshold = threshold
+        self.interval = threshold / 2.0
+        self.stalls = deque(maxlen=history)
+        self.counters = {}
+        self.__beat = monotonic()
+        self.__reported = None
+        self.__pending = deque()
+        self.__running = False
+        self.__heartbeat = None
+        self.__thread_ident = None
+
+    def check(self):
+        '''Captures the stack of the running greenlet when the heartbeat is
+        late.  Called from the native thread.'''
+
+        beat = self.__beat
+        if beat == self.__reported or monotonic() - beat < self.interval + self.threshold:
+            return
+
+        self.__reported = beat
+        frame = sys._current_frames().get(self.__thread_ident)
+        if frame is None:
+            return
+        module, function, queue = self.attribute(frame)
+        self.__pending.append((beat, module, function, queue, traceback.format_stack(frame)))
+
+    def attribute(self, frame):
+        '''Returns the name of the module instance, the function and the
+        queue <frame> belongs to.  Consumers are found by their
+        Actor.__consumer frame.  Otherwise the innermost method of a module
+        instance is used.'''
+
+        fallback = ("-", frame.f_code.co_name, None)
+        while frame is not None:
+            if frame.f_code is CONSUMER:
+                local = frame.f_locals
+                return (local["self"].name, local["function"].__name__, local["queue"])
+            if fallback[0] == "-" and "self" in frame.f_code.co_varnames:
+                instance = frame.f_locals.get("self")
+                if isinstance(instance, Actor):
+                    fallback = (instance.name, frame.f_code.co_name, None)
+            frame = frame.f_back
+        return fallback
+
+    def dump(self):
+        '''Returns the kept stalls.'''
+
+        return list(self.stalls)
+
+    def samples(self):
+        '''Returns the number and duration of the stalls per module instance
+        and function as a list of <Sample> instances.'''
+
+        samples = []
+        for (module, function), (count, duration) in sorted(self.counters.items()):
+            labels = (("module", module), ("function", function))
+            samples.append(Sample("wishbone_hub_stalls_total", "counter", "The number of times the function blocked the gevent hub.", labels, count))
+            samples.append(Sample("wishbone_hub_stall_seconds_total", "counter", "The time in seconds the function blocked the gevent hub.", labels, duration))
+        return samples
+
+    def start(self):
+
+        self.__thread_ident = get_original("_thread", "get_ident")()
+        self.__beat = monotonic()
+        self.__running = True
+        self.__heartbeat = spawn(self.__heartbeatLoop)
+        get_original("_thread", "start_new_thread")(self.__watchLoop, ())
+
+    def stop(self):
+
+        self.__running = False
+        if self.__heartbeat is not None:
+            kill(self.__heartbeat)
+
+    def __heartbeatLoop(self):
+
+        while True:
+            now = monotonic()
+            while self.__pending:
+                self.__report(now, *self.__pending.popleft())
+            self.__beat = now
+            sleep(self.interval)
+
+    def __report(self, now, beat, module, function, queue, stack):
+
+        duration = now - beat - self.interval
+        counter = self.counters.setdefault((module, function), [0, 0.0])
+        counter[0] += 1
+        counter[1] += duration
+        self.stalls.append({"module": module, "function": function, "queue": queue, "duration": duration, "stack": stack})
+
+        try:
+            logging = self.module_pool.getModule(module).logging
+        except Exception:
+            return
+        logging.warning("Function %s blocked the gevent hub for %.3f seconds. Stack:\n%s", function, duration, "".join(stack[-10:]))
+
+    def __watchLoop(self):
+
+        sleep = get_original("time", "sleep")
+        while self.__running:
+            sleep(self.interval)
+            self.check()
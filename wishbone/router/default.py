@@ -23,14 +23,24 @@
 #
 
 from wishbone.actor import ActorConfig
-from wishbone.error import ModuleInitFailure, NoSuchModule, FunctionInitFailure
+from wishbone.event import EventPool
+from wishbone.logging import LogRing
+from wishbone.tracer import Tracer
+from wishbone.lookup.cache import LookupCache
+from wishbone.lookup.event import EventLookup
+from wishbone.error import ModuleInitFailure, NoSuchModule, FunctionInitFailure, InvalidModule
 from wishbone import ModuleManager
-from gevent import event, sleep, spawn
-from gevent import pywsgi
-import json
+from gevent import event, sleep
 from .graphcontent import GRAPHCONTENT
 from .graphcontent import VisJSData
-from pkg_resources import iter_entry_points
+from .metrics import MetricsCollector, traceSamples
+from .webserver import Webserver
+from .autoscaler import Autoscaler
+from .memory import MemoryMonitor
+from .blocking import BlockingDetector
+from time import time
+from collections import OrderedDict
+import json
 
 
 class Container():
@@ -70,9 +80,20 @@ class Default(object):
         size (int): The size of all queues.
         frequency (int)(1): The frequency at which metrics are produced.
         identification (wishbone): A string identifying this instance in logging.
+        event_pool (int)(0): The size of the event free-list. 0 disables it.
+        event_pool_debug (bool)(False): Enables the event free-list safety checks.
+        log_ring (int)(0): The size of the process-wide log ring. 0 disables it.
+        metrics (bool)(False): Serves a snapshot of all metrics in Prometheus format on /metrics.
+        timing (bool)(False): Measures the time module consumers spend per event.
+        trace_rate (float)(0): The fraction of events to trace end-to-end. 0 disables tracing.
+        drain_timeout (int)(0): The max number of seconds to drain the queues on stop. 0 disables draining.
+        metrics_channel (gipc handle)(None): Publishes the metric snapshots over this handle instead of serving them.
+        profiler (SamplingProfiler)(None): The sampling profiler to control on /profile/start and /profile/stop.
+        memory_frequency (int)(0): The time in seconds between each memory measurement. 0 disables memory diagnostics.
+        stall_threshold (float)(0): The max time in seconds a consumer can block the gevent hub before it is reported. 0 disables detection.
     '''
 
-    def __init__(self, config=None, size=100, frequency=1, identification="wishbone", graph=False, graph_include_sys=False):
+    def __init__(self, config=None, size=100, frequency=1, identification="wishbone", graph=False, graph_include_sys=False, event_pool=0, event_pool_debug=False, log_ring=0, metrics=False, timing=False, trace_rate=0, drain_timeout=0, metrics_channel=None, profiler=None, memory_frequency=0, stall_threshold=0):
 
         self.module_manager = ModuleManager()
         self.config = config
@@ -81,6 +102,31 @@ class Default(object):
         self.identification = identification
         self.graph = graph
         self.graph_include_sys = graph_include_sys
+        self.metrics = metrics
+        self.metrics_channel = metrics_channel
+        self.profiler = profiler
+        self.memory_frequency = memory_frequency
+        self.memory_monitor = None
+        self.stall_threshold = stall_threshold
+        self.blocking_detector = None
+        self.timing = timing
+        self.drain_timeout = drain_timeout
+        self.drain_report = None
+        self.autoscale = {}
+        self.lookup_caches = []
+        self.lookup_instances = []
+        self.autoscaler = None
+        self.webserver = None
+        self.metrics_collector = None
+        self.event_pool = EventPool(event_pool, event_pool_debug)
+        if log_ring > 0:
+            self.log_ring = LogRing(log_ring)
+        else:
+            self.log_ring = None
+        if trace_rate > 0:
+            self.tracer = Tracer(trace_rate)
+        else:
+            self.tracer = None
 
         self.module_pool = ModulePool()
         self.__block = event.Event()
@@ -112,6 +158,47 @@ class Default(object):
 
         source.connect(source_queue, destination, destination_queue)
 
+    def drain(self, timeout):
+        '''Stops all modules in topological order while allowing them to
+        process the events already in their queues.
+
+        Input modules are stopped first.  Then each downstream module is
+        stopped once its consumer queues are empty and it is not processing
+        any event or when the global deadline of <timeout> seconds expires.
+
+        Args:
+            timeout (int): The max number of seconds draining may take.
+
+        Returns:
+            dict: The number of events flushed and lost per module.
+        '''
+
+        start = time()
+        deadline = start + timeout
+        order = self.__topologicalOrder()
+        consumed = dict([(module.name, module.consumed()) for module in order])
+        report = {"flushed": {}, "lost": {}, "expired": False}
+
+        for module in order:
+            while module.pending() > 0 and time() < deadline:
+                sleep(0.05)
+
+            lost = module.pending()
+            flushed = module.consumed() - consumed[module.name]
+            report["flushed"][module.name] = flushed
+            report["lost"][module.name] = lost
+            if lost > 0:
+                report["expired"] = True
+                module.logging.warning("Drain deadline expired. Flushed %s events. Lost %s events.", flushed, lost)
+            else:
+                module.logging.info("Drained. Flushed %s events.", flushed)
+
+            if not module.stopped:
+                module.stop()
+
+        report["elapsed"] = time() - start
+        return report
+
     def getChildren(self, module):
         '''Returns all the connected child modules
 
@@ -154,9 +241,31 @@ class Default(object):
     def stop(self):
         '''Stops all running modules.'''
 
-        for module in self.module_pool.list():
-            if module.name not in self.getChildren("_logs") + ["_logs"] and not module.stopped:
-                module.stop()
+        if self.autoscaler is not None:
+            self.autoscaler.stop()
+
+        if self.memory_monitor is not None:
+            self.memory_monitor.stop()
+
+        if self.blocking_detector is not None:
+            self.blocking_detector.stop()
+
+        if self.metrics_collector is not None:
+            self.metrics_collector.stop()
+
+        if self.webserver is not None:
+            self.webserver.stop()
+
+        if self.drain_timeout > 0:
+            self.drain_report = self.drain(self.drain_timeout)
+        else:
+            for module in self.module_pool.list():
+                if module.name not in self.getChildren("_logs") + ["_logs"] and not module.stopped:
+                    module.stop()
+
+        for instance in self.lookup_instances:
+            if hasattr(instance, "stop"):
+                instance.stop()
 
         while not self.__logsEmpty():
             sleep(0.1)
@@ -170,20 +279,77 @@ class Default(object):
         if self.config is not None:
             self.__initConfig()
 
+        if self.autoscale:
+            self.autoscaler = Autoscaler(self.module_pool, self.autoscale, self.frequency)
+
+        if self.memory_frequency > 0:
+            self.memory_monitor = MemoryMonitor(self.module_pool, self.memory_frequency)
+
+        if self.stall_threshold > 0:
+            self.blocking_detector = BlockingDetector(self.module_pool, self.stall_threshold)
+
+        if self.graph or self.metrics or self.metrics_channel is not None:
+            self.metrics_collector = MetricsCollector(self.config, self.module_pool, self.frequency)
+            if self.autoscaler is not None:
+                self.metrics_collector.addProvider(self.autoscaler.samples)
+            if self.tracer is not None:
+                self.metrics_collector.addProvider(lambda: traceSamples(self.tracer))
+            if self.memory_monitor is not None:
+                self.metrics_collector.addProvider(self.memory_monitor.samples)
+            if self.lookup_caches:
+                self.metrics_collector.addProvider(lambda: [s for c in self.lookup_caches for s in c.samples()])
+            if self.blocking_detector is not None:
+                self.metrics_collector.addProvider(self.blocking_detector.samples)
+            if self.log_ring is not None:
+                self.metrics_collector.addProvider(self.log_ring.samples)
+            if self.metrics_channel is not None:
+                self.metrics_collector.addListener(self.metrics_channel.put)
+
+        if self.graph or (self.metrics and self.metrics_channel is None):
+            self.webserver = Webserver()
+            self.webserver.addRoute("/metrics", lambda: self.metrics_collector.text, "text/plain; version=0.0.4")
+            self.webserver.addRoute("/metrics.json", lambda: self.metrics_collector.json, "application/json")
+            if self.tracer is not None:
+                self.webserver.addRoute("/trace", lambda: json.dumps(self.tracer.dump()), "application/json")
+            if self.memory_monitor is not None:
+                self.webserver.addRoute("/memory", lambda: json.dumps(self.memory_monitor.dump()), "application/json")
+            if self.blocking_detector is not None:
+                self.webserver.addRoute("/stalls", lambda: json.dumps(self.blocking_detector.dump()), "application/json")
+            if self.profiler is not None:
+                self.webserver.addRoute("/profile/start", self.__startProfiler, "application/json", methods=("POST",))
+                self.webserver.addRoute("/profile/stop", self.__stopProfiler, "application/json", methods=("POST",))
+                self.webserver.addRoute("/profile.collapsed", self.profiler.collapsed, "text/plain")
+                self.webserver.addRoute("/profile.cpuprofile", self.profiler.cpuprofile, "application/json")
+
         if self.graph:
-            self.graph = GraphWebserver(self.config, self.module_pool, self.__block, self.graph_include_sys)
+            self.graph = GraphWebserver(self.config, self.module_pool, self.__block, self.graph_include_sys, self.webserver)
             self.graph.start()
 
         for module in self.module_pool.list():
             module.start()
 
+        if self.autoscaler is not None:
+            self.autoscaler.start()
+
+        if self.memory_monitor is not None:
+            self.memory_monitor.start()
+
+        if self.blocking_detector is not None:
+            self.blocking_detector.start()
+
+        if self.metrics_collector is not None:
+            self.metrics_collector.start()
+
+        if self.webserver is not None:
+            self.webserver.start()
+
     def __initConfig(self):
         '''Setup all modules and routes.'''
 
         lookup_modules = {}
 
         for name, instance in list(self.config.lookups.items()):
-            lookup_modules[name] = self.__registerLookupModule(instance.module, **instance.arguments)
+            lookup_modules[name] = self.__registerLookupModule(name, instance.module, instance.arguments, instance.get("cache"))
 
         for name, instance in list(self.config.modules.items()):
             pmodule = self.module_manager.getModuleByName(instance.module)
@@ -191,42 +357,117 @@ class Default(object):
             if instance.description == "":
                 instance.description = pmodule.__doc__.split("\n")[0].replace('*', '')
 
-            actor_config = ActorConfig(name, self.size, self.frequency, lookup_modules, instance.description)
+            if name.startswith('_') and name != "_logs":
+                # Internal modules never had their logs connected.
+                log_ring = None
+            else:
+                log_ring = self.log_ring
+
+            if name.startswith('_'):
+                tracer = None
+            else:
+                tracer = self.tracer
+
+            actor_config = ActorConfig(name, self.size, self.frequency, lookup_modules, instance.description, self.event_pool, instance.get("loglevel", 7), log_ring=log_ring, timing=self.timing, tracer=tracer)
 
             self.registerModule(pmodule, actor_config, instance.arguments)
 
+            if instance.get("autoscale") is not None:
+                self.autoscale[name] = instance.autoscale
+
         self.__setupConnections()
 
     def __logsEmpty(self):
         '''Checks each module whether any logs have stayed behind.'''
 
+        if self.log_ring is not None and len(self.log_ring) > 0:
+            return False
+
         for module in self.module_pool.list():
             if not module.pool.queue.logs.size() == 0:
                 return False
         else:
             return True
 
-    def __registerLookupModule(self, module, **kwargs):
+    def __registerLookupModule(self, name, module, arguments={}, cache=None):
         '''Registers a lookupmodule
 
         Args:
+            name (str): The name of the lookup instance.
             module (Looup): The lookup module (not initialized)
-            **kwargs (dict): The parameters used to initiolize the lookup module.
+            arguments (dict): The parameters used to initiolize the lookup module.
+            cache (dict): The max_entries, ttl and negative_ttl of the cache wrapping the lookup. None disables caching.
 
         Raises:
             FunctionInitFailure: An error occurred loading and initializing the module.
 
         '''
 
-        for group in ["wishbone.lookup", "wishbone_contrib.lookup"]:
-            for entry_point in iter_entry_points(group=group, name=None):
-                if "%s.%s" % (group, entry_point.name) == module:
-                    l = entry_point.load()(**kwargs)
-                    if hasattr(l, "lookup"):
-                        return l.lookup
-                    else:
-                        raise FunctionInitFailure("Lookup module '%s' does not seem to have a 'lookup' method" % (l.module_name))
-        raise FunctionInitFailure("Lookup module '%s' does not exist." % (module))
+        try:
+            (category, group, lookup) = module.split('.')
+            if category not in ["wishbone", "wishbone_contrib"] or group != "lookup":
+                raise NoSuchModule()
+            l = self.module_manager.getModule(category, group, lookup)(**arguments)
+        except (ValueError, NoSuchModule, InvalidModule):
+            raise FunctionInitFailure("Lookup module '%s' does not exist." % (module))
+
+        if not hasattr(l, "lookup"):
+            raise FunctionInitFailure("Lookup module '%s' does not seem to have a 'lookup' method" % (module))
+
+        self.lookup_instances.append(l)
+        if cache is None or isinstance(l, EventLookup):
+            # Event lookups are resolved by the module instances themselves.
+            return l.lookup
+        else:
+            cache = LookupCache(l.lookup, name, **cache)
+            self.lookup_caches.append(cache)
+            return cache.lookup
+
+    def __startProfiler(self):
+
+        if not self.profiler.running:
+            self.profiler.reset()
+            self.profiler.start()
+        return json.dumps({"running": True})
+
+    def __stopProfiler(self):
+
+        files = []
+        if self.profiler.running:
+            self.profiler.stop()
+            files = self.profiler.write()
+        return json.dumps({"running": False, "files": files})
+
+    def __topologicalOrder(self):
+        '''Returns all modules except the log modules, parents before their
+        children.  Modules which are part of a cycle are appended in
+        arbitrary order.'''
+
+        exclude = self.getChildren("_logs") + ["_logs"]
+        modules = OrderedDict([(module.name, module) for module in self.module_pool.list() if module.name not in exclude])
+        parents = dict([(name, 0) for name in modules])
+        children = {}
+
+        for name, module in modules.items():
+            children[name] = set([child.split(".")[0] for child in module.getChildren()]) & set(modules)
+            for child in children[name]:
+                parents[child] += 1
+
+        order = []
+        ready = [name for name in modules if parents[name] == 0]
+        while ready:
+            name = ready.pop(0)
+            order.append(modules[name])
+            for child in children[name]:
+                parents[child] -= 1
+                if parents[child] == 0:
+                    ready.append(child)
+
+        for name, module in modules.items():
+            if parents[name] > 0:
+                order.append(module)
+
+        return order
 
     def __setupConnections(self):
         '''Setup all connections as defined by configuration_manager'''
@@ -237,25 +478,43 @@ class Default(object):
 
 class GraphWebserver():
 
-    def __init__(self, config, module_pool, block, include_sys):
+    def __init__(self, config, module_pool, block, include_sys, webserver):
         self.config = config
         self.module_pool = module_pool
         self.block = block
+        self.webserver = webserver
         self.js_data = VisJSData()
 
         for c in self.config["routingtable"]:
+            if c.get("context") == "replica":
+                continue
             if self.__include(include_sys, self.config["modules"][c.source_module]["context"], self.config["modules"][c.destination_module]["context"]):
-                self.js_data.addModule(instance_name=c.source_module,
-                                       module_name=self.config["modules"][c.source_module]["module"],
+                (source_module, source_queue, source_name) = self.__logical(c.source_module, c.source_queue)
+                (destination_module, destination_queue, destination_name) = self.__logical(c.destination_module, c.destination_queue)
+
+                self.js_data.addModule(instance_name=source_module,
+                                       module_name=source_name,
                                        description=self.module_pool.getModule(c.source_module).description)
 
-                self.js_data.addModule(instance_name=c.destination_module,
-                                       module_name=self.config["modules"][c.destination_module]["module"],
+                self.js_data.addModule(instance_name=destination_module,
+                                       module_name=destination_name,
                                        description=self.module_pool.getModule(c.destination_module).description)
 
-                self.js_data.addQueue(c.source_module, c.source_queue)
-                self.js_data.addQueue(c.destination_module, c.destination_queue)
-                self.js_data.addEdge("%s.%s" % (c.source_module, c.source_queue), "%s.%s" % (c.destination_module, c.destination_queue))
+                self.js_data.addQueue(source_module, source_queue)
+                self.js_data.addQueue(destination_module, destination_queue)
+                self.js_data.addEdge("%s.%s" % (source_module, source_queue), "%s.%s" % (destination_module, destination_queue))
+
+    def __logical(self, module, queue):
+        '''Returns the module instance name, queue name and module name to
+        display.  The replicas of a module instance are displayed as the
+        replicated module instance.'''
+
+        instance = self.config["modules"][module]
+        name = instance.get("replica_of")
+        if name is None:
+            return module, queue, instance["module"]
+        else:
+            return name, instance.get("replica_queue", queue), self.config["modules"]["%s_1" % (name)]["module"]
 
     def __include(self, include_sys, source_module_context, destination_module_context):
 
@@ -270,10 +529,10 @@ class GraphWebserver():
 
         print("#####################################################")
         print("#                                                   #")
-        print("# Caution: Started webserver on port 8088           #")
+        print("# Caution: Started webserver on port %s           #" % (self.webserver.port))
         print("#                                                   #")
         print("#####################################################")
-        spawn(self.setupWebserver)
+        self.webserver.addRoute("/", self.getGraph)
 
     def stop(self):
         pass
@@ -282,35 +541,7 @@ class GraphWebserver():
 
         return self.__block
 
-    def getMetrics(self):
-
-        def getConnectedModuleQueue(m, q):
-            for c in self.config["routingtable"]:
-                if c.source_module == m and c.source_queue == q:
-                    return (c.destination_module, c.destination_queue)
-            return (None, None)
-
-        d = {"module": {}}
-        for module in self.module_pool.list():
-            d["module"][module.name] = {}
-            for queue in module.pool.listQueues(names=True):
-                d["module"][module.name]["queue"] = {queue: {"metrics": module.pool.getQueue(queue).stats()}}
-                (dest_mod, dest_q) = getConnectedModuleQueue(module.name, queue)
-                if dest_mod is not None and dest_q is not None:
-                    d["module"][module.name]["queue"] = {queue: {"connection": {"module": dest_mod, "queue": dest_q}}}
-        return json.dumps(d)
-
-    def application(self, env, start_response):
-        if env['PATH_INFO'] == '/':
-            start_response('200 OK', [('Content-Type', 'text/html')])
-            return[GRAPHCONTENT % (self.js_data.dumpString()[0], self.js_data.dumpString()[1])]
-        elif env['PATH_INFO'] == '/metrics':
-            start_response('200 OK', [('Content-Type', 'text/html')])
-            return[self.getMetrics()]
-        else:
-            start_response('404 Not Found', [('Content-Type', 'text/html')])
-            return [b'<h1>Not Found</h1>']
-
-    def setupWebserver(self):
+    def getGraph(self):
 
-        pywsgi.WSGIServer(('', 8088), self.application, log=None, error_log=None).serve_forever()
+        (nodes, edges) = self.js_data.dumpString()
+        return GRAPHCONTENT % (nodes, edges)
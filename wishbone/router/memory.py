@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  memory.py
+#
+#  Copyright 2016 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+from gevent import sleep, spawn, kill
+from collections import deque
+from .metrics import Sample
+import sys
+import tracemalloc
+
+CONTAINERS = (list, tuple, set, frozenset, deque)
+SCALARS = (str, bytes, bytearray, int, float, complex)
+
+# Module instance attributes referring to objects shared with the router and
+# the other module instances or to the event currently being consumed.
+SHARED = ("config", "event_pool", "current_event", "_Actor__consuming")
+
+
+def deepSize(obj, modules=("wishbone.event",)):
+    '''Returns an estimate of the number of bytes held by <obj>.
+
+    Builtin containers and instances of classes defined in <modules> are
+    followed.  Other objects such as queues, loggers, greenlets and other
+    module instances are shared with the rest of the process and are not
+    counted.
+    '''
+
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack:
+        o = stack.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+        if isinstance(o, dict):
+            total += sys.getsizeof(o)
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, CONTAINERS):
+            total += sys.getsizeof(o)
+            stack.extend(o)
+        elif isinstance(o, SCALARS):
+            total += sys.getsizeof(o)
+        elif type(o).__module__ in modules and hasattr(o, "__dict__"):
+            total += sys.getsizeof(o) + sys.getsizeof(o.__dict__)
+            stack.extend(o.__dict__.values())
+    return total
+
+
+def moduleSize(module):
+    '''Returns an estimate of the number of bytes held by the state of module
+    instance <module>.  Objects defined in the module's own source file,
+    such as the buckets of wishbone.flow.tippingbucket, are followed.  The
+    attributes listed in SHARED are not counted.'''
+
+    state = [value for name, value in vars(module).items() if name not in SHARED]
+    return deepSize(state, ("wishbone.event", type(module).__module__))
+
+
+def queueSize(queue, samples=10):
+    '''Returns an estimate of the number of bytes held by the elements in
+    <queue> based on the size of up to <samples> of them.'''
+
+    size = queue.size()
+    if size == 0:
+        return 0
+    elements = queue.peek(samples)
+    if not elements:
+        return 0
+    return int(size * sum([deepSize(e) for e in elements]) / len(elements))
+
+
+class MemoryMonitor():
+
+    '''
+    Periodically estimates the memory held by each module instance and
+    queue and takes a tracemalloc snapshot.
+
+    Traced allocations are attributed to the source file of the module
+    instances by walking their traceback from the most recent frame.  The
+    allocations which cannot be attributed are reported as "other".  The
+    allocation sites which grew the most since the previous snapshot are
+    kept in <growth>.
+
+    Tracing allocations slows down the process considerably so this is a
+    diagnostics tool.
+
+    Args:
+        module_pool (ModulePool): The pool containing all module instances.
+        frequency (int): The time in seconds between each measurement.
+        frames (int): The number of frames tracemalloc stores per allocation.
+        top (int): The number of allocation sites to keep in <growth>.
+    '''
+
+    def __init__(self, module_pool, frequency=60, frames=10, top=10):
+
+        self.module_pool = module_pool
+        self.frequency = frequency
+        self.frames = frames
+        self.top = top
+        self.modules = {}
+        self.queues = {}
+        self.sources = {}
+        self.growth = []
+        self.__snapshot = None
+        self.__tracing = False
+        self.__monitor = None
+
+    def dump(self):
+        '''Returns the last measurement.'''
+
+        modules = {}
+        for module in self.module_pool.list():
+            modules[module.name] = {
+                "source": type(module).__module__,
+                "bytes": self.modules.get(module.name, 0),
+                "queue": dict([(q, b) for (m, q), b in list(self.queues.items()) if m == module.name])
+            }
+        return {"module": modules, "source": self.sources, "growth": self.growth}
+
+    def measure(self):
+        '''Estimates the memory held by each module instance and queue and
+        takes a tracemalloc snapshot.'''
+
+        for module in self.module_pool.list():
+            self.modules[module.name] = moduleSize(module)
+            for queue in module.pool.listQueues(names=True):
+                self.queues[(module.name, queue)] = queueSize(module.pool.getQueue(queue))
+            sleep(0)
+
+        if tracemalloc.is_tracing():
+            self.snapshot()
+
+    def samples(self):
+        '''Returns the last measurement as a list of <Sample> instances.'''
+
+        samples = []
+        for name, value in list(self.modules.items()):
+            samples.append(Sample("wishbone_memory_module_bytes", "gauge", "The estimated number of bytes held by the state of the module instance.", (("module", name),), value))
+        for (name, queue), value in list(self.queues.items()):
+            samples.append(Sample("wishbone_memory_queue_bytes", "gauge", "The estimated number of bytes held by the events in the queue.", (("module", name), ("queue", queue)), value))
+        for source, value in sorted(self.sources.items()):
+            samples.append(Sample("wishbone_memory_traced_bytes", "gauge", "The number of bytes allocated by the module source file according to tracemalloc.", (("source", source),), value))
+        return samples
+
+    def snapshot(self):
+        '''Takes a tracemalloc snapshot and attributes the traced
+        allocations to the source files of the module instances.'''
+
+        files = {}
+        for module in self.module_pool.list():
+            source = type(module).__module__
+            files[sys.modules[source].__file__] = source
+
+        snapshot = tracemalloc.take_snapshot().filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),))
+        sources = {"other": 0}
+        for statistic in snapshot.statistics("traceback"):
+            source = "other"
+            for frame in reversed(statistic.traceback):
+                if frame.filename in files:
+                    source = files[frame.filename]
+                    break
+            sources[source] = sources.get(source, 0) + statistic.size
+        self.sources = sources
+
+        if self.__snapshot is not None:
+            self.growth = []
+            for statistic in snapshot.compare_to(self.__snapshot, "lineno")[:self.top]:
+                frame = statistic.traceback[0]
+                self.growth.append({
+                    "file": frame.filename,
+                    "line": frame.lineno,
+                    "bytes": statistic.size,
+                    "bytes_diff": statistic.size_diff,
+                    "count_diff": statistic.count_diff
+                })
+        self.__snapshot = snapshot
+
+    def start(self):
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self.__tracing = True
+        self.__monitor = spawn(self.__monitorLoop)
+
+    def stop(self):
+
+        if self.__monitor is not None:
+            kill(self.__monitor)
+        if self.__tracing:
+            tracemalloc.stop()
+            self.__tracing = False
+        self.__snapshot = None
+
+    def __monitorLoop(self):
+
+        while True:
+            self.measure()
+            sleep(self.frequency)
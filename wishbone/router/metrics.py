@@ -0,0 +1,327 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  metrics.py
+#
+#  Copyright 2016 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+from gevent import sleep, spawn, kill
+from collections import namedtuple, OrderedDict
+import json
+
+Sample = namedtuple('Sample', "name type help labels value")
+
+QUEUE_METRICS = [
+    ("size", "gauge", "The number of events currently in the queue."),
+    ("in_total", "counter", "The number of events submitted to the queue."),
+    ("out_total", "counter", "The number of events consumed from the queue."),
+    ("dropped_total", "counter", "The number of events dropped by the queue."),
+    ("sojourn_time", "gauge", "The moving average of the time in seconds events spend in the queue.")
+]
+
+TRACE_METRICS = [
+    ("edges", "wishbone_trace_edge_seconds", "The time in seconds traced events spend between 2 connected queues.", ("source", "destination")),
+    ("consumers", "wishbone_trace_consumer_seconds", "The time in seconds module consumers spend on traced events.", ("module", "queue")),
+    ("paths", "wishbone_trace_path_seconds", "The time in seconds traced events took to reach the end of a path of modules.", ("path",))
+]
+
+# Gauges which are averaged instead of summed when merging the snapshots of
+# multiple instances.
+MERGE_AVERAGE = ["wishbone_queue_sojourn_time"]
+
+
+def traceSamples(tracer):
+    '''Returns the histograms of <tracer> as a list of <Sample> instances.'''
+
+    samples = []
+    for (attribute, name, description, label_names) in TRACE_METRICS:
+        for key, histogram in list(getattr(tracer, attribute).items()):
+            if not isinstance(key, tuple):
+                key = (key,)
+            labels = tuple(zip(label_names, key))
+            for bound, total in histogram.cumulative():
+                samples.append(Sample("%s_bucket" % (name), "histogram", description, labels + (("le", bound),), total))
+            samples.append(Sample("%s_sum" % (name), "histogram", description, labels, histogram.sum))
+            samples.append(Sample("%s_count" % (name), "histogram", description, labels, histogram.count))
+    return samples
+
+
+def merge(snapshots):
+    '''Merges multiple lists of <Sample> instances into one.
+
+    Samples with the same name and labels are summed except for the gauges
+    listed in MERGE_AVERAGE which are averaged.  Histograms share the same
+    buckets so summing their samples results in the merged histogram.
+    '''
+
+    merged = OrderedDict()
+    for samples in snapshots:
+        for sample in samples:
+            key = (sample.name, sample.labels)
+            if key in merged:
+                merged[key][1] += sample.value
+                merged[key][2] += 1
+            else:
+                merged[key] = [sample, sample.value, 1]
+
+    result = []
+    for sample, total, count in merged.values():
+        if sample.name in MERGE_AVERAGE:
+            total = total / count
+        result.append(sample._replace(value=total))
+    return result
+
+
+def render(samples):
+    '''Renders <samples> into the Prometheus text exposition format.'''
+
+    grouped = OrderedDict()
+    for sample in samples:
+        if sample.type == "histogram":
+            family = sample.name.rsplit("_", 1)[0]
+        else:
+            family = sample.name
+        grouped.setdefault(family, []).append(sample)
+
+    lines = []
+    for name, group in grouped.items():
+        lines.append("# HELP %s %s" % (name, group[0].help))
+        lines.append("# TYPE %s %s" % (name, group[0].type))
+        for sample in group:
+            lines.append("%s%s %s" % (sample.name, renderLabels(sample.labels), sample.value))
+    lines.append("")
+    return "\n".join(lines)
+
+
+def renderLabels(labels):
+    '''Renders <labels> into a Prometheus label set.'''
+
+    if not labels:
+        return ""
+
+    values = []
+    for key, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        values.append('%s="%s"' % (key, value))
+    return "{%s}" % (",".join(values))
+
+
+class MetricsCollector():
+
+    '''
+    Periodically takes a snapshot of the metrics of all modules.
+
+    The snapshot is rendered once per refresh so serving it has a fixed and
+    negligible cost no matter how often it is requested.
+
+    Additional metrics can be included by registering a provider function
+    using <addProvider()>.  A provider returns an iterable of <Sample>
+    instances.  Functions registered using <addListener()> are called with
+    the samples of each new snapshot.
+
+    Args:
+        config (AttrDict): The router configuration.
+        module_pool (ModulePool): The pool containing all module instances.
+        frequency (int): The time in seconds between each snapshot.
+    '''
+
+    def __init__(self, config, module_pool, frequency=1):
+
+        self.module_pool = module_pool
+        self.frequency = frequency
+        self.providers = []
+        self.listeners = []
+        self.connections = {}
+        self.samples = []
+        self.text = b""
+        self.json = b"{}"
+        self.__refresher = None
+
+        if config is not None:
+            for c in config["routingtable"]:
+                self.connections[(c.source_module, c.source_queue)] = (c.destination_module, c.destination_queue)
+
+    def addProvider(self, function):
+        '''Registers <function> to provide additional samples.'''
+
+        self.providers.append(function)
+
+    def addListener(self, function):
+        '''Registers <function> to be called with the samples of each new
+        snapshot.'''
+
+        self.listeners.append(function)
+
+    def refresh(self):
+        '''Takes a new snapshot.'''
+
+        modules, samples = self.__collectQueues()
+        for provider in self.providers:
+            samples.extend(provider())
+
+        self.samples = samples
+        self.text = self.render(samples).encode("utf-8")
+        self.json = json.dumps({"module": modules}).encode("utf-8")
+
+        for listener in self.listeners:
+            listener(samples)
+
+    def render(self, samples):
+        '''Renders <samples> into the Prometheus text exposition format.'''
+
+        return render(samples)
+
+    def start(self):
+
+        self.refresh()
+        self.__refresher = spawn(self.__refreshLoop)
+
+    def stop(self):
+
+        if self.__refresher is not None:
+            kill(self.__refresher)
+
+    def __collectQueues(self):
+
+        modules = {}
+        samples = []
+        for module in self.module_pool.list():
+            queues = {}
+            for queue in module.pool.listQueues(names=True):
+                stats = module.pool.getQueue(queue).stats()
+                queues[queue] = {"metrics": stats}
+                if (module.name, queue) in self.connections:
+                    (dest_mod, dest_q) = self.connections[(module.name, queue)]
+                    queues[queue]["connection"] = {"module": dest_mod, "queue": dest_q}
+                for (name, metric_type, description) in QUEUE_METRICS:
+                    samples.append(Sample("wishbone_queue_%s" % (name), metric_type, description, (("module", module.name), ("queue", queue)), stats[name]))
+            modules[module.name] = {"queue": queues}
+
+        return modules, samples
+
+    def __refreshLoop(self):
+
+        while True:
+            sleep(self.frequency)
+            self.refresh()
+
+
+class MetricsAggregator():
+
+    '''
+    Merges the metric snapshots published by multiple router instances.
+
+    Each instance publishes the samples of its <MetricsCollector> snapshots
+    over a gipc pipe.  The merged view and the per instance breakdown are
+    only rendered again when a new snapshot arrived since the previous
+    request.  The snapshot of an instance is discarded when its pipe
+    closes.
+
+    Args:
+        label (str): The name of the label identifying the instance in the
+                     per instance breakdown.
+    '''
+
+    def __init__(self, label="instance_id"):
+
+        self.label = label
+        self.snapshots = OrderedDict()
+        self.__readers = []
+        self.__greenlets = []
+        self.__cache = {}
+
+    def addInstance(self, name, reader):
+        '''Reads the snapshots of instance <name> from gipc handle <reader>.'''
+
+        self.__readers.append((name, reader))
+
+    def update(self, name, samples):
+        '''Replaces the snapshot of instance <name> with <samples>.'''
+
+        self.snapshots[name] = samples
+        self.__cache = {}
+
+    def remove(self, name):
+        '''Discards the snapshot of instance <name>.'''
+
+        self.snapshots.pop(name, None)
+        self.__cache = {}
+
+    def total(self):
+        '''Returns the merged samples of all instances.'''
+
+        return merge(list(self.snapshots.values()))
+
+    def breakdown(self):
+        '''Returns the samples of all instances labeled with the instance
+        name.'''
+
+        samples = []
+        for name, snapshot in list(self.snapshots.items()):
+            for sample in snapshot:
+                samples.append(sample._replace(labels=((self.label, name),) + sample.labels))
+        return samples
+
+    def text(self):
+        '''Returns the merged samples in Prometheus format.'''
+
+        return self.__cached("text", lambda: render(self.total()).encode("utf-8"))
+
+    def instancesText(self):
+        '''Returns the per instance samples in Prometheus format.'''
+
+        return self.__cached("instances", lambda: render(self.breakdown()).encode("utf-8"))
+
+    def json(self):
+        '''Returns the merged and the per instance samples in JSON format.'''
+
+        def dump(samples):
+            return [{"name": s.name, "labels": dict(s.labels), "value": s.value} for s in samples]
+
+        return self.__cached("json", lambda: json.dumps({
+            "total": dump(self.total()),
+            "instances": dict([(name, dump(snapshot)) for name, snapshot in list(self.snapshots.items())])
+        }).encode("utf-8"))
+
+    def start(self):
+
+        for name, reader in self.__readers:
+            self.__greenlets.append(spawn(self.__read, name, reader))
+
+    def stop(self):
+
+        for greenlet in self.__greenlets:
+            kill(greenlet)
+
+    def __cached(self, kind, function):
+
+        if kind not in self.__cache:
+            self.__cache[kind] = function()
+        return self.__cache[kind]
+
+    def __read(self, name, reader):
+
+        while True:
+            try:
+                samples = reader.get()
+            except EOFError:
+                self.remove(name)
+                break
+            self.update(name, samples)
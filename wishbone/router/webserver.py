@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  webserver.py
+#
+#  Copyright 2016 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+from gevent import pywsgi, spawn, kill
+
+
+class Webserver():
+
+    '''
+    The router's HTTP server.
+
+    Functions registered using <addRoute()> are called without arguments
+    and return the response body.  Requests using a method not allowed for
+    the route are answered with 405.
+
+    Args:
+        port (int): The port to listen on.
+    '''
+
+    def __init__(self, port=8088):
+
+        self.port = port
+        self.routes = {}
+        self.__server = None
+
+    def addRoute(self, path, function, content_type="text/html", methods=("GET", "HEAD")):
+        '''Serves the result of <function> on <path> for requests using one
+        of <methods>.'''
+
+        self.routes[path] = (function, content_type, methods)
+
+    def application(self, env, start_response):
+
+        try:
+            function, content_type, methods = self.routes[env['PATH_INFO']]
+        except KeyError:
+            start_response('404 Not Found', [('Content-Type', 'text/html')])
+            return [b'<h1>Not Found</h1>']
+
+        if env['REQUEST_METHOD'] not in methods:
+            start_response('405 Method Not Allowed', [('Content-Type', 'text/html'), ('Allow', ", ".join(methods))])
+            return [b'<h1>Method Not Allowed</h1>']
+
+        body = function()
+        if not isinstance(body, bytes):
+            body = body.encode("utf-8")
+        start_response('200 OK', [('Content-Type', content_type)])
+        return [body]
+
+    def start(self):
+
+        self.__server = spawn(self.setupWebserver)
+
+    def stop(self):
+
+        if self.__server is not None:
+            kill(self.__server)
+
+    def setupWebserver(self):
+
+        pywsgi.WSGIServer(('', self.port), self.application, log=None, error_log=None).serve_forever()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  tracer.py
+#
+#  Copyright 2016 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+from bisect import bisect_left
+from random import random
+from time import monotonic
+
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class Histogram():
+
+    '''
+    A fixed bucket latency histogram.
+
+    Args:
+        buckets (tuple): The sorted upper bounds of the buckets in seconds.
+    '''
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def add(self, value):
+        '''Records <value>.'''
+
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        '''Returns a list of (upper bound, cumulative count) tuples.  The last
+        upper bound is "+Inf".'''
+
+        result = []
+        total = 0
+        for bound, count in zip(self.buckets + ("+Inf",), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q):
+        '''Returns the upper bound of the bucket containing quantile <q>.'''
+
+        if self.count == 0:
+            return 0
+        rank = q * self.count
+        for bound, total in self.cumulative():
+            if total >= rank:
+                if bound == "+Inf":
+                    return self.buckets[-1]
+                return bound
+
+    def dump(self):
+
+        return {"count": self.count,
+                "sum": self.sum,
+                "average": self.sum / self.count if self.count else 0,
+                "p50": self.quantile(0.5),
+                "p99": self.quantile(0.99),
+                "buckets": self.cumulative()}
+
+
+class Tracer():
+
+    '''
+    Records the latency of a sampled fraction of events.
+
+    When an event leaves an input module, it is selected for tracing with a
+    probability of <rate>.  The trace state of a selected event is stored as
+    a tuple in @tmp.trace and is stamped with a monotonic timestamp each time
+    the event is submitted to a queue.  When a consumer picks up a traced
+    event, the tracer records:
+
+        - edge: the time between submitting to the source queue and being
+          consumed from the destination queue.
+        - consumer: the time the consuming function took.
+        - path: the time since the event left the input, keyed by the list of
+          modules the event passed.
+
+    Events which are not sampled only pay for a dictionary lookup per hop.
+
+    Args:
+        rate (float): The fraction of events to trace. 0 < rate <= 1
+    '''
+
+    def __init__(self, rate=0.01):
+        self.rate = rate
+        self.edges = {}
+        self.consumers = {}
+        self.paths = {}
+
+    def sample(self):
+        '''Returns True when a new event should be traced.'''
+
+        return random() < self.rate
+
+    def start(self, event, module, queue):
+        '''Starts tracing <event> submitted by input <module> to <queue>.'''
+
+        now = monotonic()
+        event.data["@tmp"]["trace"] = (now, module, "%s.%s" % (module, queue), now)
+
+    def submit(self, trace, event, module, queue):
+        '''Stamps <event> submitted by <module> to <queue>.'''
+
+        event.data["@tmp"]["trace"] = (trace[0], trace[1], "%s.%s" % (module, queue), monotonic())
+
+    def enter(self, trace, event, module, queue):
+        '''Records the edge and path latency of <event> being consumed by
+        <module> from <queue> and returns the entry time.'''
+
+        now = monotonic()
+        (origin, path, hop, stamp) = trace
+        path = "%s>%s" % (path, module)
+        self.__record(self.edges, (hop, "%s.%s" % (module, queue)), now - stamp)
+        self.__record(self.paths, path, now - origin)
+        event.data["@tmp"]["trace"] = (origin, path, hop, stamp)
+        return now
+
+    def exit(self, started, module, queue):
+        '''Records the time <module> spent consuming an event from <queue>.'''
+
+        self.__record(self.consumers, (module, queue), monotonic() - started)
+
+    def dump(self):
+        '''Returns all histograms.'''
+
+        return {"rate": self.rate,
+                "edge": [{"source": s, "destination": d, "latency": h.dump()} for (s, d), h in list(self.edges.items())],
+                "consumer": [{"module": m, "queue": q, "latency": h.dump()} for (m, q), h in list(self.consumers.items())],
+                "path": [{"path": p, "latency": h.dump()} for p, h in list(self.paths.items())]}
+
+    def metrics(self, module):
+        '''Returns a generator of (name, value) tuples summarizing the
+        histograms of events consumed by <module>.'''
+
+        selected = []
+        for (source, destination), histogram in list(self.edges.items()):
+            (name, queue) = destination.split(".")
+            if name == module:
+                selected.append(("edge.%s.%s" % (source, queue), histogram))
+        for (name, queue), histogram in list(self.consumers.items()):
+            if name == module:
+                selected.append(("consumer.%s" % (queue), histogram))
+        for path, histogram in list(self.paths.items()):
+            if path.endswith(">%s" % (module)):
+                selected.append(("path.%s" % (path), histogram))
+
+        for name, histogram in selected:
+            yield ("%s.count" % (name), histogram.count)
+            yield ("%s.average" % (name), histogram.sum / histogram.count if histogram.count else 0)
+            yield ("%s.p50" % (name), histogram.quantile(0.5))
+            yield ("%s.p99" % (name), histogram.quantile(0.99))
+
+    def __record(self, histograms, key, value):
+
+        try:
+            histograms[key].add(value)
+        except KeyError:
+            histograms[key] = Histogram()
+            histograms[key].add(value)
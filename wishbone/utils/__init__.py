@@ -23,7 +23,6 @@
 #
 
 import os
-from gevent import sleep
 from wishbone.error import ModuleNotReady
 
 
@@ -92,6 +91,8 @@ class PIDFile():
     def sendSigint(self, pid):
         '''Sends sigint to PID.'''
 
+        from gevent import sleep
+
         try:
             os.kill(int(pid), 2)
         except:
@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  benchmark.py
+#
+#  Copyright 2016 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+import gipc
+import resource
+from gevent import sleep
+from timeit import default_timer
+from wishbone.router import Default
+
+
+class Benchmark():
+
+    '''
+    Benchmarks a router configuration.
+
+    All input module instances are replaced by ``wishbone.input.testevent``
+    generating events at <rate> and all output module instances are replaced
+    by ``wishbone.output.null`` sinks counting the events they receive.
+
+    Each run is executed in a fresh process so the reported peak RSS values
+    only cover that run.
+
+    Args:
+        config (AttrDict): The router configuration.
+        duration (int): The time in seconds each run lasts.
+        rate (int): The number of events per second each input generates.
+            0 means as fast as possible.
+        frequency (int): The metrics frequency.
+    '''
+
+    def __init__(self, config, duration=10, rate=0, frequency=1):
+
+        self.config = config
+        self.duration = duration
+        self.rate = rate
+        self.frequency = frequency
+        self.sinks = self.__replaceModules()
+
+    def run(self, instances=1, queue_size=100):
+        '''Runs <instances> parallel benchmark processes and returns the
+        merged results.'''
+
+        processes = []
+        for _ in range(instances):
+            reader, writer = gipc.pipe()
+            process = gipc.start_process(
+                runBenchmark,
+                args=(self.config, queue_size, self.frequency, self.duration, self.sinks, writer),
+                daemon=True
+            )
+            processes.append((process, reader))
+
+        results = []
+        for process, reader in processes:
+            with reader:
+                results.append(reader.get())
+            process.join()
+
+        return self.__merge(instances, queue_size, results)
+
+    def sweep(self, instances=[1], queue_sizes=[100]):
+        '''Runs the benchmark for each combination of <instances> and
+        <queue_sizes>.'''
+
+        runs = []
+        for amount in instances:
+            for queue_size in queue_sizes:
+                runs.append(self.run(amount, queue_size))
+
+        return {"duration": self.duration,
+                "rate": self.rate,
+                "runs": runs}
+
+    def __merge(self, instances, queue_size, results):
+
+        modules = {}
+        for result in results:
+            for name, module in list(result["modules"].items()):
+                merged = modules.setdefault(name, {"consumers": {}, "queues": {}})
+                for queue, stats in list(module["consumers"].items()):
+                    c = merged["consumers"].setdefault(queue, {"count": 0, "total_time": 0.0, "max_time": 0.0})
+                    c["count"] += stats["count"]
+                    c["total_time"] += stats["total_time"]
+                    c["max_time"] = max(c["max_time"], stats["max_time"])
+                for queue, sojourn_time in list(module["queues"].items()):
+                    merged["queues"].setdefault(queue, []).append(sojourn_time)
+
+        for module in list(modules.values()):
+            for stats in list(module["consumers"].values()):
+                stats["average_time"] = stats["total_time"] / stats["count"] if stats["count"] else 0
+            for queue, values in list(module["queues"].items()):
+                module["queues"][queue] = {"sojourn_time": sum(values) / len(values)}
+
+        return {"instances": instances,
+                "queue_size": queue_size,
+                "throughput": sum([r["throughput"] for r in results]),
+                "peak_rss_kb": max([r["peak_rss_kb"] for r in results]),
+                "modules": modules,
+                "per_instance": results}
+
+    def __replaceModules(self):
+        '''Replaces the input and output modules and returns the names of
+        the counting sinks.'''
+
+        if self.rate > 0:
+            interval = 1.0 / self.rate
+        else:
+            interval = 0
+
+        inputs = []
+        outputs = []
+        for name, instance in list(self.config["modules"].items()):
+            if ".input." in instance["module"] and not name.startswith('_'):
+                instance["module"] = "wishbone.input.testevent"
+                instance["arguments"] = {"interval": interval}
+                inputs.append(name)
+            elif ".output." in instance["module"]:
+                instance["module"] = "wishbone.output.null"
+                instance["arguments"] = {}
+                outputs.append(name)
+
+        connected = []
+        for route in self.config["routingtable"]:
+            if route["source_module"] in inputs and route["source_queue"] not in ["logs", "metrics"]:
+                route["source_queue"] = "outbox"
+                queue = "%s.outbox" % (route["source_module"])
+            elif route["destination_module"] in outputs:
+                route["destination_queue"] = "inbox"
+                queue = "%s.inbox" % (route["destination_module"])
+            else:
+                continue
+
+            if queue in connected:
+                raise Exception("Cannot benchmark '%s'. It has more than one queue connected." % (queue.split('.')[0]))
+            connected.append(queue)
+
+        return [name for name in outputs if not name.startswith('_')]
+
+
+def runBenchmark(config, queue_size, frequency, duration, sinks, writer):
+    '''Runs a router for <duration> seconds and writes the results to
+    <writer>.'''
+
+    router = Default(config, size=queue_size, frequency=frequency, identification="benchmark", timing=True)
+    start = default_timer()
+    router.start()
+    sleep(duration)
+    elapsed = default_timer() - start
+
+    processed = 0
+    for name in sinks:
+        processed += router.module_pool.getModule(name).pool.queue.inbox.stats()["out_total"]
+
+    modules = {}
+    for module in router.module_pool.list():
+        if module.name.startswith('_'):
+            continue
+        queues = {}
+        for queue in module.pool.listQueues(names=True):
+            stats = module.pool.getQueue(queue).stats()
+            if stats["in_total"] > 0:
+                queues[queue] = stats["sojourn_time"]
+        modules[module.name] = {"consumers": module.consumerStats(), "queues": queues}
+
+    with writer:
+        writer.put({"throughput": processed / elapsed,
+                    "processed": processed,
+                    "elapsed": elapsed,
+                    "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                    "modules": modules})
+
+    router.stop()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  placement.py
+#
+#  Copyright 2016 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+from collections import OrderedDict
+from wishbone.error import SetupError
+
+DEFAULT_PROCESS = "main"
+
+CHANNELS = {}
+
+# Marks a batch item holding the data of all events of a Bulk.
+BULK = "__wishbone_bulk__"
+
+
+def registerChannel(name, handle):
+    '''Makes the gipc pipe <handle> available to the bridge module instance
+    using channel <name>.'''
+
+    CHANNELS[name] = handle
+
+
+def getChannel(name):
+    '''Returns the gipc pipe handle registered under <name>.'''
+
+    try:
+        return CHANNELS[name]
+    except KeyError:
+        raise SetupError("There is no bridge channel with name '%s'." % (name))
+
+
+def hasPlacement(config):
+    '''Returns True when any module instance of <config> has a process
+    attribute.'''
+
+    for name, instance in list(config["modules"].items()):
+        if instance.get("process") is not None:
+            return True
+    return False
+
+
+def partition(config, container=dict):
+    '''Splits <config> into one configuration per process group.
+
+    Module instances without a process attribute are placed in the "main"
+    group.  The internal log and metric modules (names starting with _) are
+    added to each group.  Routing table entries connecting 2 module instances
+    of different groups are replaced by a wishbone.output.bridge instance in
+    the source group and a wishbone.input.bridge instance in the destination
+    group sharing the same channel.
+
+    Args:
+        config (dict): The router configuration as returned by ConfigFile.dump()
+        container (class): The mapping class to build the new configurations with.
+
+    Returns:
+        tuple: An OrderedDict of configurations by group name and a list of
+               (channel, source group, destination group) tuples.
+    '''
+
+    placement = OrderedDict()
+    for name, instance in list(config["modules"].items()):
+        if not name.startswith('_'):
+            placement[name] = instance.get("process") or DEFAULT_PROCESS
+
+    groups = OrderedDict()
+    for group in placement.values():
+        if group not in groups:
+            groups[group] = container({"lookups": container(config["lookups"]),
+                                       "modules": container([(n, i) for n, i in config["modules"].items() if n.startswith('_')]),
+                                       "routingtable": []})
+
+    for name, group in list(placement.items()):
+        groups[group]["modules"][name] = config["modules"][name]
+
+    logs_connected = False
+    for route in config["routingtable"]:
+        if route["source_queue"] == "logs" and route["destination_module"] == "_logs":
+            logs_connected = True
+
+    channels = []
+    for route in config["routingtable"]:
+        source = placement.get(route["source_module"])
+        destination = placement.get(route["destination_module"])
+
+        if source is None and destination is None:
+            for group in groups.values():
+                group["routingtable"].append(route)
+        elif source is None or source == destination:
+            groups[destination]["routingtable"].append(route)
+        elif destination is None:
+            groups[source]["routingtable"].append(route)
+        else:
+            channel = "%s.%s" % (route["source_module"], route["source_queue"])
+            outgoing = "_bridge_out_%s_%s" % (route["source_module"], route["source_queue"])
+            incoming = "_bridge_in_%s_%s" % (route["destination_module"], route["destination_queue"])
+
+            _addBridge(groups[source], outgoing, "wishbone.output.bridge", channel, logs_connected, container)
+            groups[source]["routingtable"].append(_route(route["source_module"], route["source_queue"], outgoing, "inbox", route.get("context", "configfile"), container))
+
+            _addBridge(groups[destination], incoming, "wishbone.input.bridge", channel, logs_connected, container)
+            groups[destination]["routingtable"].append(_route(incoming, "outbox", route["destination_module"], route["destination_queue"], route.get("context", "configfile"), container))
+
+            channels.append((channel, source, destination))
+
+    return groups, channels
+
+
+def _addBridge(group, name, module, channel, logs_connected, container):
+
+    group["modules"][name] = container({"description": "Bridges events to another process using channel %s." % (channel),
+                                        "module": module,
+                                        "arguments": container({"channel": channel}),
+                                        "context": "bridge"})
+
+    if logs_connected:
+        group["routingtable"].append(_route(name, "logs", "_logs", name, "_logs", container))
+    group["routingtable"].append(_route(name, "metrics", "_metrics", name, "_metrics", container))
+
+
+def _route(source_module, source_queue, destination_module, destination_queue, context, container):
+
+    return container({"source_module": source_module,
+                      "source_queue": source_queue,
+                      "destination_module": destination_module,
+                      "destination_queue": destination_queue,
+                      "context": context})
@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  sampler.py
+#
+#  Copyright 2016 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+from collections import Counter, deque
+from gevent import getcurrent, get_hub
+from os import getpid
+from timeit import default_timer
+import json
+import os
+import signal
+
+
+class SamplingProfiler(object):
+
+    '''
+    A statistical profiler sampling the stack of the running greenlet.
+
+    A SIGPROF interval timer interrupts the process each time it consumed
+    <interval> seconds of CPU time.  The interrupted stack is recorded
+    together with the greenlet and the module instance it belongs to.  Idle
+    time is not sampled and a stopped profiler has no overhead at all.
+
+    Stacks are aggregated in the collapsed format of flamegraph.pl.  The
+    most recent <max_samples> samples are kept with their timestamp to build
+    a Chrome developer tools .cpuprofile file.
+
+    Args:
+        interval (float): The CPU time in seconds between 2 samples.
+        directory (str): The directory to write the profile files to.
+        max_samples (int): The max number of timestamped samples to keep.
+    '''
+
+    def __init__(self, interval=0.005, directory=".", max_samples=100000):
+
+        self.interval = interval
+        self.directory = directory
+        self.running = False
+        self.stacks = Counter()
+        self.samples = deque(maxlen=max_samples)
+        self.started = default_timer()
+        self.__labels = {}
+        self.__actor = None
+
+    def start(self):
+        '''Starts sampling.'''
+
+        if self.running:
+            return
+
+        from wishbone.actor import Actor
+        self.__actor = Actor
+        self.started = default_timer()
+        signal.signal(signal.SIGPROF, self.__sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        self.running = True
+
+    def stop(self):
+        '''Stops sampling.  The collected samples are kept.'''
+
+        if not self.running:
+            return
+
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, signal.SIG_IGN)
+        self.running = False
+
+    def reset(self):
+        '''Discards the collected samples.'''
+
+        self.stacks.clear()
+        self.samples.clear()
+        self.started = default_timer()
+
+    def toggle(self):
+        '''Discards the previous samples and starts sampling when stopped.
+        When running, stops sampling and writes the profile files.'''
+
+        if self.running:
+            self.stop()
+            for filename in self.write():
+                print(("Written profile file '%s'." % (filename)))
+        else:
+            self.reset()
+            self.start()
+
+    def collapsed(self):
+        '''Returns the collected stacks in the collapsed format.  Each line
+        starts with the module instance and the greenlet.'''
+
+        return "".join(["%s %s\n" % (";".join(stack), count) for stack, count in self.stacks.most_common()])
+
+    def cpuprofile(self):
+        '''Returns the timestamped samples in the Chrome developer tools
+        .cpuprofile format.'''
+
+        nodes = [self.__node(1, "(root)")]
+        index = {(): 1}
+        samples = []
+        deltas = []
+        previous = self.started
+
+        for stamp, stack in self.samples:
+            path = ()
+            parent = 1
+            for name in stack:
+                path += (name,)
+                node = index.get(path)
+                if node is None:
+                    node = len(nodes) + 1
+                    nodes.append(self.__node(node, name))
+                    nodes[parent - 1]["children"].append(node)
+                    index[path] = node
+                parent = node
+            nodes[parent - 1]["hitCount"] += 1
+            samples.append(parent)
+            deltas.append(int((stamp - previous) * 1000000))
+            previous = stamp
+
+        return json.dumps({
+            "nodes": nodes,
+            "startTime": int(self.started * 1000000),
+            "endTime": int(previous * 1000000),
+            "samples": samples,
+            "timeDeltas": deltas
+        })
+
+    def write(self):
+        '''Writes the collapsed stacks and the .cpuprofile file to <directory>
+        and returns their filenames.'''
+
+        name = os.path.join(self.directory, "wishbone_%s_%s" % (getpid(), int(self.started)))
+        with open("%s.collapsed" % (name), "w") as f:
+            f.write(self.collapsed())
+        with open("%s.cpuprofile" % (name), "w") as f:
+            f.write(self.cpuprofile())
+        return ["%s.collapsed" % (name), "%s.cpuprofile" % (name)]
+
+    def __label(self, code):
+
+        try:
+            return self.__labels[code]
+        except KeyError:
+            label = "%s (%s:%s)" % (code.co_name, os.path.basename(code.co_filename), code.co_firstlineno)
+            self.__labels[code] = label
+            return label
+
+    def __greenlet(self, greenlet):
+
+        if greenlet is get_hub():
+            return "hub"
+        elif greenlet.parent is None:
+            return "main"
+        else:
+            run = getattr(greenlet, "_run", None)
+            return "greenlet %s" % (getattr(run, "__name__", type(greenlet).__name__))
+
+    def __node(self, id, name):
+
+        return {
+            "id": id,
+            "callFrame": {"functionName": name, "scriptId": "0", "url": "", "lineNumber": -1, "columnNumber": -1},
+            "hitCount": 0,
+            "children": []
+        }
+
+    def __sample(self, signum, frame):
+
+        stack = []
+        module = None
+        while frame is not None:
+            stack.append(self.__label(frame.f_code))
+            if module is None and "self" in frame.f_code.co_varnames:
+                instance = frame.f_locals.get("self")
+                if isinstance(instance, self.__actor):
+                    module = instance.name
+            frame = frame.f_back
+        stack.append(self.__greenlet(getcurrent()))
+        stack.append(module or "-")
+        stack.reverse()
+        stack = tuple(stack)
+
+        self.stacks[stack] += 1
+        self.samples.append((default_timer(), stack))